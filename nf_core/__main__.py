@@ -362,7 +362,7 @@ def create_params_file(pipeline, revision, output, force, show_hidden):
 @click.option(
     "-x",
     "--compress",
-    type=click.Choice(["tar.gz", "tar.bz2", "zip", "none"]),
+    type=click.Choice(["tar.gz", "tar.bz2", "tar.zst", "zip", "none"]),
     help="Archive compression type",
 )
 @click.option("-f", "--force", is_flag=True, default=False, help="Overwrite existing files")
@@ -424,7 +424,23 @@ def create_params_file(pipeline, revision, output, force, show_hidden):
     "--parallel-downloads",
     type=int,
     default=4,
-    help="Number of parallel image downloads",
+    help="Number of parallel image downloads and pulls",
+)
+@click.option(
+    "--container-cache-placement",
+    type=click.Choice(["copy", "hardlink", "reflink", "symlink"]),
+    default="copy",
+    help="How to place images from the `singularity.cacheDir` in the output directory. "
+    "Falls back to copying across filesystems. Symlinks point outside of the output directory "
+    "and are replaced by copies if the download is compressed.",
+    show_default=True,
+)
+@click.option(
+    "--hardlink-revisions",
+    is_flag=True,
+    default=False,
+    help="Store files that are identical between the downloaded revisions only once, as hardlinks. "
+    "Editing such a file changes it in all revisions.",
 )
 def download(
     pipeline,
@@ -441,6 +457,8 @@ def download(
     container_cache_utilisation,
     container_cache_index,
     parallel_downloads,
+    container_cache_placement,
+    hardlink_revisions,
 ):
     """
     Download a pipeline, nf-core/configs and pipeline singularity images.
@@ -467,6 +485,8 @@ def download(
         container_cache_utilisation,
         container_cache_index,
         parallel_downloads,
+        container_cache_placement=container_cache_placement,
+        hardlink_revisions=hardlink_revisions,
     )
     dl.download_workflow()
 
@@ -550,6 +570,21 @@ def create(name, description, author, version, force, outdir, template_yaml, pla
     default=".",
     help=r"Pipeline directory [dim]\[default: current working directory][/]",
 )
+@click.option(
+    "--batch",
+    type=click.Path(exists=True),
+    metavar="<dir>",
+    multiple=True,
+    help="Lint several pipeline directories in one run and write a combined report, together with --dir if given",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of lint tests to run in parallel, or of pipelines to lint in parallel with --batch",
+    show_default=True,
+)
 @click.option(
     "--release",
     is_flag=True,
@@ -600,6 +635,8 @@ def create(name, description, author, version, force, outdir, template_yaml, pla
 def lint(
     ctx,
     dir,
+    batch,
+    jobs,
     release,
     fix,
     key,
@@ -620,9 +657,31 @@ def lint(
     You can ignore tests using a file called [blue].nf-core.yml[/] [i](if you have a good reason!)[/].
     See the documentation for details.
     """
-    from nf_core.lint import run_linting
+    from nf_core.lint import run_linting, run_linting_batch
+    from nf_core.lint_utils import count_joint_results
     from nf_core.utils import is_pipeline_directory
 
+    if batch:
+        if fix:
+            log.error("'--fix' can not be used with '--batch'")
+            sys.exit(1)
+        # Lint the pipeline given with '--dir' as part of the batch
+        pipeline_dirs = list(batch)
+        if ctx.get_parameter_source("dir") != click.core.ParameterSource.DEFAULT and dir not in pipeline_dirs:
+            pipeline_dirs.insert(0, dir)
+        try:
+            for pipeline_dir in pipeline_dirs:
+                is_pipeline_directory(pipeline_dir)
+            lint_results, lint_errors = run_linting_batch(
+                pipeline_dirs, release, key, fail_ignored, fail_warned, markdown, json, jobs, ctx.obj["hide_progress"]
+            )
+        except (AssertionError, UserWarning) as e:
+            log.error(e)
+            sys.exit(1)
+        if lint_errors or any(count_joint_results(*lint_objs)["failed"] > 0 for lint_objs in lint_results.values()):
+            sys.exit(1)
+        return
+
     # Check if pipeline directory is a pipeline
     try:
         is_pipeline_directory(dir)
@@ -644,6 +703,7 @@ def lint(
             markdown,
             json,
             ctx.obj["hide_progress"],
+            jobs,
         )
         swf_failed = 0
         if subworkflow_lint_obj is not None:
@@ -904,6 +964,14 @@ def modules_install(ctx, tool, dir, prompt, force, sha):
     default=False,
     help="Automatically update all linked modules and subworkflows without asking for confirmation",
 )
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of modules to prepare the updates of in parallel",
+    show_default=True,
+)
 def modules_update(
     ctx,
     tool,
@@ -915,6 +983,7 @@ def modules_update(
     preview,
     save_diff,
     update_deps,
+    jobs,
 ):
     """
     Update DSL2 modules within a pipeline.
@@ -936,6 +1005,7 @@ def modules_update(
             ctx.obj["modules_repo_url"],
             ctx.obj["modules_repo_branch"],
             ctx.obj["modules_repo_no_pull"],
+            jobs,
         )
         exit_status = module_install.update(tool)
         if not exit_status and install_all:
@@ -1238,7 +1308,15 @@ def test_module(ctx, tool, dir, no_prompts, update, once, profile):
     is_flag=True,
     help="Fix the module version if a newer version is available",
 )
-def modules_lint(ctx, tool, dir, registry, key, all, fail_warned, local, passed, sort_by, fix_version):
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of modules to lint in parallel",
+    show_default=True,
+)
+def modules_lint(ctx, tool, dir, registry, key, all, fail_warned, local, passed, sort_by, fix_version, jobs):
     """
     Lint one or more modules in a directory.
 
@@ -1260,6 +1338,7 @@ def modules_lint(ctx, tool, dir, registry, key, all, fail_warned, local, passed,
             branch=ctx.obj["modules_repo_branch"],
             no_pull=ctx.obj["modules_repo_no_pull"],
             hide_progress=ctx.obj["hide_progress"],
+            jobs=jobs,
         )
         module_lint.lint(
             module=tool,
@@ -1572,7 +1651,15 @@ def subworkflows_list_local(ctx, keywords, json, dir):  # pylint: disable=redefi
     help="Sort lint output by subworkflow or test name.",
     show_default=True,
 )
-def subworkflows_lint(ctx, subworkflow, dir, registry, key, all, fail_warned, local, passed, sort_by):
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of subworkflows to lint in parallel",
+    show_default=True,
+)
+def subworkflows_lint(ctx, subworkflow, dir, registry, key, all, fail_warned, local, passed, sort_by, jobs):
     """
     Lint one or more subworkflows in a directory.
 
@@ -1594,6 +1681,7 @@ def subworkflows_lint(ctx, subworkflow, dir, registry, key, all, fail_warned, lo
             branch=ctx.obj["modules_repo_branch"],
             no_pull=ctx.obj["modules_repo_no_pull"],
             hide_progress=ctx.obj["hide_progress"],
+            jobs=jobs,
         )
         subworkflow_lint.lint(
             subworkflow=subworkflow,
@@ -1798,6 +1886,14 @@ def subworkflows_remove(ctx, dir, subworkflow):
     default=False,
     help="Automatically update all linked modules and subworkflows without asking for confirmation",
 )
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of subworkflows to prepare the updates of in parallel",
+    show_default=True,
+)
 def subworkflows_update(
     ctx,
     subworkflow,
@@ -1809,6 +1905,7 @@ def subworkflows_update(
     preview,
     save_diff,
     update_deps,
+    jobs,
 ):
     """
     Update DSL2 subworkflow within a pipeline.
@@ -1830,6 +1927,7 @@ def subworkflows_update(
             ctx.obj["modules_repo_url"],
             ctx.obj["modules_repo_branch"],
             ctx.obj["modules_repo_no_pull"],
+            jobs,
         )
         exit_status = subworkflow_install.update(subworkflow)
         if not exit_status and install_all:
@@ -0,0 +1,241 @@
+"""
+In-memory snapshots of the files of modules and subworkflows
+"""
+
+import hashlib
+import io
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+
+def hash_git_blob(content: bytes) -> str:
+    """
+    Computes the git blob SHA of some file contents, i.e. the same hash that
+    `git hash-object` would return for a file with these contents
+
+    Args:
+        content (bytes): The contents of the file
+
+    Returns:
+        (str): The hex digest of the blob object
+    """
+    sha = hashlib.sha1(f"blob {len(content)}\0".encode())
+    sha.update(content)
+    return sha.hexdigest()
+
+
+class ComponentSnapshot:
+    """
+    An in-memory view of the files of a module or subworkflow, mapping the paths of the files
+    relative to the module/subworkflow directory to their contents.
+
+    A snapshot is either read from a git tree, see :meth:`nf_core.synced_repo.SyncedRepo.get_component_snapshot`,
+    or is a view of a directory, see :meth:`from_dir`. The files of a directory are only read when they are
+    needed, and changed contents (e.g. a patch applied on top, see :meth:`with_lines`) are kept in memory,
+    so the files only hit the disk once, when the snapshot is written to the pipeline with :meth:`write`.
+    """
+
+    # The git file modes of executable files and symbolic links
+    EXECUTABLE_MODE = 0o100755
+    LINK_MODE = 0o120000
+
+    def __init__(
+        self,
+        files: Optional[Dict[str, bytes]] = None,
+        modes: Optional[Dict[str, int]] = None,
+        base_dir: Optional[Union[str, Path]] = None,
+    ):
+        """
+        Args:
+            files (dict[str, bytes], optional): The contents of the files, by path relative to the
+                                                module/subworkflow directory. For symbolic links, the link target.
+            modes (dict[str, int], optional): The git modes of the executable files and symbolic links
+            base_dir (str | Path, optional): A directory with the other files of the snapshot
+        """
+        self.files: Dict[str, bytes] = {str(Path(path)): content for path, content in (files or {}).items()}
+        self.modes: Dict[str, int] = {str(Path(path)): mode for path, mode in (modes or {}).items()}
+        self.base_dir = Path(base_dir) if base_dir is not None else None
+        self.base_contents: Dict[str, bytes] = {}
+        self.base_paths: Optional[List[str]] = None
+
+    @classmethod
+    def from_dir(cls, directory: Union[str, Path]) -> "ComponentSnapshot":
+        """
+        Returns a snapshot of the files in a directory. The files are read lazily.
+
+        Args:
+            directory (str | Path): The module/subworkflow directory
+        """
+        return cls(base_dir=directory)
+
+    @classmethod
+    def of(cls, source: Union["ComponentSnapshot", str, Path]) -> "ComponentSnapshot":
+        """
+        Returns a snapshot unchanged, or a snapshot of the files in a directory
+
+        Args:
+            source (ComponentSnapshot | str | Path): A snapshot or a module/subworkflow directory
+        """
+        if isinstance(source, ComponentSnapshot):
+            return source
+        return cls.from_dir(source)
+
+    def list_base_paths(self) -> List[str]:
+        """
+        Lists the files of the base directory, in the order of `os.walk()`
+        """
+        if self.base_paths is None:
+            self.base_paths = []
+            if self.base_dir is not None:
+                self.base_paths = [
+                    str(Path(dirpath, file_name).relative_to(self.base_dir))
+                    for dirpath, _, file_names in os.walk(self.base_dir)
+                    for file_name in file_names
+                ]
+        return self.base_paths
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Iterates over the paths of the files, the ones of the base directory first
+        """
+        base_paths = self.list_base_paths()
+        yield from base_paths
+        base_path_set = set(base_paths)
+        yield from (path for path in self.files if path not in base_path_set)
+
+    def __contains__(self, path) -> bool:
+        path = str(Path(path))
+        return path in self.files or (self.base_dir is not None and Path(self.base_dir, path).is_file())
+
+    def read_bytes(self, path: Union[str, Path]) -> Optional[bytes]:
+        """
+        Returns the contents of a file
+
+        Args:
+            path (str | Path): Path of the file relative to the module/subworkflow directory
+
+        Returns:
+            (bytes | None): The contents, or None if there is no such file
+        """
+        path = str(Path(path))
+        if path in self.files:
+            return self.files[path]
+        if self.base_dir is None:
+            return None
+        if path not in self.base_contents:
+            try:
+                self.base_contents[path] = Path(self.base_dir, path).read_bytes()
+            except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+                return None
+        return self.base_contents[path]
+
+    def read_lines(self, path: Union[str, Path]) -> Optional[List[str]]:
+        """
+        Returns the lines of a text file, like `open(path).readlines()` would
+
+        Args:
+            path (str | Path): Path of the file relative to the module/subworkflow directory
+
+        Returns:
+            ([str] | None): The lines, or None if there is no such file
+        """
+        content = self.read_bytes(path)
+        if content is None:
+            return None
+        return io.TextIOWrapper(io.BytesIO(content)).readlines()
+
+    def get_size(self, path: Union[str, Path]) -> Optional[int]:
+        """
+        Returns the size of a file in bytes, without reading files of the base directory
+
+        Args:
+            path (str | Path): Path of the file relative to the module/subworkflow directory
+        """
+        path = str(Path(path))
+        if path in self.files:
+            return len(self.files[path])
+        if self.base_dir is None:
+            return None
+        try:
+            return os.path.getsize(Path(self.base_dir, path))
+        except OSError:
+            return None
+
+    def file_identical(self, path: Union[str, Path], other: "ComponentSnapshot") -> bool:
+        """
+        Checks whether a file has the same contents in another snapshot, comparing their sizes before their bytes
+
+        Args:
+            path (str | Path): Path of the file relative to the module/subworkflow directory
+            other (ComponentSnapshot): The other snapshot
+        """
+        if self.get_size(path) != other.get_size(path):
+            return False
+        return self.read_bytes(path) == other.read_bytes(path)
+
+    def blob_sha(self, path: Union[str, Path]) -> Optional[str]:
+        """
+        Returns the git blob SHA of a file, see :func:`hash_git_blob`
+
+        Args:
+            path (str | Path): Path of the file relative to the module/subworkflow directory
+
+        Returns:
+            (str | None): The blob SHA, or None if there is no such file
+        """
+        content = self.read_bytes(path)
+        return hash_git_blob(content) if content is not None else None
+
+    def copy(self) -> "ComponentSnapshot":
+        """
+        Returns a copy of the snapshot, which can be changed without changing this snapshot
+        """
+        snapshot = ComponentSnapshot(self.files, self.modes, self.base_dir)
+        snapshot.base_contents = self.base_contents
+        snapshot.base_paths = self.base_paths
+        return snapshot
+
+    def with_lines(self, files: Dict[str, List[str]]) -> "ComponentSnapshot":
+        """
+        Returns a copy of the snapshot with new contents of some text files, e.g. after applying a patch
+
+        Args:
+            files (dict[str, [str]]): The new lines of the files, by path relative to the module/subworkflow directory
+        """
+        snapshot = self.copy()
+        for path, lines in files.items():
+            # Encode the lines like `open(path, "w").writelines(lines)` would
+            buffer = io.BytesIO()
+            fh = io.TextIOWrapper(buffer)
+            fh.writelines(lines)
+            fh.flush()
+            snapshot.files[str(Path(path))] = buffer.getvalue()
+        return snapshot
+
+    def write(self, directory: Union[str, Path]) -> None:
+        """
+        Writes the files of the snapshot into a directory. Files of the base
+        directory are skipped if they would be written onto themselves.
+
+        Args:
+            directory (str | Path): The module/subworkflow directory to write to
+        """
+        in_place = self.base_dir is not None and os.path.abspath(self.base_dir) == os.path.abspath(directory)
+        for path in self:
+            if in_place and path not in self.files:
+                continue
+            dest = Path(directory, path)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            mode = self.modes.get(path)
+            if path not in self.files and self.base_dir is not None:
+                mode = ComponentSnapshot.EXECUTABLE_MODE if os.access(Path(self.base_dir, path), os.X_OK) else None
+            content = self.read_bytes(path)
+            if content is None:
+                continue
+            if mode == ComponentSnapshot.LINK_MODE:
+                os.symlink(content.decode(), dest)
+            else:
+                dest.write_bytes(content)
+                if mode == ComponentSnapshot.EXECUTABLE_MODE:
+                    dest.chmod(0o755)
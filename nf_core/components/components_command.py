@@ -34,6 +34,7 @@ class ComponentCommand:
         """
         self.component_type = component_type
         self.dir = dir
+        ModulesRepo.configure_session(self.dir)
         self.modules_repo = ModulesRepo(remote_url, branch, no_pull, hide_progress)
         self.hide_progress = hide_progress
         self.no_prompts = no_prompts
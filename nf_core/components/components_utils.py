@@ -11,6 +11,11 @@ from nf_core.modules.modules_repo import ModulesRepo
 
 log = logging.getLogger(__name__)
 
+# Matches the includes of modules and subworkflows in a subworkflow 'main.nf' file
+INCLUDE_REGEX = re.compile(
+    r"include(?: *{ *)([a-zA-Z\_0-9]*)(?: *as *)?(?:[a-zA-Z\_0-9]*)?(?: *})(?: *from *)(?:'|\")(.*)(?:'|\")"
+)
+
 
 def get_repo_info(directory: str, use_prompt: Optional[bool] = True) -> Tuple[str, Optional[str], str]:
     """
@@ -140,10 +145,7 @@ def get_components_to_install(subworkflow_dir: str) -> Tuple[List[str], List[str
     subworkflows = []
     with open(Path(subworkflow_dir, "main.nf")) as fh:
         for line in fh:
-            regex = re.compile(
-                r"include(?: *{ *)([a-zA-Z\_0-9]*)(?: *as *)?(?:[a-zA-Z\_0-9]*)?(?: *})(?: *from *)(?:'|\")(.*)(?:'|\")"
-            )
-            match = regex.match(line)
+            match = INCLUDE_REGEX.match(line)
             if match and len(match.groups()) == 2:
                 name, link = match.groups()
                 if link.startswith("../../../"):
@@ -3,6 +3,7 @@ Code for linting modules and subworkflows in the nf-core/modules repository and
 in nf-core pipelines
 """
 
+import concurrent.futures
 import logging
 import operator
 import os
@@ -11,6 +12,7 @@ from pathlib import Path
 import rich.box
 import rich.console
 import rich.panel
+import rich.progress
 import rich.repr
 from rich.markdown import Markdown
 from rich.table import Table
@@ -61,6 +63,7 @@ class ComponentLint(ComponentCommand):
         no_pull=False,
         registry=None,
         hide_progress=False,
+        jobs=1,
     ):
         super().__init__(
             component_type,
@@ -72,6 +75,7 @@ class ComponentLint(ComponentCommand):
         )
 
         self.fail_warned = fail_warned
+        self.jobs = jobs
         self.passed = []
         self.warned = []
         self.failed = []
@@ -193,6 +197,72 @@ class ComponentLint(ComponentCommand):
         # If -k supplied, only run these tests
         self.lint_tests = [k for k in self.lint_tests if k in key]
 
+    def lint_components(self, components, lint_component, local=False, **kwargs):
+        """
+        Run the lint tests on a list of modules/subworkflows
+
+        With more than one job, the components are linted in a thread pool, as most of
+        the time is spent waiting on network requests. The results are added to the
+        passed, warned and failed lists in the order of the components list.
+
+        Args:
+            components ([NFCoreComponent]): A list of module/subworkflow objects
+            lint_component (callable): The function linting a single component,
+                                       called with the component and the progress bar
+            local (boolean): Whether the list consist of local or nf-core components
+            **kwargs: Additional arguments passed on to lint_component
+        """
+        progress_bar = rich.progress.Progress(
+            "[bold blue]{task.description}",
+            rich.progress.BarColumn(bar_width=None),
+            "[magenta]{task.completed} of {task.total}[reset] » [bold yellow]{task.fields[test_name]}",
+            transient=True,
+            console=console,
+            disable=self.hide_progress or os.environ.get("HIDE_PROGRESS", None) is not None,
+        )
+        with progress_bar:
+            lint_progress = progress_bar.add_task(
+                f"Linting {'local' if local else 'nf-core'} {self.component_type}",
+                total=len(components),
+                test_name=components[0].component_name,
+            )
+            if self.jobs > 1:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                    futures = {
+                        pool.submit(lint_component, component, progress_bar, local=local, **kwargs): component
+                        for component in components
+                    }
+                    for future in concurrent.futures.as_completed(futures):
+                        # Re-raise any exception from the worker thread
+                        future.result()
+                        progress_bar.update(lint_progress, advance=1, test_name=futures[future].component_name)
+            else:
+                for component in components:
+                    progress_bar.update(lint_progress, advance=1, test_name=component.component_name)
+                    lint_component(component, progress_bar, local=local, **kwargs)
+
+        for component in components:
+            self.add_lint_results(component, local=local)
+
+    def add_lint_results(self, component, local=False):
+        """
+        Add the results of the lint tests run on a module/subworkflow to the passed, warned and failed lists.
+        Failures of local components are only reported as warnings.
+
+        Args:
+            component (NFCoreComponent): The linted module/subworkflow
+            local (boolean): Whether the component is a local component
+        """
+        self.passed += [LintResult(component, *m) for m in component.passed]
+        warned_results = component.warned + component.failed if local else component.warned
+        warned = [LintResult(component, *m) for m in warned_results]
+        if not self.fail_warned:
+            self.warned += warned
+        else:
+            self.failed += warned
+        if not local:
+            self.failed += [LintResult(component, *m) for m in component.failed]
+
     def _print_results(self, show_passed=False, sort_by="test"):
         """Print linting results to the command line.
 
@@ -97,10 +97,9 @@ class ComponentPatch(ComponentCommand):
             else:
                 return
 
-        # Create a temporary directory for storing the unchanged version of the module
-        install_dir = tempfile.mkdtemp()
-        component_install_dir = Path(install_dir, component)
-        if not self.install_component_files(component, component_version, self.modules_repo, install_dir):
+        # Read the unchanged version of the module into memory
+        component_snapshot = self.modules_repo.get_component_snapshot(component, self.component_type, component_version)
+        if component_snapshot is None:
             raise UserWarning(
                 f"Failed to install files of {self.component_type[:-1]} '{component}' from remote ({self.modules_repo.remote_url})."
             )
@@ -112,7 +111,7 @@ class ComponentPatch(ComponentCommand):
                 patch_temp_path,
                 component,
                 self.modules_repo.repo_path,
-                component_install_dir,
+                component_snapshot,
                 component_current_dir,
                 for_git=False,
                 dsp_from_dir=component_relpath,
@@ -130,7 +129,7 @@ class ComponentPatch(ComponentCommand):
         ModulesDiffer.print_diff(
             component,
             self.modules_repo.repo_path,
-            component_install_dir,
+            component_snapshot,
             component_current_dir,
             dsp_from_dir=component_current_dir,
             dsp_to_dir=component_current_dir,
@@ -196,14 +195,12 @@ class ComponentPatch(ComponentCommand):
             if not remove:
                 return
 
-        # Try to apply the patch in reverse and move resulting files to module dir
-        temp_component_dir = self.modules_json.try_apply_patch_reverse(
+        # Try to apply the patch in reverse and write the reverted files to the module dir
+        component_snapshot = self.modules_json.try_apply_patch_reverse(
             component, self.modules_repo.repo_path, patch_relpath, component_path
         )
         try:
-            for file in Path(temp_component_dir).glob("*"):
-                file.rename(component_path.joinpath(file.name))
-            os.rmdir(temp_component_dir)
+            component_snapshot.write(component_path)
         except Exception as err:
             raise UserWarning(f"There was a problem reverting the patched file: {err}")
 
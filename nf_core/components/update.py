@@ -1,3 +1,4 @@
+import concurrent.futures
 import logging
 import os
 import shutil
@@ -8,6 +9,7 @@ import questionary
 
 import nf_core.modules.modules_utils
 import nf_core.utils
+from nf_core.component_snapshot import ComponentSnapshot
 from nf_core.components.components_command import ComponentCommand
 from nf_core.components.components_utils import (
     get_components_to_install,
@@ -38,6 +40,7 @@ class ComponentUpdate(ComponentCommand):
         remote_url=None,
         branch=None,
         no_pull=False,
+        jobs=1,
     ):
         super().__init__(component_type, pipeline_dir, remote_url, branch, no_pull)
         self.force = force
@@ -51,6 +54,7 @@ class ComponentUpdate(ComponentCommand):
         self.update_config = None
         self.modules_json = ModulesJson(self.dir)
         self.branch = branch
+        self.jobs = jobs
 
     def _parameter_checks(self):
         """Checks the compatibilty of the supplied parameters.
@@ -147,166 +151,150 @@ class ComponentUpdate(ComponentCommand):
         if self.save_diff_fn:  # True or a string
             self.setup_diff_file(check_diff_exist)
 
-        # Loop through all components to be updated
-        # and do the requested action on them
         exit_value = True
         all_patches_successful = True
-        for modules_repo, component, sha, patch_relpath in components_info:
-            if component is None:
-                # The entry from .nf-core.yml is set to false, skip update of this component
-                continue
-            component_fullname = str(Path(self.component_type, modules_repo.repo_path, component))
-            # Are we updating the files in place or not?
-            dry_run = self.show_diff or self.save_diff_fn
+        if self.show_diff or self.save_diff_fn or self.prompt:
+            # Previews and prompts need the user, so the components are updated one at a time
+            for modules_repo, component, sha, patch_relpath in components_info:
+                if component is None:
+                    # The entry from .nf-core.yml is set to false, skip update of this component
+                    continue
+                component_fullname = str(Path(self.component_type, modules_repo.repo_path, component))
+                # Are we updating the files in place or not?
+                dry_run = self.show_diff or self.save_diff_fn
 
-            current_version = self.modules_json.get_component_version(
-                self.component_type, component, modules_repo.remote_url, modules_repo.repo_path
-            )
+                current_version = self.modules_json.get_component_version(
+                    self.component_type, component, modules_repo.remote_url, modules_repo.repo_path
+                )
 
-            # Set the temporary installation folder
-            install_tmp_dir = Path(tempfile.mkdtemp())
-            component_install_dir = install_tmp_dir / component
+                # Compute the component directory
+                component_dir = os.path.join(self.dir, self.component_type, modules_repo.repo_path, component)
 
-            # Compute the component directory
-            component_dir = os.path.join(self.dir, self.component_type, modules_repo.repo_path, component)
+                if sha is not None:
+                    version = sha
+                elif self.prompt:
+                    version = prompt_component_version_sha(
+                        component, self.component_type, modules_repo=modules_repo, installed_sha=current_version
+                    )
+                else:
+                    version = modules_repo.get_latest_component_version(component, self.component_type)
 
-            if sha is not None:
-                version = sha
-            elif self.prompt:
-                version = prompt_component_version_sha(
-                    component, self.component_type, modules_repo=modules_repo, installed_sha=current_version
-                )
-            else:
-                version = modules_repo.get_latest_component_version(component, self.component_type)
+                if current_version is not None and not self.force:
+                    if current_version == version:
+                        if self.sha or self.prompt:
+                            log.info(f"'{component_fullname}' is already installed at {version}")
+                        else:
+                            log.info(f"'{component_fullname}' is already up to date")
+                        continue
 
-            if current_version is not None and not self.force:
-                if current_version == version:
-                    if self.sha or self.prompt:
-                        log.info(f"'{component_fullname}' is already installed at {version}")
-                    else:
-                        log.info(f"'{component_fullname}' is already up to date")
+                # Read the component files into memory
+                component_snapshot = modules_repo.get_component_snapshot(component, self.component_type, version)
+                if component_snapshot is None:
+                    exit_value = False
                     continue
 
-            # Download component files
-            if not self.install_component_files(component, version, modules_repo, str(install_tmp_dir)):
-                exit_value = False
-                continue
-
-            if patch_relpath is not None:
-                patch_successful = self.try_apply_patch(
-                    component,
-                    modules_repo.repo_path,
-                    patch_relpath,
-                    component_dir,
-                    component_install_dir,
-                    write_file=False,
-                )
-                if patch_successful:
-                    log.info(f"{self.component_type[:-1].title()} '{component_fullname}' patched successfully")
-                else:
-                    log.warning(
-                        f"Failed to patch {self.component_type[:-1]} '{component_fullname}'. Will proceed with unpatched files."
-                    )
-                all_patches_successful &= patch_successful
-
-            if dry_run:
                 if patch_relpath is not None:
+                    component_snapshot, patch_successful = self.try_apply_patch_to_snapshot(
+                        component,
+                        modules_repo.repo_path,
+                        patch_relpath,
+                        component_dir,
+                        component_snapshot,
+                        write_file=False,
+                    )
                     if patch_successful:
-                        log.info("Current installation is compared against patched version in remote.")
+                        log.info(f"{self.component_type[:-1].title()} '{component_fullname}' patched successfully")
                     else:
-                        log.warning("Current installation is compared against unpatched version in remote.")
-                # Compute the diffs for the component
-                if self.save_diff_fn:
-                    log.info(
-                        f"Writing diff file for {self.component_type[:-1]} '{component_fullname}' to '{self.save_diff_fn}'"
-                    )
-                    try:
-                        ModulesDiffer.write_diff_file(
-                            self.save_diff_fn,
+                        log.warning(
+                            f"Failed to patch {self.component_type[:-1]} '{component_fullname}'. Will proceed with unpatched files."
+                        )
+                    all_patches_successful &= patch_successful
+
+                if dry_run:
+                    if patch_relpath is not None:
+                        if patch_successful:
+                            log.info("Current installation is compared against patched version in remote.")
+                        else:
+                            log.warning("Current installation is compared against unpatched version in remote.")
+                    # Compute the diffs for the component
+                    if self.save_diff_fn:
+                        log.info(
+                            f"Writing diff file for {self.component_type[:-1]} '{component_fullname}' to '{self.save_diff_fn}'"
+                        )
+                        try:
+                            ModulesDiffer.write_diff_file(
+                                self.save_diff_fn,
+                                component,
+                                modules_repo.repo_path,
+                                component_dir,
+                                component_snapshot,
+                                current_version,
+                                version,
+                                dsp_from_dir=component_dir,
+                                dsp_to_dir=component_dir,
+                            )
+                            updated.append(component)
+                        except UserWarning as e:
+                            if str(e) != "Module is unchanged":
+                                raise
+                            else:
+                                updated.append(component)
+                        recursive_update = True
+                        modules_to_update, subworkflows_to_update = self.get_components_to_update(component)
+                        if not silent and len(modules_to_update + subworkflows_to_update) > 0:
+                            log.warning(
+                                f"All modules and subworkflows linked to the updated {self.component_type[:-1]} will be added to the same diff file.\n"
+                                "It is advised to keep all your modules and subworkflows up to date.\n"
+                                "It is not guaranteed that a subworkflow will continue working as expected if all modules/subworkflows used in it are not up to date.\n"
+                            )
+                            if self.update_deps:
+                                recursive_update = True
+                            else:
+                                recursive_update = questionary.confirm(
+                                    "Would you like to continue adding all modules and subworkflows differences?",
+                                    default=True,
+                                    style=nf_core.utils.nfcore_question_style,
+                                ).unsafe_ask()
+                        if recursive_update and len(modules_to_update + subworkflows_to_update) > 0:
+                            # Write all the differences of linked components to a diff file
+                            self.update_linked_components(
+                                modules_to_update, subworkflows_to_update, updated, check_diff_exist=False
+                            )
+                            self.manage_changes_in_linked_components(
+                                component, modules_to_update, subworkflows_to_update
+                            )
+
+                    elif self.show_diff:
+                        ModulesDiffer.print_diff(
                             component,
                             modules_repo.repo_path,
                             component_dir,
-                            component_install_dir,
+                            component_snapshot,
                             current_version,
                             version,
                             dsp_from_dir=component_dir,
                             dsp_to_dir=component_dir,
                         )
-                        updated.append(component)
-                    except UserWarning as e:
-                        if str(e) != "Module is unchanged":
-                            raise
-                        else:
-                            updated.append(component)
-                    recursive_update = True
-                    modules_to_update, subworkflows_to_update = self.get_components_to_update(component)
-                    if not silent and len(modules_to_update + subworkflows_to_update) > 0:
-                        log.warning(
-                            f"All modules and subworkflows linked to the updated {self.component_type[:-1]} will be added to the same diff file.\n"
-                            "It is advised to keep all your modules and subworkflows up to date.\n"
-                            "It is not guaranteed that a subworkflow will continue working as expected if all modules/subworkflows used in it are not up to date.\n"
-                        )
-                        if self.update_deps:
-                            recursive_update = True
-                        else:
-                            recursive_update = questionary.confirm(
-                                "Would you like to continue adding all modules and subworkflows differences?",
-                                default=True,
-                                style=nf_core.utils.nfcore_question_style,
-                            ).unsafe_ask()
-                    if recursive_update and len(modules_to_update + subworkflows_to_update) > 0:
-                        # Write all the differences of linked components to a diff file
-                        self.update_linked_components(
-                            modules_to_update, subworkflows_to_update, updated, check_diff_exist=False
-                        )
-                        self.manage_changes_in_linked_components(component, modules_to_update, subworkflows_to_update)
 
-                elif self.show_diff:
-                    ModulesDiffer.print_diff(
-                        component,
-                        modules_repo.repo_path,
-                        component_dir,
-                        component_install_dir,
-                        current_version,
-                        version,
-                        dsp_from_dir=component_dir,
-                        dsp_to_dir=component_dir,
-                    )
+                        # Ask the user if they want to install the component
+                        dry_run = not questionary.confirm(
+                            f"Update {self.component_type[:-1]} '{component}'?",
+                            default=False,
+                            style=nf_core.utils.nfcore_question_style,
+                        ).unsafe_ask()
+
+                if not dry_run:
+                    # Replace the component files with the new ones
+                    self.install_component_snapshot(component, component_snapshot, modules_repo.repo_path, version)
+                    # Update modules.json with newly installed component
+                    self.modules_json.update(self.component_type, modules_repo, component, version, installed_by=None)
+                    updated.append(component)
+                    self.update_components_linked_to(component, updated, silent)
 
-                    # Ask the user if they want to install the component
-                    dry_run = not questionary.confirm(
-                        f"Update {self.component_type[:-1]} '{component}'?",
-                        default=False,
-                        style=nf_core.utils.nfcore_question_style,
-                    ).unsafe_ask()
-
-            if not dry_run:
-                # Clear the component directory and move the installed files there
-                self.move_files_from_tmp_dir(component, str(install_tmp_dir), modules_repo.repo_path, version)
-                # Update modules.json with newly installed component
-                self.modules_json.update(self.component_type, modules_repo, component, version, installed_by=None)
-                updated.append(component)
-                recursive_update = True
-                modules_to_update, subworkflows_to_update = self.get_components_to_update(component)
-                if not silent and len(modules_to_update + subworkflows_to_update) > 0:
-                    if not self.update_all:
-                        log.warning(
-                            f"All modules and subworkflows linked to the updated {self.component_type[:-1]} will be {'asked for update' if self.show_diff else 'automatically updated'}.\n"
-                            "It is advised to keep all your modules and subworkflows up to date.\n"
-                            "It is not guaranteed that a subworkflow will continue working as expected if all modules/subworkflows used in it are not up to date.\n"
-                        )
-                        if self.update_deps:
-                            recursive_update = True
-                        else:
-                            recursive_update = questionary.confirm(
-                                "Would you like to continue updating all modules and subworkflows?",
-                                default=True,
-                                style=nf_core.utils.nfcore_question_style,
-                            ).unsafe_ask()
-                if recursive_update and len(modules_to_update + subworkflows_to_update) > 0:
-                    # Update linked components
-                    self.update_linked_components(modules_to_update, subworkflows_to_update, updated)
-                    self.manage_changes_in_linked_components(component, modules_to_update, subworkflows_to_update)
+        else:
+            # Without previews, all updates are prepared first and then applied to the pipeline at once
+            update_plan = self.plan_updates(components_info)
+            exit_value, all_patches_successful = self.apply_update_plan(update_plan, updated, silent)
 
         if self.save_diff_fn:
             # Write the modules.json diff to the file
@@ -333,6 +321,318 @@ class ComponentUpdate(ComponentCommand):
 
         return exit_value
 
+    def update_components_linked_to(self, component, updated, silent=False):
+        """
+        Updates the modules and subworkflows linked to an updated module/subworkflow,
+        after asking the user unless all components are updated or '--update-deps' was given.
+
+        Args:
+            component (str): The name of the updated module/subworkflow
+            updated ([str]): The names of the components updated so far, extended in place
+            silent (bool): Whether this is an update of a linked component itself
+        """
+        recursive_update = True
+        modules_to_update, subworkflows_to_update = self.get_components_to_update(component)
+        if not silent and len(modules_to_update + subworkflows_to_update) > 0:
+            if not self.update_all:
+                log.warning(
+                    f"All modules and subworkflows linked to the updated {self.component_type[:-1]} will be {'asked for update' if self.show_diff else 'automatically updated'}.\n"
+                    "It is advised to keep all your modules and subworkflows up to date.\n"
+                    "It is not guaranteed that a subworkflow will continue working as expected if all modules/subworkflows used in it are not up to date.\n"
+                )
+                if self.update_deps:
+                    recursive_update = True
+                else:
+                    recursive_update = questionary.confirm(
+                        "Would you like to continue updating all modules and subworkflows?",
+                        default=True,
+                        style=nf_core.utils.nfcore_question_style,
+                    ).unsafe_ask()
+        if recursive_update and len(modules_to_update + subworkflows_to_update) > 0:
+            # Update linked components
+            self.update_linked_components(modules_to_update, subworkflows_to_update, updated)
+            self.manage_changes_in_linked_components(component, modules_to_update, subworkflows_to_update)
+
+    def plan_updates(self, components_info):
+        """
+        Works out which modules/subworkflows have to be updated and to which version.
+        This only reads the git data of the modules repositories, the pipeline is not changed.
+
+        Args:
+            components_info ([(ModulesRepo, str, str, str)]): The modules repository, name,
+                requested version and patch file of the components, see :meth:`get_all_components_info`
+
+        Returns:
+            ([dict]): The planned updates, with the keys 'component_type', 'modules_repo', 'component',
+            'current_version', 'version' and 'patch_relpath'
+        """
+        update_plan = []
+        for modules_repo, component, sha, patch_relpath in components_info:
+            if component is None:
+                # The entry from .nf-core.yml is set to false, skip update of this component
+                continue
+            component_fullname = str(Path(self.component_type, modules_repo.repo_path, component))
+            current_version = self.modules_json.get_component_version(
+                self.component_type, component, modules_repo.remote_url, modules_repo.repo_path
+            )
+            if sha is not None:
+                version = sha
+            else:
+                version = modules_repo.get_latest_component_version(component, self.component_type)
+
+            if current_version is not None and not self.force and current_version == version:
+                if self.sha:
+                    log.info(f"'{component_fullname}' is already installed at {version}")
+                else:
+                    log.info(f"'{component_fullname}' is already up to date")
+                continue
+
+            if patch_relpath is not None:
+                # Update outdated paths in the patch file now, before the patches are applied in parallel
+                self.check_patch_paths(Path(self.dir, patch_relpath), component)
+            log.debug(f"Planning to update '{component_fullname}' from {current_version} to {version}")
+            update_plan.append(
+                {
+                    "component_type": self.component_type,
+                    "modules_repo": modules_repo,
+                    "component": component,
+                    "current_version": current_version,
+                    "version": version,
+                    "patch_relpath": patch_relpath,
+                }
+            )
+        return update_plan
+
+    def plan_linked_updates(self, update_plan, updated, silent=False):
+        """
+        Adds the modules and subworkflows linked to the planned updates to the plan, so that they
+        are updated together with them. The user is asked first, unless all components are updated
+        or '--update-deps' was given.
+
+        Args:
+            update_plan ([dict]): The planned updates, see :meth:`plan_updates`, extended in place
+            updated ([str]): The names of the components updated so far
+            silent (bool): Whether this is an update of linked components
+
+        Returns:
+            ([(str, str, [str], [str])]): The type and name of each planned component with linked
+            components, and the names of the linked modules and subworkflows
+        """
+        planned = {(planned_update["component_type"], planned_update["component"]) for planned_update in update_plan}
+        # Only the components requested by the user ask for their linked components
+        n_requested = len(update_plan)
+        linked_components = []
+        # The plan grows while it is iterated, so the linked components of linked components are planned too
+        for index, planned_update in enumerate(update_plan):
+            component_type = planned_update["component_type"]
+            component = planned_update["component"]
+            original_component_type, original_update_all = self._change_component_type(component_type)
+            try:
+                modules_to_update, subworkflows_to_update = self.get_components_to_update(component)
+            finally:
+                self._reset_component_type(original_component_type, original_update_all)
+            if len(modules_to_update + subworkflows_to_update) == 0:
+                continue
+            if not silent and index < n_requested and not self.update_all:
+                log.warning(
+                    f"All modules and subworkflows linked to the updated {component_type[:-1]} will be automatically updated.\n"
+                    "It is advised to keep all your modules and subworkflows up to date.\n"
+                    "It is not guaranteed that a subworkflow will continue working as expected if all modules/subworkflows used in it are not up to date.\n"
+                )
+                if not self.update_deps:
+                    recursive_update = questionary.confirm(
+                        "Would you like to continue updating all modules and subworkflows?",
+                        default=True,
+                        style=nf_core.utils.nfcore_question_style,
+                    ).unsafe_ask()
+                    if not recursive_update:
+                        continue
+            linked_components.append((component_type, component, modules_to_update, subworkflows_to_update))
+
+            for linked_type, linked_names in [("subworkflows", subworkflows_to_update), ("modules", modules_to_update)]:
+                for linked_name in linked_names:
+                    if linked_name in updated or (linked_type, linked_name) in planned:
+                        continue
+                    planned.add((linked_type, linked_name))
+                    original_component_type, original_update_all = self._change_component_type(linked_type)
+                    try:
+                        update_plan += self.plan_updates([self.get_single_component_info(linked_name)])
+                    except LookupError as e:
+                        # If the module to be updated is not available, check if there has been a name change
+                        if linked_type == "modules" and "not found in list of available" in str(e):
+                            # Skip update, we check for name changes with manage_changes_in_linked_components
+                            pass
+                        else:
+                            raise
+                    finally:
+                        self._reset_component_type(original_component_type, original_update_all)
+        return linked_components
+
+    def stage_component_update(self, planned_update):
+        """
+        Reads the new version of a module/subworkflow into memory and applies
+        its patch file to it, without changing the pipeline or 'modules.json'
+
+        Args:
+            planned_update (dict): The planned update, see :meth:`plan_updates`
+
+        Returns:
+            (ComponentSnapshot | None, bool): The files of the new version, or None if they could not be read,
+            and whether the patch could be applied. The patch entry in 'modules.json' is added
+            when the update is committed, see :meth:`commit_component_updates`.
+        """
+        component_type = planned_update["component_type"]
+        modules_repo = planned_update["modules_repo"]
+        component = planned_update["component"]
+        component_snapshot = modules_repo.get_component_snapshot(component, component_type, planned_update["version"])
+        if component_snapshot is None:
+            return None, True
+
+        patch_successful = True
+        if planned_update["patch_relpath"] is not None:
+            component_fullname = str(Path(component_type, modules_repo.repo_path, component))
+            component_snapshot, patch_successful = self.patch_component_snapshot(
+                component_type,
+                component,
+                modules_repo.repo_path,
+                planned_update["patch_relpath"],
+                os.path.join(self.dir, component_type, modules_repo.repo_path, component),
+                component_snapshot,
+            )
+            if patch_successful:
+                log.info(f"{component_type[:-1].title()} '{component_fullname}' patched successfully")
+            else:
+                log.warning(
+                    f"Failed to patch {component_type[:-1]} '{component_fullname}'. Will proceed with unpatched files."
+                )
+        return component_snapshot, patch_successful
+
+    def apply_update_plan(self, update_plan, updated, silent=False):
+        """
+        Applies the planned updates to the pipeline, together with the updates of their linked components.
+
+        The new versions of all components are first read into memory and patched,
+        in parallel with more than one job. Then they replace the components in the
+        pipeline in one go, see :meth:`commit_component_updates`.
+
+        Args:
+            update_plan ([dict]): The planned updates, see :meth:`plan_updates`
+            updated ([str]): The names of the components updated so far, extended in place
+            silent (bool): Whether this is an update of linked components
+
+        Returns:
+            (bool, bool): Whether all components could be installed and whether all patches could be applied
+        """
+        linked_components = self.plan_linked_updates(update_plan, updated, silent)
+        if self.jobs > 1 and len(update_plan) > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                staged_updates = list(pool.map(self.stage_component_update, update_plan))
+        else:
+            staged_updates = [self.stage_component_update(planned_update) for planned_update in update_plan]
+
+        exit_value = all(component_snapshot is not None for component_snapshot, _ in staged_updates)
+        all_patches_successful = all(patch_successful for _, patch_successful in staged_updates)
+        installed_updates = [
+            (planned_update, component_snapshot, patch_successful)
+            for planned_update, (component_snapshot, patch_successful) in zip(update_plan, staged_updates)
+            if component_snapshot is not None
+        ]
+        self.commit_component_updates(installed_updates)
+
+        installed = set()
+        for planned_update, _, _ in installed_updates:
+            updated.append(planned_update["component"])
+            installed.add((planned_update["component_type"], planned_update["component"]))
+        # Install and remove the components that were added to or removed from the updated subworkflows
+        for component_type, component, modules_to_update, subworkflows_to_update in linked_components:
+            if (component_type, component) not in installed:
+                continue
+            original_component_type, original_update_all = self._change_component_type(component_type)
+            try:
+                self.manage_changes_in_linked_components(component, modules_to_update, subworkflows_to_update)
+            finally:
+                self._reset_component_type(original_component_type, original_update_all)
+        return exit_value, all_patches_successful
+
+    def commit_component_updates(self, installed_updates):
+        """
+        Replaces the modules/subworkflows in the pipeline with their new versions and writes
+        'modules.json' once. If this fails or is interrupted, the replaced components are restored
+        and 'modules.json' is left unchanged.
+
+        The old versions are moved to a '.nf-core-update-*' directory in the pipeline while the
+        components are replaced. If the process is killed, this directory is left behind, and it
+        is removed by the next update of the pipeline.
+
+        Args:
+            installed_updates ([(dict, ComponentSnapshot, bool)]): The planned updates, the files of the new
+                versions and whether their patch files could be applied
+        """
+        if not installed_updates:
+            return
+        for stale_backup_dir in Path(self.dir).glob(".nf-core-update-*"):
+            log.warning(f"Removing '{stale_backup_dir.name}' left behind by an interrupted update")
+            shutil.rmtree(stale_backup_dir, ignore_errors=True)
+        # The old versions are kept in the pipeline directory until all components were replaced,
+        # so that they can be restored by renaming them back
+        backup_dir = Path(tempfile.mkdtemp(prefix=".nf-core-update-", dir=self.dir))
+        replaced = []
+        try:
+            for index, (planned_update, component_snapshot, _) in enumerate(installed_updates):
+                component_type = planned_update["component_type"]
+                component = planned_update["component"]
+                repo_path = planned_update["modules_repo"].repo_path
+                pipeline_path = Path(self.dir, component_type, repo_path, component)
+                backup_path = Path(backup_dir, str(index))
+                if pipeline_path.exists():
+                    log.debug(f"Removing old version of {component_type[:-1]} '{component}'")
+                    os.rename(pipeline_path, backup_path)
+                else:
+                    log.debug(f"Creating new {component_type[:-1]} '{component}' in '{component_type}/{repo_path}'")
+                replaced.append((pipeline_path, backup_path))
+                pipeline_path.mkdir(parents=True)
+                component_snapshot.write(pipeline_path)
+                # Keep the config files of the current version
+                for config_file in backup_path.glob("*.config"):
+                    if config_file.is_file():
+                        log.debug(f"Moving '{component}/{config_file.name}' to updated component")
+                        shutil.copy2(config_file, pipeline_path / config_file.name)
+                log.info(f"Updating '{repo_path}/{component}'")
+                log.debug(
+                    f"Updating {component_type[:-1]} '{component}' to {planned_update['version']} from {repo_path}"
+                )
+
+            for planned_update, _, patch_successful in installed_updates:
+                modules_repo = planned_update["modules_repo"]
+                self.modules_json.update(
+                    planned_update["component_type"],
+                    modules_repo,
+                    planned_update["component"],
+                    planned_update["version"],
+                    installed_by=None,
+                    write_file=False,
+                )
+                if planned_update["patch_relpath"] is not None and patch_successful:
+                    self.modules_json.add_patch_entry(
+                        planned_update["component"],
+                        modules_repo.remote_url,
+                        modules_repo.repo_path,
+                        planned_update["patch_relpath"],
+                        write_file=False,
+                    )
+            self.modules_json.dump()
+        except BaseException:
+            log.warning("Restoring the components that were already updated")
+            for pipeline_path, backup_path in reversed(replaced):
+                if pipeline_path.exists():
+                    shutil.rmtree(pipeline_path)
+                if backup_path.exists():
+                    os.rename(backup_path, pipeline_path)
+            self.modules_json.load()
+            raise
+        finally:
+            shutil.rmtree(backup_dir, ignore_errors=True)
+
     def get_single_component_info(self, component):
         """Collects the modules repository, version and sha for a component.
 
@@ -737,18 +1037,32 @@ class ComponentUpdate(ComponentCommand):
             new_version (str): The version of the module/subworkflow that was installed.
         """
         temp_component_dir = Path(install_folder, component)
-        files = [file_path for file_path in temp_component_dir.rglob("*") if file_path.is_file()]
+        self.install_component_snapshot(
+            component, ComponentSnapshot.from_dir(temp_component_dir), repo_path, new_version
+        )
+        shutil.rmtree(temp_component_dir)
+
+    def install_component_snapshot(
+        self, component: str, component_snapshot: ComponentSnapshot, repo_path: str, new_version: str
+    ) -> None:
+        """Replace the files of a module/subworkflow in the pipeline with a snapshot of its new version.
+        The '*.config' files of the current version are kept.
+
+        Args:
+            component (str): The module/subworkflow name.
+            component_snapshot (ComponentSnapshot): The files of the new version.
+            repo_path (str): The name of the directory where modules/subworkflows are installed
+            new_version (str): The version of the module/subworkflow that was installed.
+        """
         pipeline_path = Path(self.dir, self.component_type, repo_path, component)
 
+        config_files = {}
         if pipeline_path.exists():
-            pipeline_files = [f.name for f in pipeline_path.iterdir() if f.is_file()]
             # check if any *.config file exists in the pipeline
-            config_files = [f for f in pipeline_files if str(f).endswith(".config")]
-            for config_file in config_files:
-                log.debug(f"Moving '{component}/{config_file}' to updated component")
-                shutil.move(pipeline_path / config_file, temp_component_dir / config_file)
-                files.append(temp_component_dir / config_file)
-
+            for config_file in pipeline_path.glob("*.config"):
+                if config_file.is_file():
+                    log.debug(f"Moving '{component}/{config_file.name}' to updated component")
+                    config_files[config_file.name] = config_file.read_bytes()
         else:
             log.debug(f"Creating new {self.component_type[:-1]} '{component}' in '{self.component_type}/{repo_path}'")
 
@@ -756,14 +1070,9 @@ class ComponentUpdate(ComponentCommand):
         self.clear_component_dir(component, str(pipeline_path))
 
         pipeline_path.mkdir(parents=True, exist_ok=True)
-        for file in files:
-            file = file.relative_to(temp_component_dir)
-            path = Path(temp_component_dir, file)
-            if path.exists():
-                log.debug(f"Moving '{file}' to updated component")
-                dest = Path(pipeline_path, file)
-                dest.parent.mkdir(parents=True, exist_ok=True)
-                shutil.move(path, dest)
+        component_snapshot.write(pipeline_path)
+        for config_name, config_content in config_files.items():
+            Path(pipeline_path, config_name).write_bytes(config_content)
 
         log.info(f"Updating '{repo_path}/{component}'")
         log.debug(f"Updating {self.component_type[:-1]} '{component}' to {new_version} from {repo_path}")
@@ -786,62 +1095,99 @@ class ComponentUpdate(ComponentCommand):
         Returns:
             (bool): Whether the patch application was successful
         """
+        component_snapshot, patch_successful = self.try_apply_patch_to_snapshot(
+            component,
+            repo_path,
+            patch_relpath,
+            component_dir,
+            ComponentSnapshot.from_dir(component_install_dir),
+            write_file=write_file,
+        )
+        component_snapshot.write(component_install_dir)
+        return patch_successful
+
+    def try_apply_patch_to_snapshot(
+        self, component, repo_path, patch_relpath, component_dir, component_snapshot, write_file=True
+    ):
+        """
+        Try applying a patch file to the new module/subworkflow files in memory
+
+        Args:
+            component (str): The name of the module/subworkflow
+            repo_path (str): The name of the repository where the module/subworkflow resides
+            patch_relpath (Path | str): The path to patch file in the pipeline
+            component_dir (Path | str): The module/subworkflow directory in the pipeline
+            component_snapshot (ComponentSnapshot): The files of the new version of the module/subworkflow
+
+        Returns:
+            (ComponentSnapshot, bool): The files of the new version with the patch applied and the regenerated
+            patch file, or with the old patch file if the patch could not be applied, and whether the patch
+            application was successful
+        """
+        patched_snapshot, patch_successful = self.patch_component_snapshot(
+            self.component_type, component, repo_path, patch_relpath, component_dir, component_snapshot
+        )
+        if patch_successful:
+            # Add the patch file to the modules.json file
+            self.modules_json.add_patch_entry(
+                component, self.modules_repo.remote_url, repo_path, patch_relpath, write_file=write_file
+            )
+        return patched_snapshot, patch_successful
+
+    def patch_component_snapshot(
+        self, component_type, component, repo_path, patch_relpath, component_dir, component_snapshot
+    ):
+        """
+        Apply a patch file to the new module/subworkflow files in memory, without changing 'modules.json'.
+        This can run for several components in parallel.
+
+        Args:
+            component_type (str): modules or subworkflows
+            component (str): The name of the module/subworkflow
+            repo_path (str): The name of the repository where the module/subworkflow resides
+            patch_relpath (Path | str): The path to patch file in the pipeline
+            component_dir (Path | str): The module/subworkflow directory in the pipeline
+            component_snapshot (ComponentSnapshot): The files of the new version of the module/subworkflow
+
+        Returns:
+            (ComponentSnapshot, bool): See :meth:`try_apply_patch_to_snapshot`
+        """
         component_fullname = str(Path(repo_path, component))
-        log.info(f"Found patch for  {self.component_type[:-1]} '{component_fullname}'. Trying to apply it to new files")
+        log.info(f"Found patch for  {component_type[:-1]} '{component_fullname}'. Trying to apply it to new files")
 
         patch_path = Path(self.dir / patch_relpath)
-        component_relpath = Path(self.component_type, repo_path, component)
+        patch_file = patch_path.relative_to(component_dir)
+        component_relpath = Path(component_type, repo_path, component)
 
         # Check that paths in patch file are updated
         self.check_patch_paths(patch_path, component)
 
-        # Copy the installed files to a new temporary directory to save them for later use
-        temp_dir = Path(tempfile.mkdtemp())
-        temp_component_dir = temp_dir / component
-        shutil.copytree(component_install_dir, temp_component_dir)
-
         try:
-            new_files = ModulesDiffer.try_apply_patch(component, repo_path, patch_path, temp_component_dir)
+            patched_snapshot = ModulesDiffer.try_apply_patch_to_snapshot(
+                component, repo_path, patch_path, component_snapshot
+            )
         except LookupError:
-            # Patch failed. Save the patch file by moving to the install dir
-            shutil.move(patch_path, Path(component_install_dir, patch_path.relative_to(component_dir)))
+            # Patch failed. Save the patch file by adding it to the new files
             log.warning(
-                f"Failed to apply patch for {self.component_type[:-1]} '{component_fullname}'. You will have to apply the patch manually"
+                f"Failed to apply patch for {component_type[:-1]} '{component_fullname}'. You will have to apply the patch manually"
             )
-            return False
-
-        # Write the patched files to a temporary directory
-        log.debug("Writing patched files")
-        for file, new_content in new_files.items():
-            fn = temp_component_dir / file
-            with open(fn, "w") as fh:
-                fh.writelines(new_content)
+            component_snapshot = component_snapshot.copy()
+            component_snapshot.files[str(patch_file)] = patch_path.read_bytes()
+            return component_snapshot, False
 
         # Create the new patch file
         log.debug("Regenerating patch file")
-        ModulesDiffer.write_diff_file(
-            Path(temp_component_dir, patch_path.relative_to(component_dir)),
+        patch_text = ModulesDiffer.get_diff_text(
             component,
             repo_path,
-            component_install_dir,
-            temp_component_dir,
-            file_action="w",
+            component_snapshot,
+            patched_snapshot,
             for_git=False,
             dsp_from_dir=component_relpath,
             dsp_to_dir=component_relpath,
         )
-
-        # Move the patched files to the install dir
-        log.debug("Overwriting installed files installed files  with patched files")
-        shutil.rmtree(component_install_dir)
-        shutil.copytree(temp_component_dir, component_install_dir)
-
-        # Add the patch file to the modules.json file
-        self.modules_json.add_patch_entry(
-            component, self.modules_repo.remote_url, repo_path, patch_relpath, write_file=write_file
-        )
-
-        return True
+        patched_snapshot = patched_snapshot.with_lines({patch_file: [patch_text]})
+        return patched_snapshot, True
 
     def get_components_to_update(self, component):
         """
@@ -1,7 +1,9 @@
 """Downloads a nf-core pipeline to the local file system."""
 
 import concurrent.futures
+import hashlib
 import io
+import json
 import logging
 import os
 import re
@@ -9,9 +11,10 @@ import shutil
 import subprocess
 import tarfile
 import textwrap
+import threading
 from datetime import datetime
 from typing import List, Optional, Tuple
-from zipfile import ZipFile
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
 
 import git
 import questionary
@@ -33,6 +36,70 @@ from nf_core.utils import (
 )
 
 log = logging.getLogger(__name__)
+
+# File recording the singularity images downloaded to a directory
+SINGULARITY_IMAGE_MANIFEST = ".nf-core-singularity-images.json"
+# Linux ioctl request to clone a file with copy-on-write (reflink)
+FICLONE = 0x40049409
+# Manifest media types accepted when checking if an image exists in a registry
+REGISTRY_MANIFEST_MEDIA_TYPES = ", ".join(
+    [
+        "application/vnd.docker.distribution.manifest.v2+json",
+        "application/vnd.docker.distribution.manifest.list.v2+json",
+        "application/vnd.oci.image.manifest.v1+json",
+        "application/vnd.oci.image.index.v1+json",
+    ]
+)
+# Thanks Stack Overflow for the regex: https://stackoverflow.com/a/3809435/713980
+CONTAINER_URL_REGEX = (
+    r"https?:\/\/(www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b([-a-zA-Z0-9()@:%_\+.~#?&//=]*)"
+)
+# Thanks Stack Overflow for the regex: https://stackoverflow.com/a/39672069/713980
+CONTAINER_DOCKER_REGEX = r"^(?:(?=[^:\/]{1,253})(?!-)[a-zA-Z0-9-]{1,63}(?<!-)(?:\.(?!-)[a-zA-Z0-9-]{1,63}(?<!-))*(?::[0-9]{1,5})?/)?((?![._-])(?:[a-z0-9._-]*)(?<![._-])(?:/(?![._-])[a-z0-9._-]*(?<![._-]))*)(?::(?![.-])[a-zA-Z0-9_.-]{1,128})?$"
+# No need to distinguish between the two, because direct downloads are later prioritized over Docker URIs.
+CONTAINER_URI_REGEX = re.compile(f"{CONTAINER_URL_REGEX}|{CONTAINER_DOCKER_REGEX}", re.S)
+# Groovy code, as far as needed to find container directives.
+# String literals without quotes or braces in their interpolations are matched as a whole,
+# any other string literal is lexed from its opening quote.
+GROOVY_COMMENT_PATTERN = r"//[^\n]*|/\*.*?(?:\*/|\Z)"
+GROOVY_STRING_PATTERN = (
+    r"'''(?:[^\\']|\\.|'(?!''))*'''|'(?:[^\\'\n]|\\.)*'"
+    r'|"""(?:[^\\"$]|\\.|"(?!"")|\$(?!\{)|\$\{[^{}\'"]*\})*"""'
+    r'|"(?:[^\\"$\n]|\\.|\$(?!\{)|\$\{[^{}\'"]*\})*"'
+)
+GROOVY_IDENT_PATTERN = r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*"
+# Finds the container directives, the processes and the script sections, skipping over comments and string literals
+GROOVY_SCAN_REGEX = re.compile(
+    rf"(?P<comment>{GROOVY_COMMENT_PATTERN})"
+    rf"|(?P<string>{GROOVY_STRING_PATTERN})"
+    r"|(?P<quote>'''|\"\"\"|'|\")"
+    r"|(?P<container>container)(?<![\w.$]container)\b"
+    r"|(?P<process>process)(?<![\w.$]process)\b"
+    r"|(?P<script>(?<![\w.$])(?:script|shell|exec|stub)\s*:(?!:))",
+    re.S,
+)
+# Tokens of Groovy code, whitespace and comments are skipped
+GROOVY_TOKEN_REGEX = re.compile(
+    rf"(?:\s+|{GROOVY_COMMENT_PATTERN})*"
+    rf"(?:(?P<string>{GROOVY_STRING_PATTERN})"
+    r"|(?P<quote>'''|\"\"\"|'|\")"
+    rf"|(?P<ident>{GROOVY_IDENT_PATTERN})"
+    r"|(?P<open>[{(\[])"
+    r"|(?P<close>[})\]])"
+    r"|(?P<op>\?:|==|!=|<=|>=|&&|\|\||[=!<>&|?:+\-*%,;])"
+    r"|(?P<other>.)"
+    r"|(?P<end>\Z))",
+    re.S,
+)
+# Characters that end the literal text of a Groovy string, by opening quote
+GROOVY_STRING_SPECIAL_REGEX = {
+    "'": re.compile(r"[\\']"),
+    "'''": re.compile(r"[\\']"),
+    '"': re.compile(r'[\\"$]'),
+    '"""': re.compile(r'[\\"$]'),
+}
+GROOVY_IDENT_REGEX = re.compile(GROOVY_IDENT_PATTERN)
+
 stderr = rich.console.Console(
     stderr=True,
     style="dim",
@@ -99,9 +166,18 @@ class DownloadWorkflow:
         container_library (List[str]): The container libraries (registries) to use. Defaults to None.
         container_cache_utilisation (str): If a local or remote cache of already existing container images should be considered. Defaults to None.
         container_cache_index (str): An index for the remote container cache. Defaults to None.
-        parallel_downloads (int): The number of parallel downloads to use. Defaults to 4.
+        parallel_downloads (int): The number of parallel downloads and pulls to use. Defaults to 4.
+        container_cache_placement (str): How to place images from the `NXF_SINGULARITY_CACHEDIR` in the output directory:
+            "copy", "hardlink", "reflink" or "symlink". Falls back to copying where this is not possible. Defaults to "copy".
+        download_chunk_size (int): The size of the chunks in which images are downloaded. Defaults to 4 MiB.
+        hardlink_revisions (bool): Replace files that are identical between the downloaded revisions by hardlinks.
+            Writing to such a file changes it in all revisions. Defaults to False.
     """
 
+    # The image manifests and the container libraries are shared by the download threads
+    manifest_lock = threading.Lock()
+    container_library_lock = threading.Lock()
+
     def __init__(
         self,
         pipeline=None,
@@ -117,6 +193,9 @@ class DownloadWorkflow:
         container_cache_utilisation=None,
         container_cache_index=None,
         parallel_downloads=4,
+        container_cache_placement="copy",
+        download_chunk_size=4 * 1024 * 1024,
+        hardlink_revisions=False,
     ):
         self.pipeline = pipeline
         if isinstance(revision, str):
@@ -159,6 +238,9 @@ class DownloadWorkflow:
         self.container_cache_index = container_cache_index
         # allows to specify a container library / registry or a respective mirror to download images from
         self.parallel_downloads = parallel_downloads
+        self.container_cache_placement = container_cache_placement
+        self.download_chunk_size = download_chunk_size
+        self.hardlink_revisions = hardlink_revisions
 
         self.wf_revisions = {}
         self.wf_branches = {}
@@ -167,6 +249,8 @@ class DownloadWorkflow:
         self.nf_config = {}
         self.containers = []
         self.containers_remote = []  # stores the remote images provided in the file.
+        self.containers_processed = set()  # images already handled for a previous revision
+        self.module_containers = {}  # container images of module files, by sha256 of the file contents
 
         # Fetch remote workflows
         self.wfs = nf_core.list.Workflows()
@@ -267,8 +351,10 @@ class DownloadWorkflow:
         # Download the pipeline files for each selected revision
         log.info("Downloading workflow files from GitHub")
 
+        revision_dirnames = {}
         for item in zip(self.revision, self.wf_sha.values(), self.wf_download_url.values()):
             revision_dirname = self.download_wf_files(revision=item[0], wf_sha=item[1], download_url=item[2])
+            revision_dirnames[item[0]] = revision_dirname
 
             if self.include_configs:
                 try:
@@ -276,13 +362,23 @@ class DownloadWorkflow:
                 except FileNotFoundError as e:
                     raise DownloadError("Error editing pipeline config file to use local configs!") from e
 
-            # Collect all required singularity images
-            if self.container_system == "singularity":
+        # Files that did not change between the revisions are only stored once
+        if self.hardlink_revisions and len(revision_dirnames) > 1:
+            self.deduplicate_revision_files(list(revision_dirnames.values()))
+
+        # Collect all required singularity images
+        if self.container_system == "singularity":
+            # Resolve the configs of all revisions in one go, revisions with the same config are only resolved once
+            nf_core.utils.fetch_wf_configs(
+                [os.path.join(self.outdir, revision_dirname) for revision_dirname in revision_dirnames.values()]
+            )
+
+            for revision, revision_dirname in revision_dirnames.items():
                 self.find_container_images(os.path.join(self.outdir, revision_dirname))
                 self.gather_registries(os.path.join(self.outdir, revision_dirname))
 
                 try:
-                    self.get_singularity_images(current_revision=item[0])
+                    self.get_singularity_images(current_revision=revision)
                 except OSError as e:
                     raise DownloadError(f"[red]{e}[/]") from e
 
@@ -609,6 +705,7 @@ class DownloadWorkflow:
                     "none",
                     "tar.gz",
                     "tar.bz2",
+                    "tar.zst",
                     "zip",
                 ],
                 style=nf_core.utils.nfcore_question_style,
@@ -618,6 +715,10 @@ class DownloadWorkflow:
         if self.compress_type == "none":
             self.compress_type = None
 
+        # Fail before downloading anything if the archive cannot be created
+        if self.compress_type == "tar.zst" and self.find_parallel_compressor("zst") is None:
+            raise AssertionError("'zstd' is needed to create '.tar.zst' archives, but it is not in $PATH")
+
     def download_wf_files(self, revision, wf_sha, download_url):
         """Downloads workflow files from GitHub to the :attr:`self.outdir`."""
         log.debug(f"Downloading {download_url}")
@@ -697,6 +798,55 @@ class DownloadWorkflow:
         with open(nfconfig_fn, "w") as nfconfig_fh:
             nfconfig_fh.write(nfconfig)
 
+    def deduplicate_revision_files(self, revision_dirnames):
+        """Replace files that are identical to the same file of a previous revision by hardlinks.
+
+        Must only be run once the revisions will no longer be edited, since writing to
+        a hardlinked file changes it in all revisions.
+
+        Args:
+            revision_dirnames (list): Directory names of the downloaded revisions in :attr:`self.outdir`
+        """
+        # relative file path -> [(size, md5, path of the first copy)]
+        seen_files = {}
+        n_linked = 0
+        for revision_dirname in revision_dirnames:
+            revision_dir = os.path.join(self.outdir, revision_dirname)
+            for dirpath, _, filelist in os.walk(revision_dir):
+                for fname in filelist:
+                    file_path = os.path.join(dirpath, fname)
+                    if os.path.islink(file_path):
+                        continue
+                    rel_path = os.path.relpath(file_path, revision_dir)
+                    size = os.path.getsize(file_path)
+                    candidates = seen_files.setdefault(rel_path, [])
+                    # Only hash files that could possibly have a copy
+                    if not any(candidate_size == size for candidate_size, _, _ in candidates):
+                        candidates.append((size, None, file_path))
+                        continue
+                    md5 = nf_core.utils.file_md5(file_path)
+                    for i, (candidate_size, candidate_md5, candidate_path) in enumerate(candidates):
+                        if candidate_size != size:
+                            continue
+                        if candidate_md5 is None:
+                            candidate_md5 = nf_core.utils.file_md5(candidate_path)
+                            candidates[i] = (candidate_size, candidate_md5, candidate_path)
+                        if candidate_md5 == md5:
+                            try:
+                                tmp_path = f"{file_path}.nf-core-link"
+                                os.link(candidate_path, tmp_path)
+                                os.replace(tmp_path, file_path)
+                                n_linked += 1
+                            except OSError as e:
+                                # e.g. file systems without hardlinks, keep the copy
+                                if os.path.exists(tmp_path):
+                                    os.remove(tmp_path)
+                                log.debug(f"Could not hardlink '{file_path}' to '{candidate_path}': {e}")
+                            break
+                    else:
+                        candidates.append((size, md5, file_path))
+        log.debug(f"Replaced {n_linked} files that were identical across revisions by hardlinks")
+
     def find_container_images(self, workflow_directory):
         """Find container image names for workflow.
 
@@ -752,44 +902,62 @@ class DownloadWorkflow:
         config_findings = self.rectify_raw_container_matches(config_findings[:])
 
         # Recursive search through any DSL2 module files for container spec lines.
-        for subdir, _, files in os.walk(os.path.join(workflow_directory, "modules")):
-            for file in files:
-                if file.endswith(".nf"):
-                    file_path = os.path.join(subdir, file)
-                    with open(file_path) as fh:
-                        # Look for any lines with container "xxx" or container 'xxx'
-                        search_space = fh.read()
-                        """
-                        Figure out which quotes were used and match everything until the closing quote.
-                        Since the other quote typically appears inside, a simple r"container\\s*[\"\']([^\"\']*)[\"\']" unfortunately abridges the matches.
-
-                        container\\s+[\\s{}$=]* matches the literal word "container" followed by whitespace, brackets, equal or variable names.
-                        (?P<quote>[\'\"]) The quote character is captured into the quote group \1.
-                        The pattern (?:.(?!\1))*.? is used to match any character (.) not followed by the closing quote character (?!\1).
-                        This capture happens greedy *, but we add a .? to ensure that we don't match the whole file until the last occurrence
-                        of the closing quote character, but rather stop at the first occurrence. \1 inserts the matched quote character into the regex, either " or '.
-                        It may be followed by whitespace or closing bracket [\\s}]*
-                        re.DOTALL is used to account for the string to be spread out across multiple lines.
-                        """
-                        container_regex = re.compile(
-                            r"container\s+[\\s{}=$]*(?P<quote>[\'\"])(?P<param>(?:.(?!\1))*.?)\1[\\s}]*",
-                            re.DOTALL,
-                        )
+        module_files = [
+            os.path.join(subdir, file)
+            for subdir, _, files in os.walk(os.path.join(workflow_directory, "modules"))
+            for file in files
+            if file.endswith(".nf")
+        ]
+        for module_file in module_files:
+            module_findings += self.find_module_file_container_images(module_file)
 
-                        local_module_findings = re.findall(container_regex, search_space)
+        # Again clean list, in case config declares Docker URI but module or previous finding already had the http:// download
+        self.containers = self.prioritize_direct_download(previous_findings + config_findings + module_findings)
 
-                        # finding fill always be a tuple of length 2, first the quote used and second the enquoted value.
-                        for finding in local_module_findings:
-                            # append finding since we want to collect them from all modules
-                            # also append search_space because we need to start over later if nothing was found.
-                            module_findings.append(finding + (search_space, file_path))
+    def find_module_file_container_images(self, file_path):
+        """Find the container images declared in a DSL2 module file.
 
-        # Not sure if there will ever be multiple container definitions per module, but beware DSL3.
-        # Like above run on shallow copy, because length may change at runtime.
-        module_findings = self.rectify_raw_container_matches(module_findings[:])
+        Modules are often identical across revisions, so the images are cached by the sha256 of the file contents.
 
-        # Again clean list, in case config declares Docker URI but module or previous finding already had the http:// download
-        self.containers = self.prioritize_direct_download(previous_findings + config_findings + module_findings)
+        Args:
+            file_path (str): Path to the module file
+
+        Returns:
+            list: The container images of the module
+        """
+        with open(file_path) as fh:
+            search_space = fh.read()
+        content_hash = hashlib.sha256(search_space.encode()).hexdigest()
+        if content_hash not in self.module_containers:
+            self.module_containers[content_hash] = self.find_module_container_images(search_space, file_path)
+        return self.module_containers[content_hash]
+
+    def find_module_container_images(self, search_space, file_path):
+        """Find the container images declared in the contents of a single DSL2 module file.
+
+        See :meth:`rectify_raw_container_matches` for the supported syntax. Declarations with
+        multiple images, e.g. ternaries on ``workflow.containerEngine`` or old DSL2 ``if`` blocks,
+        yield all of them, and direct downloads are prioritized afterwards.
+
+        Args:
+            search_space (str): The contents of the module file
+            file_path (str): Path to the module file, used for error messages
+
+        Returns:
+            list: The container images of the module
+        """
+        module_findings = []
+        for directive in ContainerDirectiveParser(search_space).directives:
+            valid_containers = [match.group(0) for match in map(CONTAINER_URI_REGEX.match, directive.images) if match]
+            if valid_containers:
+                module_findings += valid_containers
+            else:
+                # all implemented options exhausted. Nothing left to be done:
+                log.error(
+                    f"[red]Cannot parse container string in '{file_path}':\n\n{textwrap.indent(directive.source, '    ')}\n\n:warning: Skipping this singularity image."
+                )
+
+        return self.prioritize_direct_download(module_findings)
 
     def rectify_raw_container_matches(self, raw_findings):
         """Helper function to rectify the raw extracted container matches into fully qualified container names.
@@ -834,16 +1002,6 @@ class DownloadWorkflow:
         """
         cleaned_matches = []
 
-        # Thanks Stack Overflow for the regex: https://stackoverflow.com/a/3809435/713980
-        url_regex = (
-            r"https?:\/\/(www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b([-a-zA-Z0-9()@:%_\+.~#?&//=]*)"
-        )
-        # Thanks Stack Overflow for the regex: https://stackoverflow.com/a/39672069/713980
-        docker_regex = r"^(?:(?=[^:\/]{1,253})(?!-)[a-zA-Z0-9-]{1,63}(?<!-)(?:\.(?!-)[a-zA-Z0-9-]{1,63}(?<!-))*(?::[0-9]{1,5})?/)?((?![._-])(?:[a-z0-9._-]*)(?<![._-])(?:/(?![._-])[a-z0-9._-]*(?<![._-]))*)(?::(?![.-])[a-zA-Z0-9_.-]{1,128})?$"
-
-        # at this point, we don't have to distinguish anymore, because we will later prioritize direct downloads over Docker URIs.
-        either_url_or_docker = re.compile(f"{url_regex}|{docker_regex}", re.S)
-
         for _, container_value, search_space, file_path in raw_findings:
             """
             Now we need to isolate all container paths (typically quoted strings) from the raw container_value
@@ -881,7 +1039,7 @@ class DownloadWorkflow:
             or a plain URL like in the old DSL2 convention
 
             """
-            direct_match = re.match(either_url_or_docker, container_value.strip())
+            direct_match = CONTAINER_URI_REGEX.match(container_value.strip())
             if direct_match:
                 cleaned_matches.append(direct_match.group(0))
                 continue  # oh yes, that was plain sailing
@@ -916,7 +1074,7 @@ class DownloadWorkflow:
             At this point, we just add everything that is either a URL or a Docker URI to cleaned matches.
             """
 
-            valid_containers = list(filter(either_url_or_docker.match, container_value_defs))
+            valid_containers = list(filter(CONTAINER_URI_REGEX.match, container_value_defs))
 
             if valid_containers:
                 cleaned_matches = cleaned_matches + valid_containers
@@ -1067,17 +1225,24 @@ class DownloadWorkflow:
     def get_singularity_images(self, current_revision: str = "") -> None:
         """Loop through container names and download Singularity images"""
 
+        # Images handled for a previous revision are in place already, only process the difference
+        containers_new = [container for container in self.containers if container not in self.containers_processed]
+
         if len(self.containers) == 0:
             log.info("No container names found in workflow")
+        elif len(containers_new) == 0:
+            log.info(
+                f"Processing workflow revision {current_revision}, all {len(self.containers)} container image{'s' if len(self.containers) > 1 else ''} were already processed for a previous revision."
+            )
         else:
             log.info(
-                f"Processing workflow revision {current_revision}, found {len(self.containers)} container image{'s' if len(self.containers) > 1 else ''} in total."
+                f"Processing workflow revision {current_revision}, found {len(self.containers)} container image{'s' if len(self.containers) > 1 else ''} in total, {len(containers_new)} not processed yet."
             )
 
             with DownloadProgress() as progress:
                 task = progress.add_task(
                     "Collecting container images",
-                    total=len(self.containers),
+                    total=len(containers_new),
                     progress_type="summary",
                 )
 
@@ -1086,7 +1251,7 @@ class DownloadWorkflow:
                 containers_cache: List[Tuple[str, str, Optional[str]]] = []
                 containers_download: List[Tuple[str, str, Optional[str]]] = []
                 containers_pull: List[Tuple[str, str, Optional[str]]] = []
-                for container in self.containers:
+                for container in containers_new:
                     # Fetch the output and cached filenames for this container
                     out_path, cache_path = self.singularity_image_filenames(container)
 
@@ -1175,53 +1340,225 @@ class DownloadWorkflow:
                             # Re-raise exception on the main thread
                             raise
 
-                    for containers in containers_pull:
+                if containers_pull:
+                    # Find out which registries have the images before spending time on pulls that will fail
+                    progress.update(task, description="Checking container libraries for images")
+                    viable_pulls = self.preflight_container_pulls(containers_pull)
+                    progress.update(task, advance=len(containers_pull) - len(viable_pulls))
+
+                    with concurrent.futures.ThreadPoolExecutor(max_workers=self.parallel_downloads) as pool:
                         progress.update(task, description="Pulling singularity images")
-                        # it is possible to try multiple registries / mirrors if multiple were specified.
-                        # Iteration happens over a copy of self.container_library[:], as I want to be able to remove failing registries for subsequent images.
-                        for library in self.container_library[:]:
-                            try:
-                                self.singularity_pull_image(*containers, library, progress)
-                                # Pulling the image was successful, no ContainerError was raised, break the library loop
-                                break
-                            except ContainerError.ImageExistsError:
-                                # Pulling not required
-                                break
-                            except ContainerError.RegistryNotFoundError as e:
-                                self.container_library.remove(library)
-                                # The only library was removed
-                                if not self.container_library:
-                                    log.error(e.message)
-                                    log.error(e.helpmessage)
-                                    raise OSError from e
-                                else:
-                                    # Other libraries can be used
-                                    continue
-                            except ContainerError.ImageNotFoundError as e:
-                                # Try other registries
-                                if e.error_log.absolute_URI:
-                                    break  # there no point in trying other registries if absolute URI was specified.
-                                else:
-                                    continue
-                            except ContainerError.InvalidTagError:
-                                # Try other registries
-                                continue
-                            except ContainerError.OtherError as e:
-                                # Try other registries
-                                log.error(e.message)
-                                log.error(e.helpmessage)
-                                if e.error_log.absolute_URI:
-                                    break  # there no point in trying other registries if absolute URI was specified.
-                                else:
-                                    continue
-                        else:
-                            # The else clause executes after the loop completes normally.
-                            # This means the library loop completed without breaking, indicating failure for all libraries (registries)
-                            log.error(
-                                f"Not able to pull image of {containers}. Service might be down or internet connection is dead."
+
+                        # Kick off concurrent pulls, each with its own progress row
+                        future_pulls = [
+                            pool.submit(
+                                self.singularity_pull_image_from_libraries,
+                                container,
+                                out_path,
+                                cache_path,
+                                progress,
+                                libraries,
                             )
-                        # Task should advance in any case. Failure to pull will not kill the download process.
-                        progress.update(task, advance=1)
+                            for container, out_path, cache_path, libraries in viable_pulls
+                        ]
+
+                        try:
+                            for future in concurrent.futures.as_completed(future_pulls):
+                                future.result()
+                                # Task should advance in any case. Failure to pull will not kill the download process.
+                                progress.update(task, advance=1)
+
+                        except (KeyboardInterrupt, OSError):
+                            # Cancel the pulls that haven't started yet
+                            for future in future_pulls:
+                                future.cancel()
+                            raise
+
+            self.containers_processed.update(containers_new)
+
+    def singularity_pull_image_from_libraries(
+        self,
+        container: str,
+        out_path: str,
+        cache_path: Optional[str],
+        progress: DownloadProgress,
+        libraries: Optional[List[str]] = None,
+    ) -> None:
+        """Pull a singularity image, trying the container libraries (registries) in turn.
+
+        Libraries that turn out not to exist are removed from ``self.container_library``
+        for all images. This may run for several images in parallel.
+
+        Args:
+            libraries (list of str): The libraries to try, e.g. as found by :meth:`preflight_container_pulls`.
+                Defaults to all of ``self.container_library``.
+
+        Raises:
+            OSError: If the last remaining library was removed.
+        """
+        # it is possible to try multiple registries / mirrors if multiple were specified.
+        # Iteration happens over a copy of self.container_library[:], as I want to be able to remove failing registries for subsequent images.
+        for library in libraries or self.container_library[:]:
+            # The library may have been removed by a parallel pull in the meantime
+            if library not in self.container_library:
+                continue
+            try:
+                self.singularity_pull_image(container, out_path, cache_path, library, progress)
+                # Pulling the image was successful, no ContainerError was raised, break the library loop
+                break
+            except ContainerError.ImageExistsError:
+                # Pulling not required
+                break
+            except ContainerError.RegistryNotFoundError as e:
+                with self.container_library_lock:
+                    if library in self.container_library:
+                        self.container_library.remove(library)
+                    # The only library was removed
+                    if not self.container_library:
+                        log.error(e.message)
+                        log.error(e.helpmessage)
+                        raise OSError from e
+                # Other libraries can be used
+                continue
+            except ContainerError.ImageNotFoundError as e:
+                # Try other registries
+                if e.error_log.absolute_URI:
+                    break  # there no point in trying other registries if absolute URI was specified.
+                else:
+                    continue
+            except ContainerError.InvalidTagError:
+                # Try other registries
+                continue
+            except ContainerError.OtherError as e:
+                # Try other registries
+                log.error(e.message)
+                log.error(e.helpmessage)
+                if e.error_log.absolute_URI:
+                    break  # there no point in trying other registries if absolute URI was specified.
+                else:
+                    continue
+        else:
+            # The else clause executes after the loop completes normally.
+            # This means the library loop completed without breaking, indicating failure for all libraries (registries)
+            log.error(f"Not able to pull image of {container}. Service might be down or internet connection is dead.")
+
+    @staticmethod
+    def registry_manifest_url(container: str, library: str) -> str:
+        """Get the URL of the manifest of a container image in a registry (library).
+
+        Containers with an explicit registry, like in :meth:`singularity_pull_image`, ignore the library.
+        Like Docker, local registries (e.g. ``localhost:5000``) are accessed with plain HTTP.
+
+        Returns:
+            str: The URL of the manifest in the Docker Registry HTTP API
+        """
+        container = container.replace("docker://", "")
+        container_parts = container.split("/")
+        if len(container_parts) > 2:
+            library = container_parts[0]
+            container = "/".join(container_parts[1:])
+        if "@" in container:
+            repository, reference = container.split("@", 1)
+        elif ":" in container_parts[-1]:
+            repository, reference = container.rsplit(":", 1)
+        else:
+            repository, reference = container, "latest"
+        if library in ["docker.io", "registry.hub.docker.com"]:
+            library = "registry-1.docker.io"
+            if "/" not in repository:
+                repository = f"library/{repository}"
+        scheme = "http" if re.match(r"^(localhost|127\.0\.0\.1)(:\d+)?$", library) else "https"
+        return f"{scheme}://{library}/v2/{repository}/manifests/{reference}"
+
+    def check_container_availability(self, container: str, library: str) -> str:
+        """Check with a HEAD request if a container image can be pulled from a registry.
+
+        Anonymous bearer tokens are requested if the registry asks for them.
+
+        Returns:
+            str: ``available``, ``missing`` if the registry does not have the image, ``unreachable``
+            if the registry could not be reached and ``unknown`` if that could not be determined, e.g.
+            for private images
+        """
+        url = self.registry_manifest_url(container, library)
+        headers = {"Accept": REGISTRY_MANIFEST_MEDIA_TYPES}
+        try:
+            with requests_cache.disabled():
+                r = requests.head(url, headers=headers, allow_redirects=True, timeout=30)
+                challenge = r.headers.get("WWW-Authenticate", "")
+                if r.status_code == 401 and challenge.lower().startswith("bearer "):
+                    auth_params = dict(re.findall(r'(\w+)="([^"]*)"', challenge))
+                    realm = auth_params.pop("realm", None)
+                    if realm is None:
+                        return "unknown"
+                    token_response = requests.get(realm, params=auth_params, timeout=30)
+                    if token_response.status_code != 200:
+                        return "unknown"
+                    token = token_response.json().get("token") or token_response.json().get("access_token")
+                    headers["Authorization"] = f"Bearer {token}"
+                    r = requests.head(url, headers=headers, allow_redirects=True, timeout=30)
+        except requests.exceptions.Timeout:
+            return "unknown"
+        except (requests.exceptions.ConnectionError, requests.exceptions.InvalidURL):
+            return "unreachable"
+        except (requests.exceptions.RequestException, ValueError):
+            return "unknown"
+
+        log.debug(f"Registry check of '{url}' returned {r.status_code}")
+        if r.ok:
+            return "available"
+        if r.status_code == 404:
+            return "missing"
+        if r.status_code >= 500:
+            return "unreachable"
+        return "unknown"
+
+    def preflight_container_pulls(
+        self, containers_pull: List[Tuple[str, str, Optional[str]]]
+    ) -> List[Tuple[str, str, Optional[str], List[str]]]:
+        """Check concurrently which container libraries (registries) have the images that need to be pulled.
+
+        Every image is pulled from the first library that has it. If that can't be determined
+        for any library, e.g. because the registry requires credentials, all those libraries are tried
+        in turn as before. Images that are missing or unreachable in all libraries are not pulled.
+
+        Args:
+            containers_pull (list): The images to pull, as (container, out_path, cache_path) tuples
+
+        Returns:
+            list: The viable pulls, as (container, out_path, cache_path, libraries) tuples
+        """
+        libraries = self.container_library[:]
+        checks = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4 * self.parallel_downloads) as pool:
+            for container, _, _ in containers_pull:
+                for library in libraries:
+                    url = self.registry_manifest_url(container, library)
+                    # Absolute URIs are checked only once
+                    if url not in checks:
+                        checks[url] = pool.submit(self.check_container_availability, container, library)
+        status = {url: future.result() for url, future in checks.items()}
+
+        viable_pulls = []
+        for container, out_path, cache_path in containers_pull:
+            container_status = {
+                library: status[self.registry_manifest_url(container, library)] for library in libraries
+            }
+            available = [library for library in libraries if container_status[library] == "available"]
+            unknown = [library for library in libraries if container_status[library] == "unknown"]
+            if available:
+                viable_pulls.append((container, out_path, cache_path, available[:1]))
+            elif unknown:
+                viable_pulls.append((container, out_path, cache_path, unknown))
+            elif all(library_status == "unreachable" for library_status in container_status.values()):
+                # Perhaps the registries can only be reached by Singularity, let it report the errors
+                log.debug(f"Could not reach any registry to check {container}")
+                viable_pulls.append((container, out_path, cache_path, libraries))
+            else:
+                log.error(
+                    f"Not able to pull image of {container}. It was not found in any of the container libraries: {', '.join(libraries)}"
+                )
+        return viable_pulls
 
     def singularity_image_filenames(self, container: str) -> Tuple[str, Optional[str]]:
         """Check Singularity cache for image, copy to destination folder if found.
@@ -1285,16 +1622,59 @@ class DownloadWorkflow:
         # Copy to destination folder if we have a cached version
         if cache_path and os.path.exists(cache_path):
             log.debug(f"Copying {container} from cache: '{os.path.basename(out_path)}'")
-            shutil.copyfile(cache_path, out_path)
+            self.place_singularity_image(cache_path, out_path)
             # Create symlinks to ensure that the images are found even with different registries being used.
             self.symlink_singularity_images(out_path)
 
+    def place_singularity_image(self, cache_path: str, out_path: str) -> None:
+        """Place an image from the NXF_SINGULARITY_CACHEDIR in the output directory.
+
+        Depending on ``self.container_cache_placement``, the image is copied, hard-linked,
+        reflinked (copy-on-write clone) or symlinked with a relative path. Hard links and
+        reflinks fall back to copying across filesystems, or where the filesystem does not support them.
+        Images are copied instead of symlinked if the download is compressed, as the symlinks would
+        dangle in the archive.
+        """
+        placement = self.container_cache_placement
+        if placement == "symlink" and self.compress_type not in [None, "none"]:
+            log.debug(f"Copying '{cache_path}', symlinks to the cache cannot be archived")
+            placement = "copy"
+        if placement in ["hardlink", "reflink"]:
+            if os.stat(cache_path).st_dev != os.stat(os.path.dirname(out_path)).st_dev:
+                log.debug(f"Cache and output directory are on different devices, copying '{cache_path}'")
+                placement = "copy"
+        if placement != "copy" and os.path.lexists(out_path):
+            os.remove(out_path)
+
+        try:
+            if placement == "hardlink":
+                os.link(cache_path, out_path)
+                return
+            if placement == "symlink":
+                os.symlink(os.path.relpath(cache_path, os.path.dirname(out_path)), out_path)
+                return
+            if placement == "reflink":
+                import fcntl
+
+                with open(cache_path, "rb") as src, open(out_path, "wb") as dst:
+                    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return
+        except (OSError, ImportError) as e:
+            log.debug(f"Could not {placement} '{cache_path}', copying it instead: {e}")
+            if os.path.lexists(out_path):
+                os.remove(out_path)
+        shutil.copyfile(cache_path, out_path)
+
     def singularity_download_image(
         self, container: str, out_path: str, cache_path: Optional[str], progress: DownloadProgress
     ) -> None:
         """Download a singularity image from the web.
 
-        Use native Python to download the file.
+        Use native Python to download the file. An incomplete download of an earlier run
+        is resumed with a HTTP range request if the server supports it. A resumed download
+        is checked against the md5 sum recorded in the image manifest and downloaded again from
+        the start if it does not match. The download is verified against its `Content-Length`
+        before it is renamed to its final name, and is then recorded in the manifest.
 
         Args:
             container (str): A pipeline's container name. Usually it is of similar format
@@ -1314,36 +1694,37 @@ class DownloadWorkflow:
         nice_name = container.split("/")[-1][:50]
         task = progress.add_task(nice_name, start=False, total=False, progress_type="download")
         try:
-            # Delete temporary file if it already exists
-            if os.path.exists(output_path_tmp):
+            # Resume the incomplete download of an earlier run
+            resumed, expected_size, image_md5 = self.singularity_stream_image(
+                container, output_path_tmp, os.path.exists(output_path_tmp), progress, task
+            )
+            if resumed and not self.singularity_image_md5_matches(container, output_path, image_md5):
+                # The partial download is corrupt, or the image was rebuilt since, so start again
+                log.warning(
+                    f"Resumed download of '{container}' does not match the recorded md5 sum, downloading it again"
+                )
                 os.remove(output_path_tmp)
+                resumed, expected_size, image_md5 = self.singularity_stream_image(
+                    container, output_path_tmp, False, progress, task
+                )
 
-            # Open file handle and download
-            with open(output_path_tmp, "wb") as fh:
-                # Disable caching as this breaks streamed downloads
-                with requests_cache.disabled():
-                    r = requests.get(container, allow_redirects=True, stream=True, timeout=60 * 5)
-                    filesize = r.headers.get("Content-length")
-                    if filesize:
-                        progress.update(task, total=int(filesize))
-                        progress.start_task(task)
-
-                    # Stream download
-                    for data in r.iter_content(chunk_size=io.DEFAULT_BUFFER_SIZE):
-                        # Check that the user didn't hit ctrl-c
-                        if self.kill_with_fire:
-                            raise KeyboardInterrupt
-                        progress.update(task, advance=len(data))
-                        fh.write(data)
+            # Verify the download before giving it its final filename
+            try:
+                self.verify_singularity_image(container, output_path_tmp, expected_size)
+            except DownloadError:
+                # A corrupt download can't be resumed
+                os.remove(output_path_tmp)
+                raise
 
             # Rename partial filename to final filename
             os.rename(output_path_tmp, output_path)
+            self.record_singularity_image(container, output_path, image_md5)
 
             # Copy cached download if we are using the cache
             if cache_path:
                 log.debug(f"Copying {container} from cache: '{os.path.basename(out_path)}'")
                 progress.update(task, description="Copying from cache to target directory")
-                shutil.copyfile(cache_path, out_path)
+                self.place_singularity_image(cache_path, out_path)
 
             # Create symlinks to ensure that the images are found even with different registries being used.
             self.symlink_singularity_images(output_path)
@@ -1354,10 +1735,9 @@ class DownloadWorkflow:
             # Kill the progress bars
             for t in progress.task_ids:
                 progress.remove_task(t)
-            # Try to delete the incomplete download
-            log.debug(f"Deleting incompleted singularity image download:\n'{output_path_tmp}'")
+            # Keep the incomplete download, so that it can be resumed in the next run
             if output_path_tmp and os.path.exists(output_path_tmp):
-                os.remove(output_path_tmp)
+                log.debug(f"Keeping incomplete singularity image download:\n'{output_path_tmp}'")
             if output_path and os.path.exists(output_path):
                 os.remove(output_path)
             # Re-raise the caught exception
@@ -1365,8 +1745,119 @@ class DownloadWorkflow:
         finally:
             del output_path_tmp
 
+    def singularity_stream_image(
+        self, container: str, output_path_tmp: str, resume: bool, progress: DownloadProgress, task: rich.progress.TaskID
+    ) -> Tuple[bool, Optional[int], str]:
+        """Stream a singularity image from the web into its partial download file.
+
+        If ``resume`` is set, the download continues after the bytes already in the file, as long as
+        the server answers the range request with the same start offset. Otherwise it starts from byte 0.
+
+        Returns:
+            bool: Whether the download was resumed
+            int | None: The expected size of the complete image, if known
+            str: The md5 sum of the complete image file
+        """
+        resume_from = os.path.getsize(output_path_tmp) if resume else 0
+
+        # Disable caching as this breaks streamed downloads
+        with requests_cache.disabled():
+            if resume_from:
+                headers = {"Range": f"bytes={resume_from}-"}
+                r = requests.get(container, headers=headers, allow_redirects=True, stream=True, timeout=60 * 5)
+                content_range = re.match(r"bytes (\d+)-", r.headers.get("Content-Range", ""))
+                if r.status_code == 206 and content_range and int(content_range.group(1)) == resume_from:
+                    log.debug(f"Resuming download of '{container}' from byte {resume_from}")
+                else:
+                    # The server does not support range requests, or sent another range, so start again
+                    r.close()
+                    resume_from = 0
+            if not resume_from:
+                r = requests.get(container, allow_redirects=True, stream=True, timeout=60 * 5)
+            r.raise_for_status()
+
+            # Compressed transfers are decoded on the fly, so their size can't be checked
+            expected_size = None
+            filesize = r.headers.get("Content-length")
+            if filesize and r.headers.get("Content-Encoding", "identity") == "identity":
+                expected_size = resume_from + int(filesize)
+            if filesize:
+                progress.update(task, total=resume_from + int(filesize), completed=resume_from)
+                progress.start_task(task)
+
+            # Calculate the md5 sum while downloading, starting with the part downloaded before
+            hash_md5 = hashlib.md5()
+            if resume_from:
+                with open(output_path_tmp, "rb") as fh:
+                    for data in iter(lambda: fh.read(self.download_chunk_size), b""):
+                        hash_md5.update(data)
+
+            # Open file handle and download
+            with open(output_path_tmp, "ab" if resume_from else "wb") as fh:
+                # Stream download
+                for data in r.iter_content(chunk_size=self.download_chunk_size):
+                    # Check that the user didn't hit ctrl-c
+                    if self.kill_with_fire:
+                        raise KeyboardInterrupt
+                    progress.update(task, advance=len(data))
+                    hash_md5.update(data)
+                    fh.write(data)
+
+        return resume_from > 0, expected_size, hash_md5.hexdigest()
+
+    def singularity_image_md5_matches(self, container: str, image_path: str, image_md5: str) -> bool:
+        """Check a singularity image against the md5 sum recorded for it in the image manifest, if any.
+
+        Only resumed downloads are checked this way: a complete new download of an image
+        that was rebuilt under the same URL replaces the recorded md5 sum.
+        """
+        manifest = self.read_singularity_image_manifest(os.path.dirname(image_path))
+        recorded = manifest.get(os.path.basename(image_path), {})
+        return recorded.get("url") != container or recorded.get("md5") in (None, image_md5)
+
+    def verify_singularity_image(self, container: str, image_path: str, expected_size: Optional[int]) -> None:
+        """Check a downloaded singularity image against its expected size.
+
+        Raises:
+            DownloadError: If the image is incomplete.
+        """
+        image_size = os.path.getsize(image_path)
+        if expected_size is not None and image_size != expected_size:
+            raise DownloadError(
+                f"Download of '{container}' is incomplete: {image_size} of {expected_size} bytes were received"
+            )
+
+    @staticmethod
+    def read_singularity_image_manifest(image_dir: str) -> dict:
+        """Read the manifest of the singularity images downloaded to a directory"""
+        manifest_path = os.path.join(image_dir, SINGULARITY_IMAGE_MANIFEST)
+        if not os.path.exists(manifest_path):
+            return {}
+        try:
+            with open(manifest_path) as fh:
+                return json.load(fh)
+        except json.JSONDecodeError as e:
+            log.debug(f"Could not read the image manifest '{manifest_path}': {e}")
+            return {}
+
+    def record_singularity_image(self, container: str, image_path: str, image_md5: str) -> None:
+        """Record a downloaded singularity image in the manifest next to it"""
+        image_dir = os.path.dirname(image_path)
+        with self.manifest_lock:
+            manifest = self.read_singularity_image_manifest(image_dir)
+            manifest[os.path.basename(image_path)] = {
+                "url": container,
+                "size": os.path.getsize(image_path),
+                "md5": image_md5,
+                "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            manifest_path_tmp = os.path.join(image_dir, f"{SINGULARITY_IMAGE_MANIFEST}.partial")
+            with open(manifest_path_tmp, "w") as fh:
+                json.dump(manifest, fh, indent=4)
+            os.replace(manifest_path_tmp, os.path.join(image_dir, SINGULARITY_IMAGE_MANIFEST))
+
     def singularity_pull_image(
-        self, container: str, out_path: str, cache_path: Optional[str], library: List[str], progress: DownloadProgress
+        self, container: str, out_path: str, cache_path: Optional[str], library: str, progress: DownloadProgress
     ) -> None:
         """Pull a singularity image using ``singularity pull``
 
@@ -1375,7 +1866,7 @@ class DownloadWorkflow:
         Args:
             container (str): A pipeline's container name. Usually it is of similar format
                 to ``nfcore/name:version``.
-            library (list of str): A list of libraries to try for pulling the image.
+            library (str): The library (registry) to pull the image from, unless the container names one.
 
         Raises:
             Various exceptions possible from `subprocess` execution of Singularity.
@@ -1454,7 +1945,7 @@ class DownloadWorkflow:
         if cache_path:
             log.debug(f"Copying {container} from cache: '{os.path.basename(out_path)}'")
             progress.update(task, current_log="Copying from cache to target directory")
-            shutil.copyfile(cache_path, out_path)
+            self.place_singularity_image(cache_path, out_path)
 
         # Create symlinks to ensure that the images are found even with different registries being used.
         self.symlink_singularity_images(output_path)
@@ -1462,35 +1953,372 @@ class DownloadWorkflow:
         progress.remove_task(task)
 
     def compress_download(self) -> None:
-        """Take the downloaded files and make a compressed .tar.gz archive."""
+        """Take the downloaded files and make a compressed archive.
+
+        The archive is streamed to disk and its md5 sum is calculated while it is written.
+        Tar archives are compressed by ``pigz``, ``lbzip2``/``pbzip2`` or ``zstd`` on all cores
+        if they are installed. Singularity images are stored without compression in zip files.
+        """
         log.debug(f"Creating archive: {self.output_filename}")
 
-        # .tar.gz and .tar.bz2 files
-        if self.compress_type in ["tar.gz", "tar.bz2"]:
-            ctype = self.compress_type.split(".")[1]
-            with tarfile.open(self.output_filename, f"w:{ctype}") as tar:
-                tar.add(self.outdir, arcname=os.path.basename(self.outdir))
-            tar_flags = "xzf" if ctype == "gz" else "xjf"
-            log.info(f"Command to extract files: [bright_magenta]tar -{tar_flags} {self.output_filename}[/]")
-
-        # .zip files
-        if self.compress_type == "zip":
-            with ZipFile(self.output_filename, "w") as zip_file:
-                # Iterate over all the files in directory
-                for folder_name, _, filenames in os.walk(self.outdir):
-                    for filename in filenames:
-                        # create complete filepath of file in directory
-                        file_path = os.path.join(folder_name, filename)
-                        # Add file to zip
-                        zip_file.write(file_path)
-            log.info(f"Command to extract files: [bright_magenta]unzip {self.output_filename}[/]")
+        ctype = self.compress_type.split(".")[-1] if self.compress_type is not None else None
+        compressor = self.find_parallel_compressor(ctype) if ctype in ["gz", "bz2", "zst"] else None
+        if ctype == "zst" and compressor is None:
+            raise DownloadError("'zstd' is needed to create '.tar.zst' archives, but it is not in $PATH")
+
+        with open(self.output_filename, "wb") as fh:
+            archive = ChecksumWriter(fh)
+
+            # .tar.gz, .tar.bz2 and .tar.zst files
+            if ctype in ["gz", "bz2", "zst"]:
+                if compressor is not None:
+                    log.debug(f"Compressing with '{' '.join(compressor)}'")
+                    self.compress_tar_externally(compressor, archive)
+                else:
+                    with tarfile.open(fileobj=archive, mode="w|gz" if ctype == "gz" else "w|bz2") as tar:
+                        tar.add(self.outdir, arcname=os.path.basename(self.outdir))
+                tar_flags = {"gz": "-xzf", "bz2": "-xjf", "zst": "--zstd -xf"}[ctype]
+                log.info(f"Command to extract files: [bright_magenta]tar {tar_flags} {self.output_filename}[/]")
+
+            # .zip files
+            if self.compress_type == "zip":
+                with ZipFile(archive, "w", compression=ZIP_DEFLATED) as zip_file:
+                    # Iterate over all the files in directory
+                    for folder_name, _, filenames in os.walk(self.outdir):
+                        for filename in filenames:
+                            # create complete filepath of file in directory
+                            file_path = os.path.join(folder_name, filename)
+                            # Singularity images are compressed already
+                            if file_path.endswith((".img", ".sif")):
+                                zip_file.write(file_path, compress_type=ZIP_STORED)
+                            else:
+                                # Add file to zip
+                                zip_file.write(file_path)
+                log.info(f"Command to extract files: [bright_magenta]unzip {self.output_filename}[/]")
 
         # Delete original files
         log.debug(f"Deleting uncompressed files: '{self.outdir}'")
         shutil.rmtree(self.outdir)
 
-        # Calculate md5sum for output file
-        log.info(f"MD5 checksum for '{self.output_filename}': [blue]{nf_core.utils.file_md5(self.output_filename)}[/]")
+        # Show the md5sum of the output file, calculated while writing it
+        log.info(f"MD5 checksum for '{self.output_filename}': [blue]{archive.hash_md5.hexdigest()}[/]")
+
+    @staticmethod
+    def find_parallel_compressor(ctype: str) -> Optional[List[str]]:
+        """Find a multi-threaded compression tool for a type of tar archive, if one is installed"""
+        compressors = {
+            "gz": [["pigz", "-c"]],
+            "bz2": [["lbzip2", "-c"], ["pbzip2", "-c"]],
+            "zst": [["zstd", "-T0", "-q", "-c"]],
+        }
+        for compressor in compressors[ctype]:
+            if shutil.which(compressor[0]):
+                return compressor
+        return None
+
+    def compress_tar_externally(self, compressor: List[str], archive: "ChecksumWriter") -> None:
+        """Stream a tar archive of the download through an external compression tool"""
+        with subprocess.Popen(compressor, stdin=subprocess.PIPE, stdout=subprocess.PIPE) as proc:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+
+                def write_tar():
+                    try:
+                        with tarfile.open(fileobj=proc.stdin, mode="w|") as tar:
+                            tar.add(self.outdir, arcname=os.path.basename(self.outdir))
+                    finally:
+                        proc.stdin.close()  # type: ignore[union-attr]
+
+                # Write the tar archive and read the compressed output at the same time
+                future_tar = pool.submit(write_tar)
+                for data in iter(lambda: proc.stdout.read(self.download_chunk_size), b""):  # type: ignore[union-attr]
+                    archive.write(data)
+                future_tar.result()
+        if proc.returncode != 0:
+            raise DownloadError(f"Compressing the download with '{compressor[0]}' failed")
+
+
+class ChecksumWriter(io.RawIOBase):
+    """Write to a file while calculating the md5 sum of the written content"""
+
+    def __init__(self, fh):
+        super().__init__()
+        self.fh = fh
+        self.hash_md5 = hashlib.md5()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.hash_md5.update(data)
+        return self.fh.write(data)
+
+    def flush(self) -> None:
+        if not self.fh.closed:
+            self.fh.flush()
+
+
+class GroovyString:
+    """A string literal in Groovy code.
+
+    Args:
+        parts (list): The literal text (str) and the tokens of interpolated expressions (list), in order
+        source (str): The string literal as written in the code, including the quotes
+        start (int): Position of the opening quote in the code
+    """
+
+    def __init__(self, parts, source, start):
+        self.parts = parts
+        self.source = source
+        self.start = start
+
+
+class ContainerDirective:
+    """A ``container`` directive of a DSL2 module.
+
+    Args:
+        source (str): The string literal of the directive as written in the module
+        images (list): All values the directive can take, e.g. both branches of a ternary
+            on ``workflow.containerEngine`` or every value assigned to a referenced variable
+        variables (list): Names of the variables the directive refers to
+    """
+
+    def __init__(self, source, images, variables):
+        self.source = source
+        self.images = images
+        self.variables = variables
+
+
+class ContainerDirectiveParser:
+    """Find the container directives of a DSL2 module in a single pass.
+
+    The module is split into tokens, so string literals are recognised with their
+    quotes, escapes and interpolations, and comments are skipped. Variables referenced
+    by a directive are resolved with the string values assigned to them anywhere in
+    the module.
+
+    Args:
+        text (str): The contents of the module file
+
+    Attributes:
+        directives (list): A :class:`ContainerDirective` for each container directive
+        assignments (dict): The positions of the string literals assigned to each variable
+    """
+
+    # Maximal depth of variables referring to other variables
+    MAX_VARIABLE_DEPTH = 5
+
+    def __init__(self, text):
+        self.text = text
+        self.directives = []
+        self.assignments = {}
+        self._strings = {}
+        if "container" in text:
+            self._parse()
+
+    def _lex(self, pos, closing=False):
+        """Split the code starting at ``pos`` into tokens.
+
+        String literals are only lexed as far as needed to find their end, see :meth:`_string`.
+        With ``closing``, stop after the unmatched closing bracket of an interpolated expression.
+
+        Returns:
+            tuple: The tokens as (kind, value) pairs and the position after the last one.
+            The value of a string token is the position of its opening quote.
+        """
+        tokens = []
+        depth = 0
+        while True:
+            match = GROOVY_TOKEN_REGEX.match(self.text, pos)
+            kind = match.lastgroup
+            pos = match.end()
+            if kind == "string":
+                tokens.append((kind, match.start(kind)))
+            elif kind == "quote":
+                string, pos = self._lex_string(pos, match.group(kind))
+                self._strings[string.start] = string
+                tokens.append(("string", string.start))
+            elif kind == "open":
+                depth += 1
+                tokens.append((kind, match.group(kind)))
+            elif kind == "close":
+                if closing and depth == 0:
+                    break
+                depth -= 1
+                tokens.append((kind, match.group(kind)))
+            elif kind == "end":
+                break
+            else:
+                tokens.append((kind, match.group(kind)))
+        return tokens, pos
+
+    def _string(self, start):
+        """The :class:`GroovyString` whose opening quote is at ``start``."""
+        if start not in self._strings:
+            quote = self.text[start : start + 3] if self.text[start : start + 3] in ("'''", '"""') else self.text[start]
+            self._strings[start], _ = self._lex_string(start + len(quote), quote)
+        return self._strings[start]
+
+    def _lex_string(self, pos, quote):
+        """Lex a string literal whose opening quote ends at ``pos``.
+
+        Returns:
+            tuple: The :class:`GroovyString` and the position after its closing quote
+        """
+        start = pos - len(quote)
+        special_regex = GROOVY_STRING_SPECIAL_REGEX[quote]
+        parts = []
+        literal = ""
+        while pos < len(self.text):
+            match = special_regex.search(self.text, pos)
+            if match is None:
+                literal += self.text[pos:]
+                pos = len(self.text)
+                break
+            literal += self.text[pos : match.start()]
+            pos = match.start()
+            if self.text.startswith(quote, pos):
+                pos += len(quote)
+                break
+            char = self.text[pos]
+            if char == "\\":
+                escaped = self.text[pos + 1 : pos + 2]
+                literal += escaped if escaped in ("'", '"', "\\", "$") else char + escaped
+                pos += 2
+            elif self.text.startswith("${", pos):
+                parts.append(literal)
+                literal = ""
+                expression, pos = self._lex(pos + 2, closing=True)
+                parts.append(expression)
+            elif char == "$" and GROOVY_IDENT_REGEX.match(self.text, pos + 1):
+                parts.append(literal)
+                literal = ""
+                ident = GROOVY_IDENT_REGEX.match(self.text, pos + 1)
+                parts.append([("ident", ident.group())])
+                pos = ident.end()
+            else:
+                # a single quote character in a triple-quoted string or a lone $
+                literal += char
+                pos += 1
+        parts.append(literal)
+        return GroovyString([part for part in parts if part != ""], self.text[start:pos], start), pos
+
+    def _at_statement_start(self, pos):
+        """Whether only whitespace precedes ``pos`` in its statement, e.g. no ``def`` or ``task.ext.``."""
+        statement_start = max(self.text.rfind(char, 0, pos) for char in "\n{};") + 1
+        return self.text[statement_start:pos].strip() == ""
+
+    def _parse(self):
+        """Collect the container directives.
+
+        Only ``container`` at the start of a statement is a directive, and only outside of the
+        ``script:``, ``shell:``, ``exec:`` and ``stub:`` sections, which contain the task code.
+        """
+        directive_strings = []
+        in_script = False
+        # Nothing to be found after the last occurrence of "container"
+        last_container = self.text.rfind("container")
+        pos = 0
+        while True:
+            match = GROOVY_SCAN_REGEX.search(self.text, pos)
+            if match is None or match.start() > last_container:
+                break
+            kind = match.lastgroup
+            pos = match.end()
+            if kind == "quote":
+                # string literal with nested quotes or braces, find its end
+                string, pos = self._lex_string(pos, match.group(kind))
+                self._strings[string.start] = string
+            elif kind in ("process", "script") and self._at_statement_start(match.start()):
+                # the script section lasts until the next process
+                in_script = kind == "script"
+            elif kind == "container" and not in_script and self._at_statement_start(match.start()):
+                # container "image", container = "image" or container("image")
+                token = GROOVY_TOKEN_REGEX.match(self.text, pos)
+                while token.lastgroup in ("op", "open") and token.group(token.lastgroup) in ("=", "("):
+                    token = GROOVY_TOKEN_REGEX.match(self.text, token.end())
+                if token.lastgroup in ("string", "quote"):
+                    directive_strings.append(self._string(token.start(token.lastgroup)))
+
+        for string in directive_strings:
+            variables = []
+            images = self._string_values(string, variables, 0)
+            self.directives.append(
+                ContainerDirective(string.source, [image.strip() for image in images or []], variables)
+            )
+
+    def _string_values(self, string, variables, depth):
+        """All values of a string literal, or None if an interpolation can't be resolved."""
+        values = [""]
+        for part in string.parts:
+            if isinstance(part, str):
+                part_values = [part]
+            else:
+                part_values = self._expression_values(part, variables, depth)
+                if part_values is None:
+                    return None
+            values = [value + part_value for value in values for part_value in part_values]
+        return values
+
+    def _expression_values(self, tokens, variables, depth):
+        """All values of an interpolated expression, or None if it can't be resolved."""
+        # Ternaries and elvis operators: any of the branches can be used
+        nesting = 0
+        for i, (kind, value) in enumerate(tokens):
+            if kind == "open":
+                nesting += 1
+            elif kind == "close":
+                nesting -= 1
+            elif nesting == 0 and kind == "op" and value in ("?", "?:"):
+                if value == "?":
+                    branches = self._split_ternary(tokens[i + 1 :])
+                else:
+                    branches = [tokens[:i], tokens[i + 1 :]]
+                if branches is None:
+                    return None
+                values = []
+                resolved = False
+                for branch in branches:
+                    branch_values = self._expression_values(branch, variables, depth)
+                    if branch_values is not None:
+                        values += branch_values
+                        resolved = True
+                return values if resolved else None
+
+        if len(tokens) == 1 and tokens[0][0] == "string":
+            return self._string_values(self._string(tokens[0][1]), variables, depth)
+        if len(tokens) == 1 and tokens[0][0] == "ident":
+            name = tokens[0][1]
+            if name not in variables:
+                variables.append(name)
+            if name not in self.assignments:
+                # string literals assigned to the variable anywhere in the module
+                assignment_regex = re.compile(rf"(?<![\w.$]){re.escape(name)}\s*=(?!=)\s*(?=['\"])")
+                self.assignments[name] = [match.end() for match in assignment_regex.finditer(self.text)]
+            if not self.assignments[name] or depth >= self.MAX_VARIABLE_DEPTH:
+                return None
+            values = []
+            for start in self.assignments[name]:
+                values += self._string_values(self._string(start), variables, depth + 1) or []
+            return values
+        return None
+
+    @staticmethod
+    def _split_ternary(tokens):
+        """Split the tokens after the ``?`` of a ternary at its ``:``."""
+        nesting = 0
+        ternaries = 0
+        for i, (kind, value) in enumerate(tokens):
+            if kind == "open":
+                nesting += 1
+            elif kind == "close":
+                nesting -= 1
+            elif nesting == 0 and kind == "op" and value == "?":
+                ternaries += 1
+            elif nesting == 0 and kind == "op" and value == ":":
+                if ternaries == 0:
+                    return [tokens[:i], tokens[i + 1 :]]
+                ternaries -= 1
+        return None
 
 
 class WorkflowRepo(SyncedRepo):
@@ -1605,48 +2433,50 @@ class WorkflowRepo(SyncedRepo):
         else:
             self.local_repo_dir = os.path.join(NFCORE_DIR if not in_cache else NFCORE_CACHE_DIR, self.fullname)
 
-        try:
-            if not os.path.exists(self.local_repo_dir):
-                try:
-                    pbar = rich.progress.Progress(
-                        "[bold blue]{task.description}",
-                        rich.progress.BarColumn(bar_width=None),
-                        "[bold yellow]{task.fields[state]}",
-                        transient=True,
-                        disable=os.environ.get("HIDE_PROGRESS", None) is not None or self.hide_progress,
-                    )
-                    with pbar:
-                        self.repo = git.Repo.clone_from(
-                            remote,
-                            self.local_repo_dir,
-                            progress=RemoteProgressbar(pbar, self.fullname, self.remote_url, "Cloning"),
+        # Cloning and fetching change the local clone, which might be shared with other nf-core processes
+        with self.repo_lock():
+            try:
+                if not os.path.exists(self.local_repo_dir):
+                    try:
+                        pbar = rich.progress.Progress(
+                            "[bold blue]{task.description}",
+                            rich.progress.BarColumn(bar_width=None),
+                            "[bold yellow]{task.fields[state]}",
+                            transient=True,
+                            disable=os.environ.get("HIDE_PROGRESS", None) is not None or self.hide_progress,
                         )
-                    super().update_local_repo_status(self.fullname, True)
-                except GitCommandError:
-                    raise DownloadError(f"Failed to clone from the remote: `{remote}`")
-            else:
-                self.repo = git.Repo(self.local_repo_dir)
-
-                if super().no_pull_global:
-                    super().update_local_repo_status(self.fullname, True)
-                # If the repo is already cloned, fetch the latest changes from the remote
-                if not super().local_repo_synced(self.fullname):
-                    pbar = rich.progress.Progress(
-                        "[bold blue]{task.description}",
-                        rich.progress.BarColumn(bar_width=None),
-                        "[bold yellow]{task.fields[state]}",
-                        transient=True,
-                        disable=os.environ.get("HIDE_PROGRESS", None) is not None or self.hide_progress,
-                    )
-                    with pbar:
-                        self.repo.remotes.origin.fetch(
-                            progress=RemoteProgressbar(pbar, self.fullname, self.remote_url, "Pulling")
+                        with pbar:
+                            self.repo = git.Repo.clone_from(
+                                remote,
+                                self.local_repo_dir,
+                                progress=RemoteProgressbar(pbar, self.fullname, self.remote_url, "Cloning"),
+                            )
+                        super().update_local_repo_status(self.fullname, True)
+                    except GitCommandError:
+                        raise DownloadError(f"Failed to clone from the remote: `{remote}`")
+                else:
+                    self.repo = git.Repo(self.local_repo_dir)
+
+                    if super().no_pull_global:
+                        super().update_local_repo_status(self.fullname, True)
+                    # If the repo is already cloned, fetch the latest changes from the remote
+                    if not super().local_repo_synced(self.fullname):
+                        pbar = rich.progress.Progress(
+                            "[bold blue]{task.description}",
+                            rich.progress.BarColumn(bar_width=None),
+                            "[bold yellow]{task.fields[state]}",
+                            transient=True,
+                            disable=os.environ.get("HIDE_PROGRESS", None) is not None or self.hide_progress,
                         )
-                    super().update_local_repo_status(self.fullname, True)
+                        with pbar:
+                            self.repo.remotes.origin.fetch(
+                                progress=RemoteProgressbar(pbar, self.fullname, self.remote_url, "Pulling")
+                            )
+                        super().update_local_repo_status(self.fullname, True)
 
-        except (GitCommandError, InvalidGitRepositoryError) as e:
-            log.error(f"[red]Could not set up local cache of modules repository:[/]\n{e}\n")
-            self.retry_setup_local_repo()
+            except (GitCommandError, InvalidGitRepositoryError) as e:
+                log.error(f"[red]Could not set up local cache of modules repository:[/]\n{e}\n")
+                self.retry_setup_local_repo()
 
     def tidy_tags_and_branches(self):
         """
@@ -72,11 +72,12 @@ class WorkflowLicences:
         deps = self.conda_config.get("dependencies", [])
         deps_data = {}
         log.info(f"Fetching licence information for {len(deps)} tools")
+        dep_channels = self.conda_config.get("channels", [])
+        nf_core.utils.package_metadata.prefetch([dep for dep in deps if isinstance(dep, str)], dep_channels)
         for dep in deps:
             try:
                 if isinstance(dep, str):
-                    dep_channels = self.conda_config.get("channels", [])
-                    deps_data[dep] = nf_core.utils.anaconda_package(dep, dep_channels)
+                    deps_data[dep] = nf_core.utils.package_metadata.anaconda_package(dep, dep_channels)
                 elif isinstance(dep, dict):
                     deps_data[dep] = nf_core.utils.pip_package(dep)
             except ValueError:
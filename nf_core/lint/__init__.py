@@ -4,12 +4,13 @@ Tests Nextflow-based pipelines to check that they adhere to
 the nf-core community guidelines.
 """
 
+import concurrent.futures
 import datetime
 import json
 import logging
 import os
 from pathlib import Path
-from typing import List, Tuple, Union
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
 
 import git
 import rich
@@ -22,6 +23,7 @@ from rich.table import Table
 
 import nf_core.lint_utils
 import nf_core.modules.lint
+import nf_core.modules.modules_repo
 import nf_core.subworkflows.lint
 import nf_core.utils
 from nf_core import __version__
@@ -46,6 +48,7 @@ class PipelineLint(nf_core.utils.Pipeline):
     Attributes:
         failed (list): A list of tuples of the form: ``(<test-name>, <reason>)``
         ignored (list): A list of tuples of the form: ``(<test-name>, <reason>)``
+        jobs (int): The number of lint tests run in parallel
         lint_config (dict): The parsed nf-core linting config for this pipeline
         passed (list): A list of tuples of the form: ``(<test-name>, <reason>)``
         release_mode (bool): `True`, if you the to linting was run in release mode, `False` else.
@@ -79,8 +82,49 @@ class PipelineLint(nf_core.utils.Pipeline):
     from .template_strings import template_strings  # type: ignore[misc]
     from .version_consistency import version_consistency  # type: ignore[misc]
 
+    # The inputs that each lint test reads, used to schedule the tests when they are run in parallel.
+    # Inputs with a loader in ``lint_input_loaders`` are loaded once, before the first test that needs them.
+    # Other inputs are loaded by :func:`_load` or read by the tests themselves, apart from the exclusive ones
+    # in ``exclusive_lint_inputs``, which the tests change and which are therefore used by one test at a time.
+    # Tests without an entry here are run on their own, after all tests before them.
+    lint_test_inputs = {
+        "files_exist": ("nf_config", "files"),
+        "nextflow_config": ("nf_config",),
+        "files_unchanged": ("nf_config", "template"),
+        "actions_ci": ("nf_config", "workflow_yamls"),
+        "actions_awstest": ("workflow_yamls",),
+        "actions_awsfulltest": ("workflow_yamls",),
+        "readme": ("nf_config",),
+        "pipeline_todos": ("file_lines",),
+        "pipeline_name_conventions": ("nf_config",),
+        "template_strings": ("file_lines",),
+        "schema_lint": ("schema_obj",),
+        "schema_params": ("schema_obj", "nf_config"),
+        "system_exit": (),
+        "schema_description": ("schema_obj", "nf_config"),
+        "actions_schema_validation": ("workflow_yamls",),
+        "merge_markers": ("file_lines",),
+        "modules_json": ("modules_json",),
+        "multiqc_config": ("nf_config",),
+        "modules_structure": (),
+        "base_config": (),
+        "modules_config": (),
+        "nfcore_yml": (),
+        "version_consistency": ("nf_config",),
+    }
+    lint_input_loaders = {"file_lines": "_scan_files"}
+    exclusive_lint_inputs = {"schema_obj"}
+
     def __init__(
-        self, wf_path, release_mode=False, fix=(), key=None, fail_ignored=False, fail_warned=False, hide_progress=False
+        self,
+        wf_path,
+        release_mode=False,
+        fix=(),
+        key=None,
+        fail_ignored=False,
+        fail_warned=False,
+        hide_progress=False,
+        jobs=1,
     ):
         """Initialise linting object"""
 
@@ -92,6 +136,7 @@ class PipelineLint(nf_core.utils.Pipeline):
         self.fail_ignored = fail_ignored
         self.fail_warned = fail_warned
         self.hide_progress = hide_progress
+        self.jobs = jobs
         self.failed = []
         self.ignored = []
         self.fixed = []
@@ -102,6 +147,8 @@ class PipelineLint(nf_core.utils.Pipeline):
         self.fix = fix
         self.key = key
         self.progress_bar = None
+        self.unignored_files = None
+        self.file_lines = None
 
     @staticmethod
     def _get_all_lint_tests(release_mode):
@@ -154,6 +201,17 @@ class PipelineLint(nf_core.utils.Pipeline):
             if k not in self.lint_tests:
                 log.warning(f"Found unrecognised test name '{k}' in pipeline lint config")
 
+    def _scan_files(self):
+        """Read the pipeline files once for all text-scanning lint tests.
+
+        Sets ``self.unignored_files`` to the files not excluded by `.gitignore`
+        and ``self.file_lines`` to the lines of these files and of ``self.files``,
+        see :func:`nf_core.lint_utils.scan_files`.
+        """
+        if self.file_lines is None:
+            self.unignored_files = nf_core.lint_utils.list_unignored_files(self.wf_path)
+            self.file_lines = nf_core.lint_utils.scan_files(self.unignored_files + self.files)
+
     def _lint_pipeline(self):
         """Main linting function.
 
@@ -218,32 +276,126 @@ class PipelineLint(nf_core.utils.Pipeline):
             lint_progress = self.progress_bar.add_task(
                 "Running lint checks", total=len(self.lint_tests), test_name=self.lint_tests[0]
             )
-            for test_name in self.lint_tests:
-                if self.lint_config.get(test_name, {}) is False:
-                    log.debug(f"Skipping lint test '{test_name}'")
-                    self.ignored.append((test_name, test_name))
-                    continue
-                self.progress_bar.update(lint_progress, advance=1, test_name=test_name)
-                log.debug(f"Running lint test: {test_name}")
-                test_results = getattr(self, test_name)()
-                for test in test_results.get("passed", []):
-                    self.passed.append((test_name, test))
-                for test in test_results.get("ignored", []):
-                    if self.fail_ignored:
-                        self.failed.append((test_name, test))
-                    else:
-                        self.ignored.append((test_name, test))
-                for test in test_results.get("fixed", []):
-                    self.fixed.append((test_name, test))
-                for test in test_results.get("warned", []):
-                    if self.fail_warned:
-                        self.failed.append((test_name, test))
-                    else:
-                        self.warned.append((test_name, test))
-                for test in test_results.get("failed", []):
-                    self.failed.append((test_name, test))
-                if test_results.get("could_fix", False):
-                    self.could_fix.append(test_name)
+            test_results = {}
+            reported = 0
+            for test_name, results in self._run_lint_tests(lint_progress):
+                test_results[test_name] = results
+                # Report the results in the order of the tests
+                while reported < len(self.lint_tests) and self.lint_tests[reported] in test_results:
+                    self._add_test_results(self.lint_tests[reported], test_results[self.lint_tests[reported]])
+                    reported += 1
+
+    def _get_lint_test_schedule(self) -> Dict[str, List[str]]:
+        """Work out the order in which the lint tests and the loaders of their inputs can run.
+
+        Tests skipped in the lint config are left out. A test waits for the loaders of its inputs,
+        for the tests before it that use one of its exclusive inputs and for the tests that fix files.
+        Tests that fix files, or that have no declared inputs, wait for everything before them.
+
+        Returns:
+            dict: The lint tests and input loaders (by method name) in the order of ``self.lint_tests``,
+                  with the names of the tests and loaders that have to finish before each of them
+        """
+        schedule: Dict[str, List[str]] = {}
+        last_barrier: List[str] = []
+        last_users: Dict[str, str] = {}
+        for test_name in self.lint_tests:
+            if self.lint_config.get(test_name, {}) is False:
+                continue
+            inputs = self.lint_test_inputs.get(test_name)
+            if inputs is None or test_name in self.fix:
+                schedule[test_name] = list(schedule)
+                last_barrier = [test_name]
+                continue
+            dependencies = list(last_barrier)
+            for lint_input in inputs:
+                loader = self.lint_input_loaders.get(lint_input)
+                if loader is not None:
+                    if loader not in schedule:
+                        schedule[loader] = list(last_barrier)
+                    dependencies.append(loader)
+                if lint_input in self.exclusive_lint_inputs:
+                    if lint_input in last_users:
+                        dependencies.append(last_users[lint_input])
+                    last_users[lint_input] = test_name
+            schedule[test_name] = dependencies
+        return schedule
+
+    def _run_lint_tests(self, lint_progress) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """Run the lint tests, ``self.jobs`` at a time, see :func:`_get_lint_test_schedule`
+
+        Args:
+            lint_progress: The task of the progress bar to advance
+
+        Yields:
+            tuple: The name and the results of each lint test, as the tests finish
+        """
+        schedule = self._get_lint_test_schedule()
+        for test_name in self.lint_tests:
+            if test_name not in schedule:
+                log.debug(f"Skipping lint test '{test_name}'")
+                yield test_name, None
+
+        def run_lint_test(name):
+            if name in self.lint_tests:
+                log.debug(f"Running lint test: {name}")
+            return getattr(self, name)()
+
+        if self.jobs <= 1:
+            for name in schedule:
+                if name in self.lint_tests:
+                    self.progress_bar.update(lint_progress, advance=1, test_name=name)
+                    yield name, run_lint_test(name)
+                else:
+                    run_lint_test(name)
+            return
+
+        done: Set[str] = set()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            futures: Dict[concurrent.futures.Future, str] = {}
+            while len(done) < len(schedule):
+                submitted = set(futures.values())
+                for name, dependencies in schedule.items():
+                    if name not in done and name not in submitted and all(d in done for d in dependencies):
+                        futures[pool.submit(run_lint_test, name)] = name
+                finished, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in finished:
+                    name = futures.pop(future)
+                    # Re-raise any exception from the worker thread
+                    results = future.result()
+                    done.add(name)
+                    if name in self.lint_tests:
+                        self.progress_bar.update(lint_progress, advance=1, test_name=name)
+                        yield name, results
+
+    def _add_test_results(self, test_name, test_results):
+        """Add the results of a lint test to the passed, ignored, fixed, warned and failed lists
+
+        Args:
+            test_name (str): The name of the lint test
+            test_results (dict | None): The results of the lint test, or None if it was skipped
+        """
+        if test_results is None:
+            self.ignored.append((test_name, test_name))
+            return
+        for test in test_results.get("passed", []):
+            self.passed.append((test_name, test))
+        for test in test_results.get("ignored", []):
+            if self.fail_ignored:
+                self.failed.append((test_name, test))
+            else:
+                self.ignored.append((test_name, test))
+        for test in test_results.get("fixed", []):
+            self.fixed.append((test_name, test))
+        for test in test_results.get("warned", []):
+            if self.fail_warned:
+                self.failed.append((test_name, test))
+            else:
+                self.warned.append((test_name, test))
+        for test in test_results.get("failed", []):
+            self.failed.append((test_name, test))
+        if test_results.get("could_fix", False):
+            self.could_fix.append(test_name)
 
     def _print_results(self, show_passed):
         """Print linting results to the command line.
@@ -452,17 +604,15 @@ class PipelineLint(nf_core.utils.Pipeline):
 
         return markdown
 
-    def _save_json_results(self, json_fn):
+    def _get_json_results(self):
         """
-        Function to dump lint results to a JSON file for downstream use
+        Collect the lint results in a dictionary suitable for JSON output
 
-        Arguments:
-            json_fn (str): File path to write JSON to.
+        Returns:
+            results (dict): Lint results and counts
         """
-
-        log.info(f"Writing lint results to {json_fn}")
         now = datetime.datetime.now()
-        results = {
+        return {
             "nf_core_tools_version": nf_core.__version__,
             "date_run": now.strftime("%Y-%m-%d %H:%M:%S"),
             "tests_pass": [[idx, strip_ansi_codes(msg)] for idx, msg in self.passed],
@@ -482,8 +632,18 @@ class PipelineLint(nf_core.utils.Pipeline):
             "has_tests_failed": len(self.failed) > 0,
             "markdown_result": self._get_results_md(),
         }
+
+    def _save_json_results(self, json_fn):
+        """
+        Function to dump lint results to a JSON file for downstream use
+
+        Arguments:
+            json_fn (str): File path to write JSON to.
+        """
+
+        log.info(f"Writing lint results to {json_fn}")
         with open(json_fn, "w") as fh:
-            json.dump(results, fh, indent=4)
+            json.dump(self._get_json_results(), fh, indent=4)
 
     def _wrap_quotes(self, files: Union[List[str], List[Path], Path]) -> str:
         """Helper function to take a list of filenames and format with markdown.
@@ -516,6 +676,7 @@ def run_linting(
     md_fn=None,
     json_fn=None,
     hide_progress: bool = False,
+    jobs: int = 1,
 ) -> Tuple[PipelineLint, ComponentLint, Union[ComponentLint, None]]:
     """Runs all nf-core linting checks on a given Nextflow pipeline project
     in either `release` mode or `normal` mode (default). Returns an object
@@ -525,6 +686,7 @@ def run_linting(
         pipeline_dir (str): The path to the Nextflow pipeline root directory
         release_mode (bool): Set this to `True`, if the linting should be run in the `release` mode.
                              See :class:`PipelineLint` for more information.
+        jobs (int): Number of pipeline lint tests to run in parallel
 
     Returns:
         An object of type :class:`PipelineLint` that contains all the linting results.
@@ -533,29 +695,198 @@ def run_linting(
     """
 
     # Verify that the requested tests exist
-    if key:
-        all_tests = set(PipelineLint._get_all_lint_tests(release_mode)).union(
-            set(nf_core.modules.lint.ModuleLint.get_all_module_lint_tests(is_pipeline=True))
-        )
-        bad_keys = [k for k in key if k not in all_tests]
-        if len(bad_keys) > 0:
-            raise AssertionError(
-                "Test name{} not recognised: '{}'".format(
-                    _s(bad_keys),
-                    "', '".join(bad_keys),
+    pipeline_keys = _get_pipeline_keys(key, release_mode)
+
+    # Create the lint objects
+    lint_obj, module_lint_obj, subworkflow_lint_obj = _setup_lint_objects(
+        pipeline_dir, release_mode, fix, key, pipeline_keys, fail_ignored, fail_warned, hide_progress, jobs
+    )
+
+    # Run the pipeline linting tests
+    try:
+        lint_obj._lint_pipeline()
+    except AssertionError as e:
+        log.critical(f"Critical error: {e}")
+        log.info("Stopping tests...")
+        return lint_obj, module_lint_obj, subworkflow_lint_obj
+
+    # Run the module and subworkflow lint tests
+    _lint_pipeline_components(module_lint_obj, subworkflow_lint_obj)
+
+    # Print the results
+    lint_obj._print_results(show_passed)
+    module_lint_obj._print_results(show_passed, sort_by=sort_by)
+    if subworkflow_lint_obj is not None:
+        subworkflow_lint_obj._print_results(show_passed, sort_by=sort_by)
+    nf_core.lint_utils.print_joint_summary(lint_obj, module_lint_obj, subworkflow_lint_obj)
+    nf_core.lint_utils.print_fixes(lint_obj)
+
+    # Save results to Markdown file
+    if md_fn is not None:
+        log.info(f"Writing lint results to {md_fn}")
+        markdown = lint_obj._get_results_md()
+        with open(md_fn, "w") as fh:
+            fh.write(markdown)
+
+    # Save results to JSON file
+    if json_fn is not None:
+        lint_obj._save_json_results(json_fn)
+
+    # Reminder about --release mode flag if we had failures
+    if len(lint_obj.failed) > 0:
+        if release_mode:
+            log.info("Reminder: Lint tests were run in --release mode.")
+
+    return lint_obj, module_lint_obj, subworkflow_lint_obj
+
+
+def run_linting_batch(
+    pipeline_dirs: List[str],
+    release_mode: bool = False,
+    key=(),
+    fail_ignored: bool = False,
+    fail_warned: bool = False,
+    md_fn=None,
+    json_fn=None,
+    jobs: int = 1,
+    hide_progress: bool = False,
+) -> Tuple[Dict[str, Tuple[PipelineLint, ComponentLint, Union[ComponentLint, None]]], Dict[str, str]]:
+    """Runs the nf-core linting checks on several Nextflow pipeline projects in one session.
+
+    The pipelines are linted in a pool of ``jobs`` workers. The modules repository clones,
+    the conda package metadata and the resolved pipeline configs are shared between
+    the pipelines, and the results are written to a single combined report.
+
+    The lint objects of the pipelines are created one after another beforehand, as each of them
+    sets up the modules repository clones with the settings of its own ``.nf-core.yml``,
+    see :meth:`ModulesRepo.configure_session`. The pipelines are then linted with the default settings.
+
+    Args:
+        pipeline_dirs (list): The paths to the Nextflow pipeline root directories
+        release_mode (bool): Set this to `True`, if the linting should be run in the `release` mode.
+        jobs (int): Number of pipelines to lint in parallel
+
+    Returns:
+        A dictionary with the :class:`PipelineLint` and :class:`ComponentLint` objects of each pipeline.
+        A dictionary with the critical errors of the pipelines that could not be linted.
+    """
+    # Verify that the requested tests exist
+    pipeline_keys = _get_pipeline_keys(key, release_mode)
+
+    def lint_pipeline(lint_objs):
+        lint_objs[0]._lint_pipeline()
+        _lint_pipeline_components(*lint_objs[1:])
+        return lint_objs
+
+    lint_objs_by_dir = {}
+    lint_results = {}
+    lint_errors = {}
+    progress_bar = rich.progress.Progress(
+        "[bold blue]{task.description}",
+        rich.progress.BarColumn(bar_width=None),
+        "[magenta]{task.completed} of {task.total}[reset] » [bold yellow]{task.fields[pipeline]}",
+        transient=True,
+        console=console,
+        disable=hide_progress or os.environ.get("HIDE_PROGRESS", None) is not None,
+    )
+    with progress_bar:
+        lint_progress = progress_bar.add_task("Linting pipelines", total=len(pipeline_dirs), pipeline="")
+        for pipeline_dir in pipeline_dirs:
+            progress_bar.update(lint_progress, pipeline=pipeline_dir)
+            try:
+                # Only one progress bar can be shown at a time, so the batch shows its own
+                lint_objs_by_dir[pipeline_dir] = _setup_lint_objects(
+                    pipeline_dir, release_mode, (), key, pipeline_keys, fail_ignored, fail_warned, hide_progress=True
                 )
-            )
-        log.info("Only running tests: '{}'".format("', '".join(key)))
+            except (AssertionError, UserWarning, LookupError, RuntimeError) as e:
+                log.error(f"Could not lint pipeline '{pipeline_dir}': {e}")
+                lint_errors[pipeline_dir] = str(e)
+                progress_bar.update(lint_progress, advance=1)
+        # The session settings are shared by all threads, so the settings of the last pipeline are not kept
+        nf_core.modules.modules_repo.ModulesRepo.configure_session(None)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = {
+                pool.submit(lint_pipeline, lint_objs): pipeline_dir
+                for pipeline_dir, lint_objs in lint_objs_by_dir.items()
+            }
+            for future in concurrent.futures.as_completed(futures):
+                pipeline_dir = futures[future]
+                try:
+                    lint_results[pipeline_dir] = future.result()
+                except (AssertionError, UserWarning, LookupError, RuntimeError) as e:
+                    log.error(f"Could not lint pipeline '{pipeline_dir}': {e}")
+                    lint_errors[pipeline_dir] = str(e)
+                progress_bar.update(lint_progress, advance=1, pipeline=pipeline_dir)
+
+    # Keep the order of the pipelines that were given
+    lint_results = {
+        pipeline_dir: lint_results[pipeline_dir] for pipeline_dir in pipeline_dirs if pipeline_dir in lint_results
+    }
+
+    nf_core.lint_utils.print_batch_summary(lint_results, lint_errors)
 
-    # Check if we were given any keys, and if they match any pipeline tests
-    if key:
-        pipeline_keys = list(set(key).intersection(set(PipelineLint._get_all_lint_tests(release_mode))))
-    else:
+    # Save results to Markdown file
+    if md_fn is not None:
+        log.info(f"Writing lint results to {md_fn}")
+        markdown = ""
+        for pipeline_dir in pipeline_dirs:
+            if pipeline_dir in lint_results:
+                markdown += f"# `{pipeline_dir}`\n\n{lint_results[pipeline_dir][0]._get_results_md()}\n"
+            else:
+                markdown += f"# `{pipeline_dir}`\n\nCould not lint pipeline: {lint_errors[pipeline_dir]}\n\n"
+        with open(md_fn, "w") as fh:
+            fh.write(markdown)
+
+    # Save results to JSON file
+    if json_fn is not None:
+        log.info(f"Writing lint results to {json_fn}")
+        now = datetime.datetime.now()
+        results = {
+            "nf_core_tools_version": nf_core.__version__,
+            "date_run": now.strftime("%Y-%m-%d %H:%M:%S"),
+            "pipelines": {
+                pipeline_dir: lint_objs[0]._get_json_results() for pipeline_dir, lint_objs in lint_results.items()
+            },
+            "errors": lint_errors,
+        }
+        with open(json_fn, "w") as fh:
+            json.dump(results, fh, indent=4)
+
+    return lint_results, lint_errors
+
+
+def _get_pipeline_keys(key, release_mode: bool) -> Union[List[str], None]:
+    """Verify that the requested tests exist and select the pipeline lint tests among them"""
+    if not key:
         # If no key is supplied, run all tests
-        pipeline_keys = None
+        return None
+
+    all_tests = set(PipelineLint._get_all_lint_tests(release_mode)).union(
+        set(nf_core.modules.lint.ModuleLint.get_all_module_lint_tests(is_pipeline=True))
+    )
+    bad_keys = [k for k in key if k not in all_tests]
+    if len(bad_keys) > 0:
+        raise AssertionError(
+            "Test name{} not recognised: '{}'".format(
+                _s(bad_keys),
+                "', '".join(bad_keys),
+            )
+        )
+    log.info("Only running tests: '{}'".format("', '".join(key)))
+
+    # Check if the keys match any pipeline tests
+    return list(set(key).intersection(set(PipelineLint._get_all_lint_tests(release_mode))))
+
 
+def _setup_lint_objects(
+    pipeline_dir, release_mode, fix, key, pipeline_keys, fail_ignored, fail_warned, hide_progress, jobs=1
+) -> Tuple[PipelineLint, "nf_core.modules.lint.ModuleLint", Union["nf_core.subworkflows.lint.SubworkflowLint", None]]:
+    """Create the pipeline, module and subworkflow lint objects of a pipeline and load their files"""
     # Create the lint object
-    lint_obj = PipelineLint(pipeline_dir, release_mode, fix, pipeline_keys, fail_ignored, fail_warned, hide_progress)
+    lint_obj = PipelineLint(
+        pipeline_dir, release_mode, fix, pipeline_keys, fail_ignored, fail_warned, hide_progress, jobs
+    )
 
     # Load the various pipeline configs
     lint_obj._load_lint_config()
@@ -598,14 +929,14 @@ def run_linting(
     if subworkflow_lint_obj is not None:
         subworkflow_lint_obj.set_up_pipeline_files()
 
-    # Run the pipeline linting tests
-    try:
-        lint_obj._lint_pipeline()
-    except AssertionError as e:
-        log.critical(f"Critical error: {e}")
-        log.info("Stopping tests...")
-        return lint_obj, module_lint_obj, subworkflow_lint_obj
+    return lint_obj, module_lint_obj, subworkflow_lint_obj
+
 
+def _lint_pipeline_components(
+    module_lint_obj: "nf_core.modules.lint.ModuleLint",
+    subworkflow_lint_obj: Union["nf_core.subworkflows.lint.SubworkflowLint", None],
+):
+    """Run the module and subworkflow lint tests of a pipeline"""
     # Run the module lint tests
     if len(module_lint_obj.all_local_components) > 0:
         module_lint_obj.lint_modules(module_lint_obj.all_local_components, local=True)
@@ -617,29 +948,3 @@ def run_linting(
             subworkflow_lint_obj.lint_subworkflows(subworkflow_lint_obj.all_local_components, local=True)
         if len(subworkflow_lint_obj.all_remote_components) > 0:
             subworkflow_lint_obj.lint_subworkflows(subworkflow_lint_obj.all_remote_components, local=False)
-
-    # Print the results
-    lint_obj._print_results(show_passed)
-    module_lint_obj._print_results(show_passed, sort_by=sort_by)
-    if subworkflow_lint_obj is not None:
-        subworkflow_lint_obj._print_results(show_passed, sort_by=sort_by)
-    nf_core.lint_utils.print_joint_summary(lint_obj, module_lint_obj, subworkflow_lint_obj)
-    nf_core.lint_utils.print_fixes(lint_obj)
-
-    # Save results to Markdown file
-    if md_fn is not None:
-        log.info(f"Writing lint results to {md_fn}")
-        markdown = lint_obj._get_results_md()
-        with open(md_fn, "w") as fh:
-            fh.write(markdown)
-
-    # Save results to JSON file
-    if json_fn is not None:
-        lint_obj._save_json_results(json_fn)
-
-    # Reminder about --release mode flag if we had failures
-    if len(lint_obj.failed) > 0:
-        if release_mode:
-            log.info("Reminder: Lint tests were run in --release mode.")
-
-    return lint_obj, module_lint_obj, subworkflow_lint_obj
@@ -1,14 +1,16 @@
-import filecmp
+import hashlib
+import json
 import logging
 import os
 import shutil
 import tempfile
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, List, Tuple, Union
 
 import yaml
 
 import nf_core.create
+import nf_core.utils
 
 log = logging.getLogger(__name__)
 
@@ -108,12 +110,6 @@ def files_unchanged(self) -> Dict[str, Union[List[str], bool]]:
         [Path(".gitignore"), Path(".prettierignore")],
     ]
 
-    # Only show error messages from pipeline creation
-    logging.getLogger("nf_core.create").setLevel(logging.ERROR)
-
-    # Generate a new pipeline with nf-core create that we can compare to
-    tmp_dir = tempfile.mkdtemp()
-
     # Create a template.yaml file for the pipeline creation
     template_yaml = {
         "name": short_name,
@@ -122,15 +118,10 @@ def files_unchanged(self) -> Dict[str, Union[List[str], bool]]:
         "prefix": prefix,
     }
 
-    template_yaml_path = Path(tmp_dir, "template.yaml")
-    with open(template_yaml_path, "w") as fh:
-        yaml.dump(template_yaml, fh, default_flow_style=False)
-
-    test_pipeline_dir = Path(tmp_dir, f"{prefix}-{short_name}")
-    create_obj = nf_core.create.PipelineCreate(
-        None, None, None, no_git=True, outdir=test_pipeline_dir, template_yaml_path=template_yaml_path
+    # Generate a new pipeline with nf-core create that we can compare to, or reuse a cached one
+    test_pipeline_dir, template_md5s = get_reference_template(
+        template_yaml, [f for files in files_exact + files_partial for f in files]
     )
-    create_obj.init_pipeline()
 
     # Helper functions for file paths
     def _pf(file_path: Union[str, Path]) -> Path:
@@ -156,8 +147,10 @@ def files_unchanged(self) -> Dict[str, Union[List[str], bool]]:
         # Check that the file has an identical match
         else:
             for f in files:
+                if str(f) not in template_md5s:
+                    continue
                 try:
-                    if filecmp.cmp(_pf(f), _tf(f), shallow=True):
+                    if nf_core.utils.file_md5(_pf(f)) == template_md5s[str(f)]:
                         passed.append(f"`{f}` matches the template")
                     else:
                         if f.name.endswith(".png") and int(os.stat(_pf(f)).st_size / 500) == int(
@@ -212,7 +205,79 @@ def files_unchanged(self) -> Dict[str, Union[List[str], bool]]:
                 except FileNotFoundError:
                     pass
 
-    # cleaning up temporary dir
+    return {"passed": passed, "failed": failed, "ignored": ignored, "fixed": fixed, "could_fix": could_fix}
+
+
+def get_template_source_hash() -> str:
+    """Hash the files of the pipeline template, to tell apart renders of different template versions"""
+    template_dir = Path(nf_core.create.__file__).parent / "pipeline-template"
+    template_hash = hashlib.sha256()
+    for root, dirs, files in os.walk(template_dir):
+        dirs.sort()
+        for fn in sorted(files):
+            template_hash.update(str(Path(root, fn).relative_to(template_dir)).encode("utf-8"))
+            template_hash.update(nf_core.utils.file_md5(Path(root, fn)).encode("utf-8"))
+    return template_hash.hexdigest()
+
+
+def get_reference_template(template_yaml: Dict[str, str], files: List[Path]) -> Tuple[Path, Dict[str, str]]:
+    """Render the pipeline template for the given pipeline metadata, or load it from the cache.
+
+    The renders are cached by nf-core/tools version, template contents and pipeline metadata.
+    Only the given files are kept, together with their md5 sums.
+
+    Args:
+        template_yaml (dict): The pipeline name, description, author and prefix for ``nf-core create``
+        files (list): The template files to keep
+
+    Returns:
+        Path: The directory with the rendered template files
+        dict: The md5 sums of the rendered template files, by file path
+    """
+    cache_key = json.dumps(
+        {"version": nf_core.__version__, "template": get_template_source_hash(), **template_yaml}, sort_keys=True
+    )
+    cache_dir = Path(
+        nf_core.utils.setup_nfcore_cachedir("pipeline_template"),
+        hashlib.sha256(cache_key.encode("utf-8")).hexdigest()[:25],
+    )
+    md5s_path = cache_dir / "template_md5s.json"
+    if md5s_path.is_file():
+        log.debug(f"Using the cached pipeline template in {cache_dir}")
+        with open(md5s_path) as fh:
+            return cache_dir, json.load(fh)
+
+    # Only show error messages from pipeline creation
+    logging.getLogger("nf_core.create").setLevel(logging.ERROR)
+
+    tmp_dir = tempfile.mkdtemp()
+    template_yaml_path = Path(tmp_dir, "template.yaml")
+    with open(template_yaml_path, "w") as fh:
+        yaml.dump(template_yaml, fh, default_flow_style=False)
+
+    test_pipeline_dir = Path(tmp_dir, f"{template_yaml['prefix']}-{template_yaml['name']}")
+    create_obj = nf_core.create.PipelineCreate(
+        None, None, None, no_git=True, outdir=test_pipeline_dir, template_yaml_path=template_yaml_path
+    )
+    create_obj.init_pipeline()
+
+    # Keep the files that are compared, next to the cache directory until they are all copied
+    render_dir = Path(tempfile.mkdtemp(dir=cache_dir.parent))
+    template_md5s = {}
+    for f in files:
+        if Path(test_pipeline_dir, f).is_file():
+            Path(render_dir, f).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy(Path(test_pipeline_dir, f), Path(render_dir, f))
+            template_md5s[str(f)] = nf_core.utils.file_md5(Path(render_dir, f))
+    with open(render_dir / "template_md5s.json", "w") as fh:
+        json.dump(template_md5s, fh, indent=4)
     shutil.rmtree(tmp_dir)
 
-    return {"passed": passed, "failed": failed, "ignored": ignored, "fixed": fixed, "could_fix": could_fix}
+    try:
+        render_dir.rename(cache_dir)
+    except OSError:
+        # Another lint run cached the same template in the meantime
+        shutil.rmtree(render_dir)
+        if not md5s_path.is_file():
+            raise
+    return cache_dir, template_md5s
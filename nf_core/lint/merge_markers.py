@@ -1,6 +1,6 @@
-import fnmatch
 import logging
 import os
+from pathlib import Path
 
 import nf_core.utils
 
@@ -37,34 +37,21 @@ def merge_markers(self):
 
     ignored_config = self.lint_config.get("merge_markers", [])
 
-    ignore = [".git"]
-    if os.path.isfile(os.path.join(self.wf_path, ".gitignore")):
-        with open(os.path.join(self.wf_path, ".gitignore"), encoding="latin1") as fh:
-            for line in fh:
-                ignore.append(os.path.basename(line.strip().rstrip("/")))
-    for root, dirs, files in os.walk(self.wf_path, topdown=True):
-        # Ignore files
-        for i_base in ignore:
-            i = os.path.join(root, i_base)
-            dirs[:] = [d for d in dirs if not fnmatch.fnmatch(os.path.join(root, d), i)]
-            files[:] = [f for f in files if not fnmatch.fnmatch(os.path.join(root, f), i)]
-        for fname in files:
-            # File ignored in config
-            if os.path.relpath(os.path.join(root, fname), self.wf_path) in ignored_config:
-                ignored.append(f"Ignoring file `{os.path.join(root, fname)}`")
-                continue
-            # Skip binary files
-            if nf_core.utils.is_file_binary(os.path.join(root, fname)):
-                continue
-            try:
-                with open(os.path.join(root, fname), encoding="latin1") as fh:
-                    for line in fh:
-                        if ">>>>>>>" in line:
-                            failed.append(f"Merge marker '>>>>>>>' in `{os.path.join(root, fname)}`: {line[:30]}")
-                        if "<<<<<<<" in line:
-                            failed.append(f"Merge marker '<<<<<<<' in `{os.path.join(root, fname)}`: {line[:30]}")
-            except FileNotFoundError:
-                log.debug(f"Could not open file {os.path.join(root, fname)} in merge_markers lint test")
+    self._scan_files()
+    for file_path in self.unignored_files:
+        # File ignored in config
+        if os.path.relpath(file_path, self.wf_path) in ignored_config:
+            ignored.append(f"Ignoring file `{file_path}`")
+            continue
+        lines = self.file_lines[Path(file_path)]
+        # Skip files without merge markers and binary files
+        if not lines or nf_core.utils.is_file_binary(file_path):
+            continue
+        for line in lines:
+            if ">>>>>>>" in line:
+                failed.append(f"Merge marker '>>>>>>>' in `{file_path}`: {line[:30]}")
+            if "<<<<<<<" in line:
+                failed.append(f"Merge marker '<<<<<<<' in `{file_path}`: {line[:30]}")
     if len(failed) == 0:
         passed.append("No merge markers found in pipeline files")
     return {"passed": passed, "failed": failed, "ignored": ignored}
@@ -1,6 +1,8 @@
-import fnmatch
 import logging
 import os
+from pathlib import Path
+
+import nf_core.lint_utils
 
 log = logging.getLogger(__name__)
 
@@ -33,39 +35,34 @@ def pipeline_todos(self, root_dir=None):
     warned = []
     file_paths = []
 
-    # Pipelines don't provide a path, so use the workflow path.
+    # Pipelines don't provide a path, so use the workflow path and the files scanned for all lint tests.
     # Modules run this function twice and provide a string path
     if root_dir is None:
-        root_dir = self.wf_path
-
-    ignore = [".git"]
-    if os.path.isfile(os.path.join(root_dir, ".gitignore")):
-        with open(os.path.join(root_dir, ".gitignore"), encoding="latin1") as fh:
-            for line in fh:
-                ignore.append(os.path.basename(line.strip().rstrip("/")))
-    for root, dirs, files in os.walk(root_dir, topdown=True):
-        # Ignore files
-        for i_base in ignore:
-            i = os.path.join(root, i_base)
-            dirs[:] = [d for d in dirs if not fnmatch.fnmatch(os.path.join(root, d), i)]
-            files[:] = [f for f in files if not fnmatch.fnmatch(os.path.join(root, f), i)]
-        for fname in files:
-            try:
-                with open(os.path.join(root, fname), encoding="latin1") as fh:
-                    for line in fh:
-                        if "TODO nf-core" in line:
-                            line = (
-                                line.replace("<!--", "")
-                                .replace("-->", "")
-                                .replace("# TODO nf-core: ", "")
-                                .replace("// TODO nf-core: ", "")
-                                .replace("TODO nf-core: ", "")
-                                .strip()
-                            )
-                            warned.append(f"TODO string in `{fname}`: _{line}_")
-                            file_paths.append(os.path.join(root, fname))
-            except FileNotFoundError:
-                log.debug(f"Could not open file {fname} in pipeline_todos lint test")
+        self._scan_files()
+        unignored_files = self.unignored_files
+        file_lines = self.file_lines
+    else:
+        unignored_files = nf_core.lint_utils.list_unignored_files(root_dir)
+        file_lines = nf_core.lint_utils.scan_files(unignored_files)
+
+    for file_path in unignored_files:
+        lines = file_lines[Path(file_path)]
+        # Skip files that could not be read
+        if lines is None:
+            continue
+        fname = os.path.basename(file_path)
+        for line in lines:
+            if "TODO nf-core" in line:
+                line = (
+                    line.replace("<!--", "")
+                    .replace("-->", "")
+                    .replace("# TODO nf-core: ", "")
+                    .replace("// TODO nf-core: ", "")
+                    .replace("TODO nf-core: ", "")
+                    .strip()
+                )
+                warned.append(f"TODO string in `{fname}`: _{line}_")
+                file_paths.append(file_path)
 
     if len(warned) == 0:
         passed.append("No TODO strings found")
@@ -1,5 +1,6 @@
 import mimetypes
 import re
+from pathlib import Path
 
 
 def template_strings(self):
@@ -41,26 +42,27 @@ def template_strings(self):
     ignore_files = self.lint_config.get("template_strings", [])
 
     # Loop through files, searching for string
+    self._scan_files()
     num_matches = 0
     for fn in self.files:
         if str(fn.relative_to(self.wf_path)) in ignore_files:
             ignored.append(f"Ignoring Jinja template strings in file `{fn}`")
             continue
+        lines = self.file_lines[Path(fn)]
+        # Skip files without template strings
+        if not lines:
+            continue
         # Skip binary files
         binary_ftypes = ["image", "application/java-archive"]
         (ftype, encoding) = mimetypes.guess_type(fn)
         if encoding is not None or (ftype is not None and any([ftype.startswith(ft) for ft in binary_ftypes])):
             continue
-
-        with open(fn, encoding="latin1") as fh:
-            lnum = 0
-            for line in fh:
-                lnum += 1
-                cc_matches = re.findall(r"[^$]{{[^:}]*}}", line)
-                if len(cc_matches) > 0:
-                    for cc_match in cc_matches:
-                        failed.append(f"Found a Jinja template string in `{fn}` L{lnum}: {cc_match}")
-                        num_matches += 1
+        for lnum, line in enumerate(lines, start=1):
+            cc_matches = re.findall(r"[^$]{{[^:}]*}}", line)
+            if len(cc_matches) > 0:
+                for cc_match in cc_matches:
+                    failed.append(f"Found a Jinja template string in `{fn}` L{lnum}: {cc_match}")
+                    num_matches += 1
     if num_matches == 0:
         passed.append(f"Did not find any Jinja template strings ({len(self.files)} files)")
 
@@ -1,8 +1,13 @@
+import fnmatch
+import io
 import json
 import logging
+import mmap
+import os
+import re
 import subprocess
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, List, Optional, Union
 
 import rich
 from rich.console import Console
@@ -16,9 +21,14 @@ log = logging.getLogger(__name__)
 # Create a console used by all lint tests
 console = Console(force_terminal=nf_core.utils.rich_force_colors())
 
+# Matches anything that the text-scanning lint tests (pipeline_todos, merge_markers, template_strings) look for
+SCAN_PATTERN = re.compile(rb"TODO nf-core|>>>>>>>|<<<<<<<|[^$\r\n]{{[^:}\r\n]*}}")
+# Files larger than this are memory-mapped when scanned
+SCAN_MMAP_SIZE = 1024 * 1024
 
-def print_joint_summary(lint_obj, module_lint_obj, subworkflow_lint_obj):
-    """Print a joint summary of the general pipe lint tests and the module and subworkflow lint tests"""
+
+def count_joint_results(lint_obj, module_lint_obj, subworkflow_lint_obj):
+    """Count the results of the general pipe lint tests and the module and subworkflow lint tests together"""
     swf_passed = 0
     swf_warned = 0
     swf_failed = 0
@@ -26,11 +36,23 @@ def print_joint_summary(lint_obj, module_lint_obj, subworkflow_lint_obj):
         swf_passed = len(subworkflow_lint_obj.passed)
         swf_warned = len(subworkflow_lint_obj.warned)
         swf_failed = len(subworkflow_lint_obj.failed)
-    nbr_passed = len(lint_obj.passed) + len(module_lint_obj.passed) + swf_passed
-    nbr_ignored = len(lint_obj.ignored)
-    nbr_fixed = len(lint_obj.fixed)
-    nbr_warned = len(lint_obj.warned) + len(module_lint_obj.warned) + swf_warned
-    nbr_failed = len(lint_obj.failed) + len(module_lint_obj.failed) + swf_failed
+    return {
+        "passed": len(lint_obj.passed) + len(module_lint_obj.passed) + swf_passed,
+        "ignored": len(lint_obj.ignored),
+        "fixed": len(lint_obj.fixed),
+        "warned": len(lint_obj.warned) + len(module_lint_obj.warned) + swf_warned,
+        "failed": len(lint_obj.failed) + len(module_lint_obj.failed) + swf_failed,
+    }
+
+
+def print_joint_summary(lint_obj, module_lint_obj, subworkflow_lint_obj):
+    """Print a joint summary of the general pipe lint tests and the module and subworkflow lint tests"""
+    counts = count_joint_results(lint_obj, module_lint_obj, subworkflow_lint_obj)
+    nbr_passed = counts["passed"]
+    nbr_ignored = counts["ignored"]
+    nbr_fixed = counts["fixed"]
+    nbr_warned = counts["warned"]
+    nbr_failed = counts["failed"]
 
     summary_colour = "red" if nbr_failed > 0 else "green"
     table = Table(box=rich.box.ROUNDED, style=summary_colour)
@@ -44,6 +66,51 @@ def print_joint_summary(lint_obj, module_lint_obj, subworkflow_lint_obj):
     console.print(table)
 
 
+def print_batch_summary(lint_results, lint_errors):
+    """Print a summary table of the lint results of several pipelines"""
+    failed = len(lint_errors) > 0
+    table = Table(box=rich.box.ROUNDED, title="LINT RESULTS SUMMARY")
+    table.add_column("Pipeline", no_wrap=True)
+    table.add_column("[green]Passed", justify="right")
+    table.add_column("[grey58]Ignored", justify="right")
+    table.add_column("[yellow]Warned", justify="right")
+    table.add_column("[red]Failed", justify="right")
+    for pipeline_dir, lint_objs in lint_results.items():
+        counts = count_joint_results(*lint_objs)
+        failed = failed or counts["failed"] > 0
+        table.add_row(
+            str(pipeline_dir),
+            str(counts["passed"]),
+            str(counts["ignored"]),
+            str(counts["warned"]),
+            str(counts["failed"]),
+            style="red" if counts["failed"] > 0 else None,
+        )
+    for pipeline_dir in lint_errors:
+        table.add_row(str(pipeline_dir), "", "", "", "error", style="red")
+    table.style = "red" if failed else "green"
+    console.print(table)
+
+    # List the failed tests of each pipeline
+    for pipeline_dir, (lint_obj, module_lint_obj, subworkflow_lint_obj) in lint_results.items():
+        failed_tests = [(test_name, "", message) for test_name, message in lint_obj.failed]
+        for component_lint_obj in (module_lint_obj, subworkflow_lint_obj):
+            if component_lint_obj is not None:
+                failed_tests += [
+                    (lint_result.lint_test, lint_result.component_name, lint_result.message)
+                    for lint_result in component_lint_obj.failed
+                ]
+        if not failed_tests:
+            continue
+        table = Table(box=rich.box.MINIMAL, title=f"[red]Failed tests of {pipeline_dir}", style="red")
+        table.add_column("Test", no_wrap=True)
+        table.add_column("Component", no_wrap=True)
+        table.add_column("Message")
+        for test_name, component_name, message in failed_tests:
+            table.add_row(test_name, component_name, message)
+        console.print(table)
+
+
 def print_fixes(lint_obj):
     """Prints available and applied fixes"""
 
@@ -129,3 +196,65 @@ def ignore_file(lint_name: str, file_path: Path, dir_path: Path) -> List[List[st
         ignore_entry = []
 
     return [passed, failed, ignored, ignore_entry]
+
+
+def list_unignored_files(root_dir: Union[str, Path]) -> List[str]:
+    """List the files in a directory, skipping `.git` and the names listed in its `.gitignore` file"""
+    ignore = [".git"]
+    if os.path.isfile(os.path.join(root_dir, ".gitignore")):
+        with open(os.path.join(root_dir, ".gitignore"), encoding="latin1") as fh:
+            for line in fh:
+                ignore.append(os.path.basename(line.strip().rstrip("/")))
+
+    file_paths: List[str] = []
+    for root, dirs, files in os.walk(root_dir, topdown=True):
+        # Ignore files
+        for i_base in ignore:
+            i = os.path.join(root, i_base)
+            dirs[:] = [d for d in dirs if not fnmatch.fnmatch(os.path.join(root, d), i)]
+            files[:] = [f for f in files if not fnmatch.fnmatch(os.path.join(root, f), i)]
+        file_paths.extend(os.path.join(root, fname) for fname in files)
+    return file_paths
+
+
+def scan_files(file_paths: Iterable[Union[str, Path]]) -> Dict[Path, Optional[List[str]]]:
+    """Read files once for all text-scanning lint tests.
+
+    Every file is checked against :data:`SCAN_PATTERN` as a whole, and only
+    the files with a match are split into lines for the lint tests. Like the lint tests
+    did before, all files are decoded as latin1, binary files included: the tests that
+    skip binary files check this themselves, for the files with a match.
+
+    Args:
+        file_paths (list): Paths of the files to scan
+
+    Returns:
+        dict: The lines of the files with a match, an empty list for files without
+              a match and ``None`` for files that could not be read
+    """
+    file_lines: Dict[Path, Optional[List[str]]] = {}
+    for file_path in file_paths:
+        path = Path(file_path)
+        if path in file_lines:
+            continue
+        try:
+            with open(path, "rb") as fh:
+                size = os.fstat(fh.fileno()).st_size
+                if size == 0:
+                    content = b""
+                elif size > SCAN_MMAP_SIZE:
+                    with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        content = mm[:] if SCAN_PATTERN.search(mm) else b""
+                else:
+                    content = fh.read()
+        except FileNotFoundError:
+            log.debug(f"Could not open file {file_path} for lint tests")
+            file_lines[path] = None
+            continue
+        if SCAN_PATTERN.search(content) is None:
+            file_lines[path] = []
+        else:
+            # Split lines like reading the file in text mode would
+            with io.TextIOWrapper(io.BytesIO(content), encoding="latin1") as fh:
+                file_lines[path] = fh.readlines()
+    return file_lines
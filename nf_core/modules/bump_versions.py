@@ -110,6 +110,14 @@ class ModuleVersionBumper(ComponentCommand):  # type: ignore[misc]
                     f"Could not find the specified module: '{module}'"
                 )
 
+        # Look up all bioconda packages at once, so that the modules below are served from the cache
+        nf_core.utils.package_metadata.prefetch(
+            package.strip("'").strip('"')
+            for mod in nfcore_modules
+            for package in self.get_bioconda_version(mod, log_missing=False)
+            if isinstance(package, str) and "bioconda::" in package
+        )
+
         progress_bar = Progress(
             "[bold blue]{task.description}",
             BarColumn(bar_width=None),
@@ -174,7 +182,7 @@ class ModuleVersionBumper(ComponentCommand):  # type: ignore[misc]
 
         if not config_version:
             try:
-                response = nf_core.utils.anaconda_package(bp)
+                response = nf_core.utils.package_metadata.anaconda_package(bp)
             except (LookupError, ValueError):
                 self.failed.append((f"Conda version not specified correctly: {module.main_nf}", module.component_name))
                 return False
@@ -193,7 +201,9 @@ class ModuleVersionBumper(ComponentCommand):  # type: ignore[misc]
             log.debug(f"Updating version for {module.component_name}")
             # Get docker and singularity container links
             try:
-                docker_img, singularity_img = nf_core.utils.get_biocontainer_tag(bioconda_tool_name, last_ver)
+                docker_img, singularity_img = nf_core.utils.package_metadata.get_biocontainer_tag(
+                    bioconda_tool_name, last_ver
+                )
             except LookupError as e:
                 self.failed.append((f"Could not download container tags: {e}", module.component_name))
                 return False
@@ -257,7 +267,7 @@ class ModuleVersionBumper(ComponentCommand):  # type: ignore[misc]
             self.up_to_date.append((f"Module version up to date: {module.component_name}", module.component_name))
             return True
 
-    def get_bioconda_version(self, module: NFCoreComponent) -> List[str]:
+    def get_bioconda_version(self, module: NFCoreComponent, log_missing: bool = True) -> List[str]:
         """
         Extract the bioconda version from a module
         """
@@ -268,7 +278,8 @@ class ModuleVersionBumper(ComponentCommand):  # type: ignore[misc]
                 env_yml = yaml.safe_load(fh)
             bioconda_packages = env_yml.get("dependencies", [])
         except FileNotFoundError:
-            log.error(f"Could not read `environment.yml` of {module.component_name} module.")
+            if log_missing:
+                log.error(f"Could not read `environment.yml` of {module.component_name} module.")
 
         return bioconda_packages
 
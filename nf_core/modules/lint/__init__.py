@@ -11,10 +11,11 @@ import os
 
 import questionary
 import rich
+import yaml
 
 import nf_core.modules.modules_utils
 import nf_core.utils
-from nf_core.components.lint import ComponentLint, LintExceptionError, LintResult
+from nf_core.components.lint import ComponentLint, LintExceptionError
 from nf_core.lint_utils import console
 
 log = logging.getLogger(__name__)
@@ -46,6 +47,7 @@ class ModuleLint(ComponentLint):
         no_pull=False,
         registry=None,
         hide_progress=False,
+        jobs=1,
     ):
         super().__init__(
             component_type="modules",
@@ -56,6 +58,7 @@ class ModuleLint(ComponentLint):
             no_pull=no_pull,
             registry=registry,
             hide_progress=hide_progress,
+            jobs=jobs,
         )
 
     def lint(
@@ -164,25 +167,37 @@ class ModuleLint(ComponentLint):
             local (boolean): Whether the list consist of local or nf-core modules
             fix_version (boolean): Fix the module version if a newer version is available
         """
-        # TODO: consider unifying modules and subworkflows lint_modules() function and add it to the ComponentLint class
-        progress_bar = rich.progress.Progress(
-            "[bold blue]{task.description}",
-            rich.progress.BarColumn(bar_width=None),
-            "[magenta]{task.completed} of {task.total}[reset] » [bold yellow]{task.fields[test_name]}",
-            transient=True,
-            console=console,
-            disable=self.hide_progress or os.environ.get("HIDE_PROGRESS", None) is not None,
-        )
-        with progress_bar:
-            lint_progress = progress_bar.add_task(
-                f"Linting {'local' if local else 'nf-core'} modules",
-                total=len(modules),
-                test_name=modules[0].component_name,
-            )
+        if not local and "main_nf" in self.lint_tests:
+            # Look up the conda packages of all modules at once, the main_nf test is then served from the cache
+            nf_core.utils.package_metadata.prefetch(self.get_bioconda_packages(modules))
+        self.lint_components(modules, self.lint_module, registry=registry, local=local, fix_version=fix_version)
+
+    @staticmethod
+    def get_bioconda_packages(modules):
+        """
+        Get the bioconda packages from the `environment.yml` files of a list of modules
 
-            for mod in modules:
-                progress_bar.update(lint_progress, advance=1, test_name=mod.component_name)
-                self.lint_module(mod, progress_bar, registry=registry, local=local, fix_version=fix_version)
+        Args:
+            modules ([NFCoreComponent]): A list of module objects
+
+        Returns:
+            ([ str ]): The bioconda packages, e.g. 'bioconda::fastqc=0.12.1'
+        """
+        bioconda_packages = []
+        for mod in modules:
+            try:
+                with open(mod.environment_yml) as fh:
+                    env_yml = yaml.safe_load(fh)
+            except (FileNotFoundError, NotADirectoryError, yaml.YAMLError):
+                continue
+            if not isinstance(env_yml, dict):
+                continue
+            bioconda_packages += [
+                dep.strip("'").strip('"')
+                for dep in env_yml.get("dependencies") or []
+                if isinstance(dep, str) and "bioconda::" in dep
+            ]
+        return bioconda_packages
 
     def lint_module(self, mod, progress_bar, registry, local=False, fix_version=False):
         """
@@ -204,13 +219,6 @@ class ModuleLint(ComponentLint):
         # Only check the main script in case of a local module
         if local:
             self.main_nf(mod, fix_version, self.registry, progress_bar)
-            self.passed += [LintResult(mod, *m) for m in mod.passed]
-            warned = [LintResult(mod, *m) for m in (mod.warned + mod.failed)]
-            if not self.fail_warned:
-                self.warned += warned
-            else:
-                self.failed += warned
-
         # Otherwise run all the lint tests
         else:
             if self.repo_type == "pipeline" and self.modules_json:
@@ -223,12 +231,3 @@ class ModuleLint(ComponentLint):
                     getattr(self, test_name)(mod, fix_version, self.registry, progress_bar)
                 else:
                     getattr(self, test_name)(mod)
-
-            self.passed += [LintResult(mod, *m) for m in mod.passed]
-            warned = [LintResult(mod, *m) for m in mod.warned]
-            if not self.fail_warned:
-                self.warned += warned
-            else:
-                self.failed += warned
-
-            self.failed += [LintResult(mod, *m) for m in mod.failed]
@@ -364,8 +364,7 @@ def check_process_section(self, lines, registry, fix_version, progress_bar):
         # Check for correct version and newer versions
         try:
             bioconda_version = bp.split("=")[1]
-            # response = _bioconda_package(bp)
-            response = nf_core.utils.anaconda_package(bp)
+            response = nf_core.utils.package_metadata.anaconda_package(bp)
         except LookupError:
             self.warned.append(("bioconda_version", "Conda version not specified correctly", self.main_nf))
         except ValueError:
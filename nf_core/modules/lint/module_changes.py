@@ -2,11 +2,10 @@
 Check whether the content of a module has changed compared to the original repository
 """
 
-import shutil
-import tempfile
 from pathlib import Path
 
 import nf_core.modules.modules_repo
+from nf_core.component_snapshot import ComponentSnapshot
 from nf_core.modules.modules_differ import ModulesDiffer
 
 
@@ -26,32 +25,26 @@ def module_changes(module_lint_object, module):
     if module.is_patched:
         # If the module is patched, we need to apply
         # the patch in reverse before comparing with the remote
-        tempdir_parent = Path(tempfile.mkdtemp())
-        tempdir = tempdir_parent / "tmp_module_dir"
-        shutil.copytree(module.component_dir, tempdir)
         try:
-            new_lines = ModulesDiffer.try_apply_patch(
+            module_snapshot = ModulesDiffer.try_apply_patch_to_snapshot(
                 module.component_name,
                 module.org,
                 module.patch_path,
-                tempdir,
+                ComponentSnapshot.from_dir(module.component_dir),
                 reverse=True,
             )
-            for file, lines in new_lines.items():
-                with open(tempdir / file, "w") as fh:
-                    fh.writelines(lines)
         except LookupError:
             # This error is already reported by module_patch, so just return
             return
     else:
-        tempdir = module.component_dir
+        module_snapshot = module.component_dir
     module.branch = module_lint_object.modules_json.get_component_branch(
         "modules", module.component_name, module.repo_url, module.org
     )
     modules_repo = nf_core.modules.modules_repo.ModulesRepo(remote_url=module.repo_url, branch=module.branch)
 
     for f, same in modules_repo.component_files_identical(
-        module.component_name, tempdir, module.git_sha, "modules"
+        module.component_name, module_snapshot, module.git_sha, "modules"
     ).items():
         if same:
             module.passed.append(
@@ -1,17 +1,22 @@
+import bisect
 import difflib
 import enum
 import json
 import logging
-import os
 from pathlib import Path
 
 from rich.console import Console
 from rich.syntax import Syntax
 
 import nf_core.utils
+from nf_core.component_snapshot import ComponentSnapshot
 
 log = logging.getLogger(__name__)
 
+# Files with fewer lines than this in total are diffed with difflib. The lines of larger files, such as
+# test snapshots, are matched with the patience diff, which is linear in their size for the usual edits
+PATIENCE_DIFF_MIN_LINES = 2000
+
 
 class ModulesDiffer:
     """
@@ -37,8 +42,10 @@ class ModulesDiffer:
         and the new version.
 
         Args:
-            from_dir (strOrPath): The folder containing the old module files
-            to_dir (strOrPath): The folder containing the new module files
+            from_dir (strOrPath | ComponentSnapshot): The folder containing the old module files,
+                                                      or a snapshot of them
+            to_dir (strOrPath | ComponentSnapshot): The folder containing the new module files,
+                                                    or a snapshot of them
             path_in_diff (strOrPath): The directory displayed containing the module
                                       file in the diff. Added so that temporary dirs
                                       are not shown
@@ -55,36 +62,34 @@ class ModulesDiffer:
         if for_git:
             dsp_from_dir = Path("a", dsp_from_dir)
             dsp_to_dir = Path("b", dsp_to_dir)
+        from_snapshot = ComponentSnapshot.of(from_dir)
+        to_snapshot = ComponentSnapshot.of(to_dir)
 
         diffs = {}
         # Get all unique filenames in the two folders.
         # `dict.fromkeys()` is used instead of `set()` to preserve order
-        files = dict.fromkeys(
-            [Path(dirpath, file).relative_to(to_dir) for dirpath, _, files in os.walk(to_dir) for file in files]
-        )
-        files.update(
-            dict.fromkeys(
-                [Path(dirpath, file).relative_to(from_dir) for dirpath, _, files in os.walk(from_dir) for file in files]
-            )
-        )
+        files = dict.fromkeys(Path(file) for file in to_snapshot)
+        files.update(dict.fromkeys(Path(file) for file in from_snapshot))
         files = list(files)
 
         # Loop through all the module files and compute their diffs if needed
         for file in files:
-            temp_path = Path(to_dir, file)
-            curr_path = Path(from_dir, file)
-            if temp_path.exists() and curr_path.exists() and temp_path.is_file():
-                with open(temp_path) as fh:
-                    new_lines = fh.readlines()
-                with open(curr_path) as fh:
-                    old_lines = fh.readlines()
+            new_exists = file in to_snapshot
+            old_exists = file in from_snapshot
+            if new_exists and old_exists:
+                if from_snapshot.file_identical(file, to_snapshot):
+                    # The files are byte for byte identical, no need to read their lines
+                    diffs[file] = (ModulesDiffer.DiffEnum.UNCHANGED, ())
+                    continue
+                new_lines = to_snapshot.read_lines(file)
+                old_lines = from_snapshot.read_lines(file)
 
                 if new_lines == old_lines:
                     # The files are identical
                     diffs[file] = (ModulesDiffer.DiffEnum.UNCHANGED, ())
                 else:
                     # Compute the diff
-                    diff = difflib.unified_diff(
+                    diff = ModulesDiffer.unified_diff(
                         old_lines,
                         new_lines,
                         fromfile=str(Path(dsp_from_dir, file)),
@@ -92,26 +97,22 @@ class ModulesDiffer:
                     )
                     diffs[file] = (ModulesDiffer.DiffEnum.CHANGED, diff)
 
-            elif temp_path.exists():
-                with open(temp_path) as fh:
-                    new_lines = fh.readlines()
+            elif new_exists:
                 # The file was created
                 # Show file against /dev/null
-                diff = difflib.unified_diff(
+                diff = ModulesDiffer.unified_diff(
                     [],
-                    new_lines,
+                    to_snapshot.read_lines(file),
                     fromfile=str(Path("/dev", "null")),
                     tofile=str(Path(dsp_to_dir, file)),
                 )
                 diffs[file] = (ModulesDiffer.DiffEnum.CREATED, diff)
 
-            elif curr_path.exists():
+            elif old_exists:
                 # The file was removed
                 # Show file against /dev/null
-                with open(curr_path) as fh:
-                    old_lines = fh.readlines()
-                diff = difflib.unified_diff(
-                    old_lines,
+                diff = ModulesDiffer.unified_diff(
+                    from_snapshot.read_lines(file),
                     [],
                     fromfile=str(Path(dsp_from_dir, file)),
                     tofile=str(Path("/dev", "null")),
@@ -120,6 +121,267 @@ class ModulesDiffer:
 
         return diffs
 
+    @staticmethod
+    def unified_diff(old_lines, new_lines, fromfile="", tofile="", n=3):
+        """
+        Computes the diff between two lists of lines in unified format.
+
+        This is the diff of `difflib.unified_diff`, unless the files have at least
+        `PATIENCE_DIFF_MIN_LINES` lines together, see :meth:`patience_unified_diff`.
+
+        Args:
+            old_lines ([str]): The lines of the old file
+            new_lines ([str]): The lines of the new file
+            fromfile (str): The old file name displayed in the diff
+            tofile (str): The new file name displayed in the diff
+            n (int): The number of context lines
+
+        Returns:
+            generator[str]: The lines of the diff
+        """
+        if len(old_lines) + len(new_lines) < PATIENCE_DIFF_MIN_LINES:
+            return difflib.unified_diff(old_lines, new_lines, fromfile=fromfile, tofile=tofile, n=n)
+        return ModulesDiffer.patience_unified_diff(old_lines, new_lines, fromfile, tofile, n)
+
+    @staticmethod
+    def patience_unified_diff(old_lines, new_lines, fromfile="", tofile="", n=3):
+        """
+        Computes the diff between two lists of lines in unified format.
+
+        The output has the same format as `difflib.unified_diff`, but the lines are matched with
+        the patience diff algorithm (see :meth:`get_matching_blocks`). The hunks can therefore
+        differ from the ones of difflib for lines that occur several times.
+
+        Args:
+            old_lines ([str]): The lines of the old file
+            new_lines ([str]): The lines of the new file
+            fromfile (str): The old file name displayed in the diff
+            tofile (str): The new file name displayed in the diff
+            n (int): The number of context lines
+
+        Returns:
+            generator[str]: The lines of the diff
+        """
+        started = False
+        for group in ModulesDiffer.get_grouped_opcodes(old_lines, new_lines, n):
+            if not started:
+                started = True
+                yield f"--- {fromfile}\n"
+                yield f"+++ {tofile}\n"
+
+            first, last = group[0], group[-1]
+            file1_range = ModulesDiffer.format_range_unified(first[1], last[2])
+            file2_range = ModulesDiffer.format_range_unified(first[3], last[4])
+            yield f"@@ -{file1_range} +{file2_range} @@\n"
+
+            for tag, i1, i2, j1, j2 in group:
+                if tag == "equal":
+                    for line in old_lines[i1:i2]:
+                        yield " " + line
+                    continue
+                if tag in ("replace", "delete"):
+                    for line in old_lines[i1:i2]:
+                        yield "-" + line
+                if tag in ("replace", "insert"):
+                    for line in new_lines[j1:j2]:
+                        yield "+" + line
+
+    @staticmethod
+    def format_range_unified(start, stop):
+        """
+        Formats a range of lines of a hunk header like `difflib.unified_diff`
+
+        Args:
+            start (int): Index of the first line of the range
+            stop (int): Index after the last line of the range
+
+        Returns:
+            (str): The range, e.g. '3,4', or '3' for a single line
+        """
+        beginning = start + 1
+        length = stop - start
+        if length == 1:
+            return f"{beginning}"
+        if not length:
+            beginning -= 1
+        return f"{beginning},{length}"
+
+    @staticmethod
+    def get_grouped_opcodes(old_lines, new_lines, n=3):
+        """
+        Groups the edit operations between two lists of lines into hunks with up to
+        `n` lines of context, like `difflib.SequenceMatcher.get_grouped_opcodes`
+
+        Args:
+            old_lines ([str]): The lines of the old file
+            new_lines ([str]): The lines of the new file
+            n (int): The number of context lines
+
+        Returns:
+            generator[[(str, int, int, int, int)]]: The edit operations of each hunk
+        """
+        codes = ModulesDiffer.get_opcodes(old_lines, new_lines)
+        if not codes:
+            codes = [("equal", 0, 1, 0, 1)]
+        # Fixup leading and trailing groups if they show no changes
+        if codes[0][0] == "equal":
+            tag, i1, i2, j1, j2 = codes[0]
+            codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+        if codes[-1][0] == "equal":
+            tag, i1, i2, j1, j2 = codes[-1]
+            codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+
+        group = []
+        for tag, i1, i2, j1, j2 in codes:
+            # End the current group and start a new one whenever there is a large range with no changes
+            if tag == "equal" and i2 - i1 > 2 * n:
+                group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+                yield group
+                group = []
+                i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+            group.append((tag, i1, i2, j1, j2))
+        if group and not (len(group) == 1 and group[0][0] == "equal"):
+            yield group
+
+    @staticmethod
+    def get_opcodes(old_lines, new_lines):
+        """
+        Returns the edit operations turning a list of lines into another one,
+        in the format of `difflib.SequenceMatcher.get_opcodes`
+
+        Args:
+            old_lines ([str]): The lines of the old file
+            new_lines ([str]): The lines of the new file
+
+        Returns:
+            [(str, int, int, int, int)]: The operations ('equal', 'replace', 'delete' or 'insert')
+                                         and the ranges of old and new lines they apply to
+        """
+        opcodes = []
+        i = j = 0
+        for ai, bj, size in ModulesDiffer.get_matching_blocks(old_lines, new_lines):
+            tag = ""
+            if i < ai and j < bj:
+                tag = "replace"
+            elif i < ai:
+                tag = "delete"
+            elif j < bj:
+                tag = "insert"
+            if tag:
+                opcodes.append((tag, i, ai, j, bj))
+            i, j = ai + size, bj + size
+            if size:
+                opcodes.append(("equal", ai, i, bj, j))
+        return opcodes
+
+    @staticmethod
+    def get_matching_blocks(old_lines, new_lines):
+        """
+        Finds the blocks of lines the two lists have in common with the patience diff algorithm.
+
+        The common leading and trailing lines are matched first. Then the lines that occur exactly once
+        in both lists are used as anchors, taking the longest sequence of them that is in the same order
+        in both lists, and the regions between the anchors are matched in the same way. Regions without
+        unique lines are matched like difflib does.
+
+        Args:
+            old_lines ([str]): The lines of the old file
+            new_lines ([str]): The lines of the new file
+
+        Returns:
+            [(int, int, int)]: The matching blocks (old index, new index, size), in the format of
+                               `difflib.SequenceMatcher.get_matching_blocks`, ending with a dummy block
+        """
+        matches = []
+        regions = [(0, len(old_lines), 0, len(new_lines))]
+        while regions:
+            alo, ahi, blo, bhi = regions.pop()
+            # Match the common leading and trailing lines
+            while alo < ahi and blo < bhi and old_lines[alo] == new_lines[blo]:
+                matches.append((alo, blo))
+                alo += 1
+                blo += 1
+            while alo < ahi and blo < bhi and old_lines[ahi - 1] == new_lines[bhi - 1]:
+                ahi -= 1
+                bhi -= 1
+                matches.append((ahi, bhi))
+            if alo == ahi or blo == bhi:
+                continue
+
+            anchors = ModulesDiffer.get_unique_anchors(old_lines, new_lines, alo, ahi, blo, bhi)
+            if not anchors:
+                matcher = difflib.SequenceMatcher(None, old_lines[alo:ahi], new_lines[blo:bhi])
+                for i, j, size in matcher.get_matching_blocks():
+                    matches.extend((alo + i + k, blo + j + k) for k in range(size))
+                continue
+            # Match the regions between the anchors
+            for i, j in anchors:
+                matches.append((i, j))
+                regions.append((alo, i, blo, j))
+                alo, blo = i + 1, j + 1
+            regions.append((alo, ahi, blo, bhi))
+
+        # Merge the matching lines into blocks
+        blocks = []
+        for i, j in sorted(matches):
+            if blocks and blocks[-1][0] + blocks[-1][2] == i and blocks[-1][1] + blocks[-1][2] == j:
+                blocks[-1][2] += 1
+            else:
+                blocks.append([i, j, 1])
+        blocks.append([len(old_lines), len(new_lines), 0])
+        return [tuple(block) for block in blocks]
+
+    @staticmethod
+    def get_unique_anchors(old_lines, new_lines, alo, ahi, blo, bhi):
+        """
+        Finds the longest sequence of lines that occur exactly once in both regions and
+        are in the same order in both
+
+        Args:
+            old_lines ([str]): The lines of the old file
+            new_lines ([str]): The lines of the new file
+            alo, ahi (int): The region of the old lines
+            blo, bhi (int): The region of the new lines
+
+        Returns:
+            [(int, int)]: The indices of the anchor lines in the old and new lines, in order
+        """
+        old_counts = {}
+        for i in range(alo, ahi):
+            line = old_lines[i]
+            old_counts[line] = (old_counts[line][0] + 1, i) if line in old_counts else (1, i)
+        new_counts = {}
+        for j in range(blo, bhi):
+            line = new_lines[j]
+            new_counts[line] = (new_counts[line][0] + 1, j) if line in new_counts else (1, j)
+        # Unique common lines, in the order of the new lines
+        pairs = [
+            (old_counts[line][1], j)
+            for line, (count, j) in new_counts.items()
+            if count == 1 and old_counts.get(line, (0,))[0] == 1
+        ]
+        pairs.sort(key=lambda pair: pair[1])
+
+        # Longest increasing subsequence of the old indices (patience sorting)
+        pile_tops = []
+        pile_pairs = []
+        predecessors = []
+        for pair in pairs:
+            pile = bisect.bisect_left(pile_tops, pair[0])
+            predecessors.append(pile_pairs[pile - 1] if pile else None)
+            if pile == len(pile_tops):
+                pile_tops.append(pair[0])
+                pile_pairs.append(len(predecessors) - 1)
+            else:
+                pile_tops[pile] = pair[0]
+                pile_pairs[pile] = len(predecessors) - 1
+        anchors = []
+        k = pile_pairs[-1] if pile_pairs else None
+        while k is not None:
+            anchors.append(pairs[k])
+            k = predecessors[k]
+        return anchors[::-1]
+
     @staticmethod
     def write_diff_file(
         diff_path,
@@ -141,8 +403,8 @@ class ModulesDiffer:
             diff_path (str | Path): The path to the file that should be appended
             module (str): The module name
             repo_path (str): The name of the repo where the module resides
-            from_dir (str | Path): The directory containing the old module files
-            to_dir (str | Path): The directory containing the new module files
+            from_dir (str | Path | ComponentSnapshot): The directory containing the old module files
+            to_dir (str | Path | ComponentSnapshot): The directory containing the new module files
             diffs (dict[str, (ModulesDiffer.DiffEnum, str)]): A dictionary containing
                                                               the type of change and
                                                               the diff (if any)
@@ -155,6 +417,34 @@ class ModulesDiffer:
             dsp_from_dir (str | Path): The 'from' directory displayed in the diff
             dsp_to_dir (str | Path): The 'to' directory displayed in the diff
         """
+        diff_text = ModulesDiffer.get_diff_text(
+            module, repo_path, from_dir, to_dir, current_version, new_version, for_git, dsp_from_dir, dsp_to_dir
+        )
+        log.debug(f"Writing diff of '{module}' to '{diff_path}'")
+        with open(diff_path, file_action) as fh:
+            fh.write(diff_text)
+
+    @staticmethod
+    def get_diff_text(
+        module,
+        repo_path,
+        from_dir,
+        to_dir,
+        current_version=None,
+        new_version=None,
+        for_git=True,
+        dsp_from_dir=None,
+        dsp_to_dir=None,
+    ):
+        """
+        Returns the diffs of a module in the format of the diff files, see :meth:`write_diff_file`
+
+        Returns:
+            (str): The diffs of the module
+
+        Raises:
+            UserWarning: If the module is unchanged
+        """
         if dsp_from_dir is None:
             dsp_from_dir = from_dir
         if dsp_to_dir is None:
@@ -163,25 +453,21 @@ class ModulesDiffer:
         diffs = ModulesDiffer.get_module_diffs(from_dir, to_dir, for_git, dsp_from_dir, dsp_to_dir)
         if all(diff_status == ModulesDiffer.DiffEnum.UNCHANGED for _, (diff_status, _) in diffs.items()):
             raise UserWarning("Module is unchanged")
-        log.debug(f"Writing diff of '{module}' to '{diff_path}'")
-        with open(diff_path, file_action) as fh:
-            if current_version is not None and new_version is not None:
-                fh.write(
-                    f"Changes in module '{Path(repo_path, module)}' between"
-                    f" ({current_version}) and"
-                    f" ({new_version})\n"
-                )
-            else:
-                fh.write(f"Changes in module '{Path(repo_path, module)}'\n")
+        if current_version is not None and new_version is not None:
+            diff_lines = [
+                f"Changes in module '{Path(repo_path, module)}' between ({current_version}) and ({new_version})\n"
+            ]
+        else:
+            diff_lines = [f"Changes in module '{Path(repo_path, module)}'\n"]
 
-            for _, (diff_status, diff) in diffs.items():
-                if diff_status != ModulesDiffer.DiffEnum.UNCHANGED:
-                    # The file has changed write the diff lines to the file
-                    for line in diff:
-                        fh.write(line)
-                    fh.write("\n")
+        for _, (diff_status, diff) in diffs.items():
+            if diff_status != ModulesDiffer.DiffEnum.UNCHANGED:
+                # The file has changed write the diff lines to the file
+                diff_lines.extend(diff)
+                diff_lines.append("\n")
 
-            fh.write("*" * 60 + "\n")
+        diff_lines.append("*" * 60 + "\n")
+        return "".join(diff_lines)
 
     @staticmethod
     def append_modules_json_diff(diff_path, old_modules_json, new_modules_json, modules_json_path, for_git=True):
@@ -203,7 +489,7 @@ class ModulesDiffer:
             fromfile = Path("a", fromfile)
             tofile = Path("b", tofile)
 
-        modules_json_diff = difflib.unified_diff(
+        modules_json_diff = ModulesDiffer.unified_diff(
             json.dumps(old_modules_json, indent=4).splitlines(keepends=True),
             json.dumps(new_modules_json, indent=4).splitlines(keepends=True),
             fromfile=str(fromfile),
@@ -245,9 +531,7 @@ class ModulesDiffer:
         )
         console = Console(force_terminal=nf_core.utils.rich_force_colors())
         if current_version is not None and new_version is not None:
-            log.info(
-                f"Changes in module '{Path(repo_path, module)}' between" f" ({current_version}) and" f" ({new_version})"
-            )
+            log.info(f"Changes in module '{Path(repo_path, module)}' between ({current_version}) and ({new_version})")
         else:
             log.info(f"Changes in module '{Path(repo_path, module)}'")
 
@@ -387,7 +671,8 @@ class ModulesDiffer:
         # The patches are sorted by their order of occurrence in the original
         # file. Loop through the new file and try to find the new indices of
         # these lines. We know they are non overlapping, and thus only need to
-        # look at the file once
+        # look at the file once. The first line of each hunk is looked up with
+        # `list.index()`, so that large files are searched quickly
         p = len(org_lines)
         patch_indices = [None] * p
         i = 0
@@ -396,6 +681,12 @@ class ModulesDiffer:
         while i < n and j < p:
             m = len(org_lines[j])
             while i < n:
+                if m > 0:
+                    try:
+                        i = file_lines.index(org_lines[j][0], i)
+                    except ValueError:
+                        i = n
+                        break
                 if org_lines[j] == file_lines[i : i + m]:
                     patch_indices[j] = (i, i + m)
                     j += 1
@@ -431,7 +722,7 @@ class ModulesDiffer:
             module (str): Name of the module
             repo_path (str): Name of the repository where the module resides
             patch_path (str): The absolute path to the patch file to be applied
-            module_dir (Path): The directory containing the module
+            module_dir (Path | ComponentSnapshot): The directory containing the module, or a snapshot of its files
 
         Returns:
             dict[str, str]: A dictionary with file paths (relative to the pipeline dir)
@@ -441,18 +732,37 @@ class ModulesDiffer:
             LookupError: If the patch application fails in a file
         """
         module_relpath = Path("modules", repo_path, module)
+        module_snapshot = ComponentSnapshot.of(module_dir)
         patches = ModulesDiffer.per_file_patch(patch_path)
         new_files = {}
         for file, patch in patches.items():
             log.debug(f"Applying patch to {file}")
             fn = Path(file).relative_to(module_relpath)
-            file_path = module_dir / fn
-            try:
-                with open(file_path) as fh:
-                    file_lines = fh.readlines()
-            except FileNotFoundError:
+            file_lines = module_snapshot.read_lines(fn)
+            if file_lines is None:
                 # The file was added with the patch
                 file_lines = [""]
             patched_new_lines = ModulesDiffer.try_apply_single_patch(file_lines, patch, reverse=reverse)
             new_files[str(fn)] = patched_new_lines
         return new_files
+
+    @staticmethod
+    def try_apply_patch_to_snapshot(module, repo_path, patch_path, module_snapshot, reverse=False):
+        """
+        Try applying a full patch file to a snapshot of a module, in memory
+
+        Args:
+            module (str): Name of the module
+            repo_path (str): Name of the repository where the module resides
+            patch_path (str): The absolute path to the patch file to be applied
+            module_snapshot (ComponentSnapshot): The files of the module
+            reverse (bool): Apply the patch in reverse
+
+        Returns:
+            ComponentSnapshot: The patched files of the module
+
+        Raises:
+            LookupError: If the patch application fails in a file
+        """
+        new_files = ModulesDiffer.try_apply_patch(module, repo_path, patch_path, module_snapshot, reverse=reverse)
+        return module_snapshot.with_lines(new_files)
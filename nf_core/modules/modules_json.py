@@ -1,10 +1,10 @@
 import copy
 import datetime
+import hashlib
 import json
 import logging
 import os
 import shutil
-import tempfile
 from pathlib import Path
 
 import git
@@ -12,7 +12,9 @@ import questionary
 import rich.prompt
 from git.exc import GitCommandError
 
+import nf_core
 import nf_core.utils
+from nf_core.component_snapshot import ComponentSnapshot
 from nf_core.components.components_utils import get_components_to_install
 from nf_core.lint_utils import dump_json_with_prettier
 from nf_core.modules.modules_repo import (
@@ -20,6 +22,7 @@ from nf_core.modules.modules_repo import (
     NF_CORE_MODULES_REMOTE,
     ModulesRepo,
 )
+from nf_core.synced_repo import COMPONENT_INDEX_FILES, dump_json_atomically
 
 from .modules_differ import ModulesDiffer
 
@@ -279,9 +282,11 @@ class ModulesJson:
                 # If the module/subworkflow is patched
                 patch_file = component_path / f"{component}.diff"
                 if patch_file.is_file():
-                    temp_module_dir = self.try_apply_patch_reverse(component, install_dir, patch_file, component_path)
+                    component_snapshot = self.try_apply_patch_reverse(
+                        component, install_dir, patch_file, component_path
+                    )
                     correct_commit_sha = self.find_correct_commit_sha(
-                        component_type, component, temp_module_dir, modules_repo
+                        component_type, component, component_snapshot, modules_repo
                     )
                 else:
                     correct_commit_sha = self.find_correct_commit_sha(
@@ -347,12 +352,26 @@ class ModulesJson:
         Args:
             component_type (str): modules or subworkflows
             component_name (str): Name of module/subowrkflow
-            component_path (str): Path to module/subworkflow in local repo
+            component_path (str | ComponentSnapshot): Path to module/subworkflow in local repo,
+                                                      or a snapshot of its files
             modules_repo (str): Remote repo for module/subworkflow
         Returns:
             commit_sha (str): The latest commit SHA where local files are identical to remote files,
                               or None if no commit is found
         """
+        # Look up the blob SHAs of the local files in the index of the remote
+        component_snapshot = ComponentSnapshot.of(component_path)
+        main_nf_sha, meta_yml_sha = (component_snapshot.blob_sha(file) for file in COMPONENT_INDEX_FILES)
+        if main_nf_sha is None or meta_yml_sha is None:
+            log.debug(f"Could not hash the files of '{component_name}', falling back to comparing every commit")
+        else:
+            commit_sha = modules_repo.find_commit_from_blob_shas(
+                component_name, component_type, main_nf_sha, meta_yml_sha
+            )
+            if commit_sha is not None:
+                return commit_sha
+            log.debug(f"'{component_name}' not found in the component index, falling back to comparing every commit")
+
         # Find the correct commit SHA for the local module/subworkflow files.
         # We iterate over the commit history for the module/subworkflow until we find
         # a revision that matches the file contents
@@ -363,7 +382,7 @@ class ModulesJson:
         for commit_sha in commit_shas:
             if all(
                 modules_repo.component_files_identical(
-                    component_name, component_path, commit_sha, component_type
+                    component_name, component_snapshot, commit_sha, component_type
                 ).values()
             ):
                 return commit_sha
@@ -394,40 +413,106 @@ class ModulesJson:
             to_name += f"-{datetime.datetime.now().strftime('%y%m%d%H%M%S')}"
         shutil.move(current_path, local_dir / to_name)
 
-    def unsynced_components(self):
+    def get_installed_component_dirs(self):
+        """
+        Finds the directories of the installed modules and subworkflows, i.e. the directories
+        containing a 'main.nf' file. Local modules and subworkflows are left out.
+
+        Returns:
+            (dict[str, [ Path ]]): The directories relative to the 'modules' and 'subworkflows'
+            directories, by component type
+        """
+        component_dirs = {}
+        for component_type, directory in (("modules", self.modules_dir), ("subworkflows", self.subworkflows_dir)):
+            component_dirs[component_type] = [
+                Path(dir_name).relative_to(directory)
+                for dir_name, _, file_names in os.walk(directory)
+                if "main.nf" in file_names and not str(Path(dir_name).relative_to(directory)).startswith("local")
+            ]
+        return component_dirs
+
+    def unsynced_components(self, component_dirs=None):
         """
         Compute the difference between the modules/subworkflows in the directory and the
         modules/subworkflows in the 'modules.json' file. This is done by looking at all
         directories containing a 'main.nf' file
 
+        Args:
+            component_dirs (dict[str, [ Path ]], optional): The installed component directories,
+                as returned by :meth:`get_installed_component_dirs`. Found if not given.
+
         Returns:
             (untrack_dirs ([ Path ]), missing_installation (dict)): Directories that are not tracked
             by the modules.json file, and modules/subworkflows in the modules.json where
             the installation directory is missing
         """
+        if component_dirs is None:
+            component_dirs = self.get_installed_component_dirs()
         # Add all modules from modules.json to missing_installation
         missing_installation = copy.deepcopy(self.modules_json["repos"])
-        # Obtain the path of all installed modules
-        module_dirs = [
-            Path(dir_name).relative_to(self.modules_dir)
-            for dir_name, _, file_names in os.walk(self.modules_dir)
-            if "main.nf" in file_names and not str(Path(dir_name).relative_to(self.modules_dir)).startswith("local")
-        ]
-        untracked_dirs_modules, missing_installation = self.parse_dirs(module_dirs, missing_installation, "modules")
-
-        # Obtain the path of all installed subworkflows
-        subworkflow_dirs = [
-            Path(dir_name).relative_to(self.subworkflows_dir)
-            for dir_name, _, file_names in os.walk(self.subworkflows_dir)
-            if "main.nf" in file_names
-            and not str(Path(dir_name).relative_to(self.subworkflows_dir)).startswith("local")
-        ]
+        untracked_dirs_modules, missing_installation = self.parse_dirs(
+            component_dirs["modules"], missing_installation, "modules"
+        )
         untracked_dirs_subworkflows, missing_installation = self.parse_dirs(
-            subworkflow_dirs, missing_installation, "subworkflows"
+            component_dirs["subworkflows"], missing_installation, "subworkflows"
         )
 
         return untracked_dirs_modules, untracked_dirs_subworkflows, missing_installation
 
+    def get_fingerprint(self, component_dirs):
+        """
+        Computes a fingerprint of everything :meth:`check_up_to_date` depends on: the contents of the
+        'modules.json' file, the installed modules and subworkflows and the 'main.nf' files of the
+        subworkflows, by modification time and size.
+
+        Args:
+            component_dirs (dict[str, [ Path ]]): The installed component directories,
+                as returned by :meth:`get_installed_component_dirs`
+
+        Returns:
+            (str | None): The fingerprint, or None if there is no 'modules.json' file
+        """
+        fingerprint = hashlib.sha256(nf_core.__version__.encode())
+        try:
+            fingerprint.update(self.modules_json_path.read_bytes())
+        except FileNotFoundError:
+            return None
+        for component_type, dirs in component_dirs.items():
+            for component_dir in sorted(dirs):
+                fingerprint.update(f"\0{component_type}/{component_dir.as_posix()}".encode())
+                if component_type == "subworkflows":
+                    main_nf_stat = Path(self.subworkflows_dir, component_dir, "main.nf").stat()
+                    fingerprint.update(f":{main_nf_stat.st_mtime_ns}:{main_nf_stat.st_size}".encode())
+        return fingerprint.hexdigest()
+
+    def fingerprint_path(self):
+        """
+        Returns the path of the file in the nf-core cache directory storing the fingerprint
+        of the pipeline from the last time 'modules.json' was found up to date
+        """
+        dir_hash = hashlib.sha1(str(Path(self.dir).resolve()).encode()).hexdigest()
+        return Path(nf_core.utils.setup_nfcore_cachedir("modules_json"), f"{dir_hash}.json")
+
+    def load_fingerprint(self):
+        """
+        Returns the fingerprint of the pipeline from the last time 'modules.json' was found up to date, if any
+        """
+        try:
+            with open(self.fingerprint_path()) as fh:
+                return json.load(fh).get("fingerprint")
+        except (OSError, json.JSONDecodeError, AttributeError):
+            return None
+
+    def save_fingerprint(self, fingerprint):
+        """
+        Records the fingerprint of the pipeline with an up to date 'modules.json' file
+        """
+        fingerprint_path = self.fingerprint_path()
+        try:
+            dump_json_atomically({"dir": str(Path(self.dir).resolve()), "fingerprint": fingerprint}, fingerprint_path)
+        except OSError as e:
+            log.debug(f"Could not save the 'modules.json' fingerprint '{fingerprint_path}': {e}")
+
     def parse_dirs(self, dirs, missing_installation, component_type):
         untracked_dirs = []
         for dir_ in dirs:
@@ -551,7 +636,21 @@ class ModulesJson:
 
         Check that we have the "installed_by" value in 'modules.json', otherwise add it.
         Assume that the modules/subworkflows were installed by an nf-core command (don't track installed by subworkflows).
+
+        All of this is skipped if neither 'modules.json' nor the installed modules and subworkflows
+        changed since the last check, see :meth:`get_fingerprint`.
         """
+        component_dirs = self.get_installed_component_dirs()
+        fingerprint = self.get_fingerprint(component_dirs)
+        if fingerprint is not None and fingerprint == self.load_fingerprint():
+            try:
+                self.load()
+            except UserWarning:
+                pass
+            else:
+                log.debug("'modules.json' is up to date, it did not change since the last check")
+                return
+
         dump_modules_json = False
         try:
             self.load()
@@ -578,7 +677,7 @@ class ModulesJson:
             modules_missing_from_modules_json,
             subworkflows_missing_from_modules_json,
             missing_installation,
-        ) = self.unsynced_components()
+        ) = self.unsynced_components(component_dirs)
 
         # If there are any modules/subworkflows left in 'modules.json' after all installed are removed,
         # we try to reinstall them
@@ -618,14 +717,21 @@ class ModulesJson:
         subworkflows_dict = self.get_all_components("subworkflows")
         if subworkflows_dict:
             dump_modules_json = True
+            # The includes of each subworkflow are parsed once, even if it is used by several others
+            subworkflow_includes = {}
             for repo, subworkflows in subworkflows_dict.items():
                 for org, subworkflow in subworkflows:
-                    self.recreate_dependencies(repo, org, subworkflow)
+                    self.recreate_dependencies(repo, org, subworkflow, subworkflow_includes)
         self.pipeline_components = original_pipeline_components
 
         if dump_modules_json:
             self.dump(run_prettier=True)
 
+        # Components might have been reinstalled or moved, so the fingerprint is computed again
+        fingerprint = self.get_fingerprint(self.get_installed_component_dirs())
+        if fingerprint is not None:
+            self.save_fingerprint(fingerprint)
+
     def load(self):
         """
         Loads the modules.json file into the variable 'modules_json'
@@ -809,7 +915,7 @@ class ModulesJson:
             module_dir (Path | str): The module directory in the pipeline
 
         Returns:
-            (Path | str): The path of the folder where the module patched files are
+            (ComponentSnapshot): The files of the module with the patch reverted, in memory
 
         Raises:
             LookupError: If patch was not applied
@@ -818,22 +924,12 @@ class ModulesJson:
         patch_path = Path(self.dir / patch_relpath)
 
         try:
-            new_files = ModulesDiffer.try_apply_patch(module, repo_name, patch_path, module_dir, reverse=True)
+            return ModulesDiffer.try_apply_patch_to_snapshot(
+                module, repo_name, patch_path, ComponentSnapshot.from_dir(module_dir), reverse=True
+            )
         except LookupError as e:
             raise LookupError(f"Failed to apply patch in reverse for module '{module_fullname}' due to: {e}")
 
-        # Write the patched files to a temporary directory
-        log.debug("Writing patched files to tmpdir")
-        temp_dir = Path(tempfile.mkdtemp())
-        temp_module_dir = temp_dir / module
-        temp_module_dir.mkdir(parents=True, exist_ok=True)
-        for file, new_content in new_files.items():
-            fn = temp_module_dir / file
-            with open(fn, "w") as fh:
-                fh.writelines(new_content)
-
-        return temp_module_dir
-
     def repo_present(self, repo_name):
         """
         Checks if a repo is present in the modules.json file
@@ -1060,8 +1156,11 @@ class ModulesJson:
             if run_prettier:
                 dump_json_with_prettier(self.modules_json_path, self.modules_json)
             else:
-                with open(self.modules_json_path, "w") as fh:
+                # Write atomically, so that an interrupted command never leaves a partly written file
+                tmp_path = self.modules_json_path.with_name(f".{self.modules_json_path.name}.tmp")
+                with open(tmp_path, "w") as fh:
                     json.dump(self.modules_json, fh, indent=4)
+                os.replace(tmp_path, self.modules_json_path)
 
     def resolve_missing_installation(self, missing_installation, component_type):
         missing_but_in_mod_json = [
@@ -1175,15 +1274,22 @@ class ModulesJson:
                             }
                         )
 
-    def recreate_dependencies(self, repo, org, subworkflow):
+    def recreate_dependencies(self, repo, org, subworkflow, subworkflow_includes=None):
         """
         Try to recreate the installed_by entries for subworkflows.
         Remove self installation entry from dependencies, assuming that the modules.json has been freshly created,
         i.e., no module or subworkflow has been installed by the user in the meantime
-        """
 
+        Args:
+            subworkflow_includes (dict, optional): Cache of the modules and subworkflows included
+                by each subworkflow, by subworkflow path
+        """
+        if subworkflow_includes is None:
+            subworkflow_includes = {}
         sw_path = Path(self.subworkflows_dir, org, subworkflow)
-        dep_mods, dep_subwfs = get_components_to_install(sw_path)
+        if sw_path not in subworkflow_includes:
+            subworkflow_includes[sw_path] = get_components_to_install(sw_path)
+        dep_mods, dep_subwfs = subworkflow_includes[sw_path]
 
         for dep_mod in dep_mods:
             installed_by = self.modules_json["repos"][repo]["modules"][org][dep_mod]["installed_by"]
@@ -1198,4 +1304,4 @@ class ModulesJson:
                 self.modules_json["repos"][repo]["subworkflows"][org][dep_subwf]["installed_by"] = []
             if subworkflow not in installed_by:
                 self.modules_json["repos"][repo]["subworkflows"][org][dep_subwf]["installed_by"].append(subworkflow)
-            self.recreate_dependencies(repo, org, dep_subwf)
+            self.recreate_dependencies(repo, org, dep_subwf, subworkflow_includes)
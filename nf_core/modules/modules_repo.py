@@ -87,61 +87,88 @@ class ModulesRepo(SyncedRepo):
         Sets self.repo
         """
         self.local_repo_dir = os.path.join(NFCORE_DIR if not in_cache else NFCORE_CACHE_DIR, self.fullname)
-        try:
-            if not os.path.exists(self.local_repo_dir):
-                try:
-                    pbar = rich.progress.Progress(
-                        "[bold blue]{task.description}",
-                        rich.progress.BarColumn(bar_width=None),
-                        "[bold yellow]{task.fields[state]}",
-                        transient=True,
-                        disable=hide_progress or os.environ.get("HIDE_PROGRESS", None) is not None,
-                    )
-                    with pbar:
-                        self.repo = git.Repo.clone_from(
-                            remote,
-                            self.local_repo_dir,
-                            progress=RemoteProgressbar(pbar, self.fullname, self.remote_url, "Cloning"),
+        # Cloning, fetching and merging change the local clone, which might be shared with
+        # other threads and with other nf-core processes running at the same time
+        with self.repo_lock():
+            try:
+                if not os.path.exists(self.local_repo_dir):
+                    try:
+                        pbar = rich.progress.Progress(
+                            "[bold blue]{task.description}",
+                            rich.progress.BarColumn(bar_width=None),
+                            "[bold yellow]{task.fields[state]}",
+                            transient=True,
+                            disable=hide_progress or os.environ.get("HIDE_PROGRESS", None) is not None,
                         )
-                    ModulesRepo.update_local_repo_status(self.fullname, True)
-                except GitCommandError:
-                    raise LookupError(f"Failed to clone from the remote: `{remote}`")
-                # Verify that the requested branch exists by checking it out
-                self.setup_branch(branch)
-            else:
-                self.repo = git.Repo(self.local_repo_dir)
-
-                if ModulesRepo.no_pull_global:
-                    ModulesRepo.update_local_repo_status(self.fullname, True)
-                # If the repo is already cloned, fetch the latest changes from the remote
-                if not ModulesRepo.local_repo_synced(self.fullname):
-                    pbar = rich.progress.Progress(
-                        "[bold blue]{task.description}",
-                        rich.progress.BarColumn(bar_width=None),
-                        "[bold yellow]{task.fields[state]}",
-                        transient=True,
-                        disable=hide_progress or os.environ.get("HIDE_PROGRESS", None) is not None,
-                    )
-                    with pbar:
-                        self.repo.remotes.origin.fetch(
-                            progress=RemoteProgressbar(pbar, self.fullname, self.remote_url, "Pulling")
+                        # Partial clones leave out all blobs and only check out the components of the pipeline
+                        sparse_paths = ModulesRepo.sparse_paths.get(remote) if ModulesRepo.partial_clone else None
+                        clone_options = []
+                        if ModulesRepo.partial_clone:
+                            clone_options.append("--filter=blob:none")
+                        if sparse_paths:
+                            clone_options.append("--no-checkout")
+                        with pbar:
+                            self.repo = git.Repo.clone_from(
+                                remote,
+                                self.local_repo_dir,
+                                progress=RemoteProgressbar(pbar, self.fullname, self.remote_url, "Cloning"),
+                                multi_options=clone_options,
+                            )
+                        if sparse_paths:
+                            self.repo.git.sparse_checkout("set", "--cone", *sorted(sparse_paths))
+                        ModulesRepo.update_local_repo_status(self.fullname, True)
+                        self.save_fetch_state()
+                    except GitCommandError:
+                        raise LookupError(f"Failed to clone from the remote: `{remote}`")
+                    # Verify that the requested branch exists by checking it out
+                    self.setup_branch(branch)
+                else:
+                    self.repo = git.Repo(self.local_repo_dir)
+
+                    if ModulesRepo.no_pull_global:
+                        ModulesRepo.update_local_repo_status(self.fullname, True)
+                    # If the repo is already cloned, fetch the latest changes from the remote,
+                    # unless they were fetched recently by another nf-core command
+                    if not ModulesRepo.local_repo_synced(self.fullname) and not self.fetch_needed():
+                        ModulesRepo.update_local_repo_status(self.fullname, True)
+                    if not ModulesRepo.local_repo_synced(self.fullname):
+                        pbar = rich.progress.Progress(
+                            "[bold blue]{task.description}",
+                            rich.progress.BarColumn(bar_width=None),
+                            "[bold yellow]{task.fields[state]}",
+                            transient=True,
+                            disable=hide_progress or os.environ.get("HIDE_PROGRESS", None) is not None,
                         )
-                    ModulesRepo.update_local_repo_status(self.fullname, True)
-
-                # Before verifying the branch, fetch the changes
-                # Verify that the requested branch exists by checking it out
-                self.setup_branch(branch)
-
-                # Now merge the changes
-                tracking_branch = self.repo.active_branch.tracking_branch()
-                if tracking_branch is None:
-                    raise LookupError(f"There is no remote tracking branch '{self.branch}' in '{self.remote_url}'")
-                self.repo.git.merge(tracking_branch.name)
-        except (GitCommandError, InvalidGitRepositoryError) as e:
-            log.error(f"[red]Could not set up local cache of modules repository:[/]\n{e}\n")
-            if rich.prompt.Confirm.ask(f"[violet]Delete local cache '{self.local_repo_dir}' and try again?"):
+                        with pbar:
+                            self.repo.remotes.origin.fetch(
+                                progress=RemoteProgressbar(pbar, self.fullname, self.remote_url, "Pulling")
+                            )
+                        ModulesRepo.update_local_repo_status(self.fullname, True)
+                        self.save_fetch_state()
+
+                    # Check out the components added to the pipeline since the sparse clone was set up
+                    self.update_sparse_checkout()
+
+                    # Before verifying the branch, fetch the changes
+                    # Verify that the requested branch exists by checking it out
+                    self.setup_branch(branch)
+
+                    # Now merge the changes
+                    tracking_branch = self.repo.active_branch.tracking_branch()
+                    if tracking_branch is None:
+                        raise LookupError(f"There is no remote tracking branch '{self.branch}' in '{self.remote_url}'")
+                    self.repo.git.merge(tracking_branch.name)
+                return
+            except (GitCommandError, InvalidGitRepositoryError) as e:
+                setup_error = e
+
+        # The lock is not held while waiting for the user, so other nf-core processes are not blocked
+        log.error(f"[red]Could not set up local cache of modules repository:[/]\n{setup_error}\n")
+        if rich.prompt.Confirm.ask(f"[violet]Delete local cache '{self.local_repo_dir}' and try again?"):
+            with self.repo_lock():
                 log.info(f"Removing '{self.local_repo_dir}'")
-                shutil.rmtree(self.local_repo_dir)
+                if os.path.exists(self.local_repo_dir):
+                    shutil.rmtree(self.local_repo_dir)
                 self.setup_local_repo(remote, branch, hide_progress)
-            else:
-                raise LookupError("Exiting due to error with local modules git repo")
+        else:
+            raise LookupError("Exiting due to error with local modules git repo")
@@ -14,7 +14,7 @@ import rich
 
 import nf_core.modules.modules_utils
 import nf_core.utils
-from nf_core.components.lint import ComponentLint, LintExceptionError, LintResult
+from nf_core.components.lint import ComponentLint, LintExceptionError
 from nf_core.lint_utils import console
 
 log = logging.getLogger(__name__)
@@ -43,6 +43,7 @@ class SubworkflowLint(ComponentLint):
         no_pull=False,
         registry=None,
         hide_progress=False,
+        jobs=1,
     ):
         super().__init__(
             component_type="subworkflows",
@@ -53,6 +54,7 @@ class SubworkflowLint(ComponentLint):
             no_pull=no_pull,
             registry=registry,
             hide_progress=hide_progress,
+            jobs=jobs,
         )
 
     def lint(
@@ -158,25 +160,7 @@ class SubworkflowLint(ComponentLint):
             registry (str): The container registry to use. Should be quay.io in most situations.
             local (boolean): Whether the list consist of local or nf-core subworkflows
         """
-        # TODO: consider unifying modules and subworkflows lint_subworkflows() function and add it to the ComponentLint class
-        progress_bar = rich.progress.Progress(
-            "[bold blue]{task.description}",
-            rich.progress.BarColumn(bar_width=None),
-            "[magenta]{task.completed} of {task.total}[reset] » [bold yellow]{task.fields[test_name]}",
-            transient=True,
-            console=console,
-            disable=self.hide_progress or os.environ.get("HIDE_PROGRESS", None) is not None,
-        )
-        with progress_bar:
-            lint_progress = progress_bar.add_task(
-                f"Linting {'local' if local else 'nf-core'} subworkflows",
-                total=len(subworkflows),
-                test_name=subworkflows[0].component_name,
-            )
-
-            for swf in subworkflows:
-                progress_bar.update(lint_progress, advance=1, test_name=swf.component_name)
-                self.lint_subworkflow(swf, progress_bar, registry=registry, local=local)
+        self.lint_components(subworkflows, self.lint_subworkflow, registry=registry, local=local)
 
     def lint_subworkflow(self, swf, progress_bar, registry, local=False):
         """
@@ -198,12 +182,6 @@ class SubworkflowLint(ComponentLint):
         # Only check the main script in case of a local subworkflow
         if local:
             self.main_nf(swf)
-            self.passed += [LintResult(swf, *s) for s in swf.passed]
-            warned = [LintResult(swf, *m) for m in (swf.warned + swf.failed)]
-            if not self.fail_warned:
-                self.warned += warned
-            else:
-                self.failed += warned
 
         # Otherwise run all the lint tests
         else:
@@ -214,12 +192,3 @@ class SubworkflowLint(ComponentLint):
 
             for test_name in self.lint_tests:
                 getattr(self, test_name)(swf)
-
-            self.passed += [LintResult(swf, *s) for s in swf.passed]
-            warned = [LintResult(swf, *s) for s in swf.warned]
-            if not self.fail_warned:
-                self.warned += warned
-            else:
-                self.failed += warned
-
-            self.failed += [LintResult(swf, *s) for s in swf.failed]
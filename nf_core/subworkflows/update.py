@@ -15,6 +15,7 @@ class SubworkflowUpdate(ComponentUpdate):
         remote_url=None,
         branch=None,
         no_pull=False,
+        jobs=1,
     ):
         super().__init__(
             pipeline_dir,
@@ -29,4 +30,5 @@ class SubworkflowUpdate(ComponentUpdate):
             remote_url,
             branch,
             no_pull,
+            jobs,
         )
@@ -1,15 +1,27 @@
-import filecmp
+import hashlib
+import json
 import logging
 import os
-import shutil
+import posixpath
+import re
+import tempfile
+import threading
+import time
 from configparser import NoOptionError, NoSectionError
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional, Set, Union
 
 import git
 from git.exc import GitCommandError
+from gitdb.exc import BadName
 
-from nf_core.utils import load_tools_config
+from nf_core.component_snapshot import ComponentSnapshot, hash_git_blob
+from nf_core.utils import load_tools_config, setup_nfcore_cachedir
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
 
 log = logging.getLogger(__name__)
 
@@ -18,6 +30,93 @@ NF_CORE_MODULES_NAME = "nf-core"
 NF_CORE_MODULES_REMOTE = "https://github.com/nf-core/modules.git"
 NF_CORE_MODULES_DEFAULT_BRANCH = "master"
 
+COMPONENT_TYPES = ("modules", "subworkflows")
+# The files that identify the version of a module/subworkflow, in the order they are indexed
+COMPONENT_INDEX_FILES = ("main.nf", "meta.yml")
+# The layout version of the component blob index, indexes with another version are rebuilt
+COMPONENT_INDEX_VERSION = 2
+# The number of git trees kept in the component name index of a local clone
+COMPONENT_NAMES_INDEX_SIZE = 32
+
+
+def git_blob_sha(path: Union[str, Path]) -> str:
+    """
+    Computes the git blob SHA of a local file, i.e. the same hash that
+    `git hash-object` would return for it
+
+    Args:
+        path (str | Path): Path to the file
+
+    Returns:
+        (str): The hex digest of the blob object
+    """
+    with open(path, "rb") as fh:
+        return hash_git_blob(fh.read())
+
+
+def dump_json_atomically(data, path: Union[str, Path]) -> None:
+    """
+    Writes JSON data to a file atomically, so that other nf-core processes
+    reading the file at the same time never see a partly written file
+
+    Args:
+        data: The data to write
+        path (str | Path): Path to the file
+    """
+    with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(path), delete=False) as fh:
+        json.dump(data, fh)
+    os.replace(fh.name, path)
+
+
+class RepoLock:
+    """
+    A re-entrant lock on a local clone, shared by the threads of this process and by other processes.
+
+    Threads are serialised with a re-entrant lock. Other processes are locked out with an
+    exclusive ``flock`` on a lock file next to the clone, which is taken when the outermost
+    acquisition of this process happens. Without ``fcntl`` (Windows), only threads are locked.
+    """
+
+    def __init__(self, lock_path):
+        """
+        Args:
+            lock_path (str | Path): Path of the lock file
+        """
+        self.lock_path = lock_path
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.lock_fh = None
+
+    def acquire(self):
+        self.thread_lock.acquire()
+        if self.depth == 0 and fcntl is not None:
+            try:
+                os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+                self.lock_fh = open(self.lock_path, "a")
+                fcntl.flock(self.lock_fh, fcntl.LOCK_EX)
+            except OSError:
+                if self.lock_fh is not None:
+                    self.lock_fh.close()
+                    self.lock_fh = None
+                self.thread_lock.release()
+                raise
+        self.depth += 1
+
+    def release(self):
+        self.depth -= 1
+        if self.depth == 0 and self.lock_fh is not None:
+            fcntl.flock(self.lock_fh, fcntl.LOCK_UN)
+            self.lock_fh.close()
+            self.lock_fh = None
+        self.thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
 
 class RemoteProgressbar(git.RemoteProgress):
     """
@@ -63,6 +162,52 @@ class SyncedRepo:
 
     local_repo_statuses: Dict[str, bool] = {}
     no_pull_global = False
+    # Seconds during which a clone fetched by any nf-core process is not fetched again, 0 to always fetch
+    fetch_ttl = 0
+    # Whether new clones are partial clones without blobs, see :meth:`configure_session`
+    partial_clone = False
+    # The component directories that sparse clones check out, by remote URL
+    sparse_paths: Dict[str, Set[str]] = {}
+
+    # Git objects are immutable, so their contents can be shared by all repos in a session
+    blob_cache: Dict[str, bytes] = {}
+    # The git object database is read through a single persistent `git cat-file` process
+    object_lock = threading.Lock()
+    # Locks serialising operations that change a local clone (fetch, merge, checkout), by clone directory
+    repo_locks: Dict[str, RepoLock] = {}
+    repo_locks_lock = threading.Lock()
+    # Component blob indexes already loaded in this session, by index file path
+    component_indexes: Dict[str, dict] = {}
+    # Commit indexes already loaded in this session, by index file path
+    commit_indexes: Dict[str, dict] = {}
+    commit_index_lock = threading.RLock()
+    # Component name indexes already loaded in this session, by index file path
+    component_names_indexes: Dict[str, Dict[str, List[str]]] = {}
+    component_names_lock = threading.RLock()
+
+    @staticmethod
+    def get_repo_lock(local_repo_dir):
+        """
+        Returns the lock of a local clone, which protects it against changes from
+        other threads and other nf-core processes at the same time
+
+        Args:
+            local_repo_dir (str | Path): The directory of the local clone
+
+        Returns:
+            (RepoLock): The lock of the clone
+        """
+        local_repo_dir = os.path.abspath(local_repo_dir)
+        with SyncedRepo.repo_locks_lock:
+            if local_repo_dir not in SyncedRepo.repo_locks:
+                SyncedRepo.repo_locks[local_repo_dir] = RepoLock(f"{local_repo_dir}.lock")
+            return SyncedRepo.repo_locks[local_repo_dir]
+
+    def repo_lock(self):
+        """
+        Returns the lock of the local clone of this repository, see :meth:`get_repo_lock`
+        """
+        return SyncedRepo.get_repo_lock(self.local_repo_dir)
 
     @staticmethod
     def local_repo_synced(repo_name):
@@ -78,6 +223,202 @@ class SyncedRepo:
         """
         SyncedRepo.local_repo_statuses[repo_name] = up_to_date
 
+    @staticmethod
+    def configure_session(directory):
+        """
+        Configures how the local clones are synced in this session from the tools config
+        file (`.nf-core.yml`) of a pipeline or modules repository:
+
+        - `fetch_ttl`: Seconds during which a clone is not fetched again, see :meth:`fetch_needed`
+        - `partial_clone`: Clone without blobs (`--filter=blob:none`), which are then fetched on demand.
+          When the pipeline has a `modules.json` file, the new clones only check out
+          the modules and subworkflows it lists (sparse checkout).
+
+        Settings of a previous call, e.g. for another pipeline, are reset to their defaults first.
+
+        Args:
+            directory (str | Path): The directory of the pipeline or modules repository
+        """
+        SyncedRepo.fetch_ttl = 0
+        SyncedRepo.partial_clone = False
+        SyncedRepo.sparse_paths = {}
+        if not directory:
+            return
+        config_fn, tools_config = load_tools_config(directory)
+        fetch_ttl = tools_config.get("fetch_ttl")
+        if fetch_ttl is not None:
+            if isinstance(fetch_ttl, bool) or not isinstance(fetch_ttl, int) or fetch_ttl < 0:
+                log.warning(
+                    f"Ignoring 'fetch_ttl' in {config_fn.name}: expected a number of seconds, got '{fetch_ttl}'"
+                )
+            else:
+                SyncedRepo.fetch_ttl = fetch_ttl
+
+        partial_clone = tools_config.get("partial_clone")
+        if partial_clone is None:
+            return
+        if not isinstance(partial_clone, bool):
+            log.warning(f"Ignoring 'partial_clone' in {config_fn.name}: expected true or false, got '{partial_clone}'")
+            return
+        SyncedRepo.partial_clone = partial_clone
+        if not partial_clone:
+            return
+        try:
+            with open(Path(directory, "modules.json")) as fh:
+                modules_json = json.load(fh)
+        except (OSError, json.JSONDecodeError):
+            return
+        for remote_url, repo_entry in modules_json.get("repos", {}).items():
+            SyncedRepo.sparse_paths[remote_url] = {
+                f"{component_type}/{install_dir}/{component_name}"
+                for component_type in COMPONENT_TYPES
+                for install_dir, components in repo_entry.get(component_type, {}).items()
+                for component_name in components
+            }
+
+    def fetch_state_path(self):
+        """
+        Returns the path of the on-disk fetch state of the local clone of this repo
+        """
+        repo_name = re.sub(r"[^\w.-]", "_", self.fullname.strip("/"))
+        dir_hash = hashlib.sha1(os.path.abspath(self.local_repo_dir).encode()).hexdigest()[:8]
+        return Path(setup_nfcore_cachedir("fetch_state"), f"{repo_name}_{dir_hash}.json")
+
+    def load_fetch_state(self):
+        """
+        Loads the time of the last fetch of the local clone and the remote branch heads it fetched
+
+        Returns:
+            (dict): The fetch state, with the keys 'fetched_at' and 'remote_heads'
+        """
+        try:
+            with open(self.fetch_state_path()) as fh:
+                return json.load(fh)
+        except (OSError, json.JSONDecodeError):
+            return {"fetched_at": 0, "remote_heads": {}}
+
+    def save_fetch_state(self, remote_heads=None):
+        """
+        Records that the local clone is in sync with the remote now
+
+        Args:
+            remote_heads (dict[str, str], optional): The remote branch heads, by ref name.
+                Defaults to the remote tracking branches of the clone.
+        """
+        if remote_heads is None:
+            remote_heads = self.get_tracked_remote_heads()
+        state_path = self.fetch_state_path()
+        try:
+            dump_json_atomically({"fetched_at": time.time(), "remote_heads": remote_heads}, state_path)
+        except OSError as e:
+            log.debug(f"Could not save the fetch state '{state_path}': {e}")
+
+    def get_tracked_remote_heads(self):
+        """
+        Returns the branch heads of the remote as last fetched into the local clone
+
+        Returns:
+            (dict[str, str]): The commit SHAs of the remote tracking branches, by remote ref name
+        """
+        return {
+            f"refs/heads/{ref.remote_head}": ref.commit.hexsha
+            for ref in self.repo.remotes.origin.refs
+            if ref.remote_head != "HEAD"
+        }
+
+    def get_remote_heads(self):
+        """
+        Lists the branch heads of the remote with `git ls-remote`, without fetching any objects
+
+        Returns:
+            (dict[str, str]): The commit SHAs of the remote branches, by ref name
+        """
+        remote_heads = {}
+        for line in self.repo.git.ls_remote("--heads", "origin").splitlines():
+            sha, _, ref_name = line.partition("\t")
+            remote_heads[ref_name] = sha
+        return remote_heads
+
+    def fetch_needed(self):
+        """
+        Checks whether the local clone has to be fetched from the remote.
+
+        With a staleness window (`fetch_ttl`) configured, a clone fetched less than `fetch_ttl`
+        seconds ago by any nf-core process is not fetched again. Once the window has passed,
+        the branch heads of the remote are compared with the ones fetched last, and the clone is
+        only fetched if one of them has moved.
+
+        Returns:
+            (bool): True if the clone should be fetched
+        """
+        if not SyncedRepo.fetch_ttl:
+            return True
+        state = self.load_fetch_state()
+        age = time.time() - state.get("fetched_at", 0)
+        if 0 <= age < SyncedRepo.fetch_ttl:
+            log.debug(f"Skipping fetch of '{self.fullname}', it was fetched {age:.0f}s ago")
+            return False
+        try:
+            remote_heads = self.get_remote_heads()
+        except GitCommandError as e:
+            log.debug(f"Could not list the branches of '{self.remote_url}': {e}")
+            return True
+        tracked_heads = self.get_tracked_remote_heads()
+        if all(tracked_heads.get(ref_name) == sha for ref_name, sha in remote_heads.items()):
+            log.debug(f"Skipping fetch of '{self.fullname}', the remote branches have not changed")
+            self.save_fetch_state(remote_heads)
+            return False
+        return True
+
+    def is_partial_clone(self):
+        """
+        Checks whether the local clone is a partial clone, which fetches missing objects from the remote on demand
+        """
+        return self.repo.config_reader("repository").get_value('remote "origin"', "promisor", False) is True
+
+    def is_sparse_checkout(self):
+        """
+        Checks whether only some directories of the local clone are checked out
+        """
+        # Sparse checkouts are configured per worktree (config.worktree), which GitPython does not read
+        try:
+            return self.repo.git.config("--bool", "--get", "core.sparseCheckout") == "true"
+        except GitCommandError:
+            return False
+
+    def update_sparse_checkout(self):
+        """
+        Adds the component directories configured for this remote to the checkout of a sparse clone.
+        Directories checked out for other pipelines are kept.
+        """
+        if not self.is_sparse_checkout():
+            return
+        sparse_paths = SyncedRepo.sparse_paths.get(self.remote_url, set())
+        missing_paths = sparse_paths - set(self.repo.git.sparse_checkout("list").splitlines())
+        if missing_paths:
+            log.debug(f"Adding {len(missing_paths)} component directories to the sparse checkout of '{self.fullname}'")
+            self.repo.git.sparse_checkout("add", *sorted(missing_paths))
+
+    def fetch_missing_blobs(self, tree):
+        """
+        Fetches the blobs of a tree that are missing from a partial clone, in a single request.
+        Without this, git fetches each missing blob with a request of its own when it is read.
+
+        Args:
+            tree (git.Tree): The tree to fetch the blobs of
+        """
+        if not self.is_partial_clone():
+            return
+        missing_objects = [
+            line[1:]
+            for line in self.repo.git.rev_list("--objects", "--missing=print", tree.hexsha).splitlines()
+            if line.startswith("?")
+        ]
+        if missing_objects:
+            log.debug(f"Fetching {len(missing_objects)} missing objects of '{tree.path}' from '{self.remote_url}'")
+            with self.repo_lock():
+                self.repo.git.fetch("origin", "--no-tags", "--filter=blob:none", *missing_objects)
+
     @staticmethod
     def get_remote_branches(remote_url):
         """
@@ -200,7 +541,10 @@ class SyncedRepo:
         """
         Verifies the active branch conforms to the correct directory structure
         """
-        dir_names = os.listdir(self.local_repo_dir)
+        # Read the git tree, the directory might not be checked out in sparse clones
+        tree = self.get_tree()
+        with SyncedRepo.object_lock:
+            dir_names = [entry.name for entry in tree]
         if "modules" not in dir_names:
             err_str = f"Repository '{self.remote_url}' ({self.branch}) does not contain the 'modules/' directory"
             if "software" in dir_names:
@@ -213,18 +557,19 @@ class SyncedRepo:
         """
         Checks out the specified branch of the repository
         """
-        try:
-            self.repo.git.checkout(self.branch)
-        except GitCommandError as e:
-            if (
-                self.fullname
-                and "modules" in self.fullname
-                and "Your local changes to the following files would be overwritten by checkout" in str(e)
-            ):
-                log.debug(f"Overwriting local changes in '{self.local_repo_dir}'")
-                self.repo.git.checkout(self.branch, force=True)
-            else:
-                raise e
+        with self.repo_lock():
+            try:
+                self.repo.git.checkout(self.branch)
+            except GitCommandError as e:
+                if (
+                    self.fullname
+                    and "modules" in self.fullname
+                    and "Your local changes to the following files would be overwritten by checkout" in str(e)
+                ):
+                    log.debug(f"Overwriting local changes in '{self.local_repo_dir}'")
+                    self.repo.git.checkout(self.branch, force=True)
+                else:
+                    raise e
 
     def checkout(self, commit):
         """
@@ -233,18 +578,19 @@ class SyncedRepo:
         Args:
             commit (str): Git SHA of the commit
         """
-        try:
-            self.repo.git.checkout(commit)
-        except GitCommandError as e:
-            if (
-                self.fullname
-                and "modules" in self.fullname
-                and "Your local changes to the following files would be overwritten by checkout" in str(e)
-            ):
-                log.debug(f"Overwriting local changes in '{self.local_repo_dir}'")
-                self.repo.git.checkout(self.branch, force=True)
-            else:
-                raise e
+        with self.repo_lock():
+            try:
+                self.repo.git.checkout(commit)
+            except GitCommandError as e:
+                if (
+                    self.fullname
+                    and "modules" in self.fullname
+                    and "Your local changes to the following files would be overwritten by checkout" in str(e)
+                ):
+                    log.debug(f"Overwriting local changes in '{self.local_repo_dir}'")
+                    self.repo.git.checkout(self.branch, force=True)
+                else:
+                    raise e
 
     def component_exists(self, component_name, component_type, checkout=True, commit=None):
         """
@@ -273,6 +619,302 @@ class SyncedRepo:
         elif component_type == "subworkflows":
             return os.path.join(self.subworkflows_dir, component_name)
 
+    def get_component_relpath(self, component_name, component_type):
+        """
+        Returns the path of a module/subworkflow directory relative to the root of the repo.
+        Does not verify that the path exists.
+
+        Args:
+            component_name (str): The name of the module/subworkflow
+            component_type (str): Either 'modules' or 'subworkflows'
+
+        Returns:
+            (str): The path of the module/subworkflow relative to the repository root
+        """
+        if component_type not in ("modules", "subworkflows"):
+            raise ValueError(f"Invalid component type: {component_type}")
+        return f"{component_type}/{self.repo_path}/{component_name}"
+
+    def get_tree(self, commit=None):
+        """
+        Returns the git tree of the repository at the requested commit without checking it out
+
+        Args:
+            commit (str, optional): Git SHA of the commit. Defaults to the tip of the branch
+
+        Returns:
+            (git.Tree): The root tree of the commit
+
+        Raises:
+            LookupError: If the commit does not exist in the repository
+        """
+        rev = self.branch if commit is None else commit
+        try:
+            with SyncedRepo.object_lock:
+                return self.repo.commit(rev).tree
+        except (BadName, ValueError):
+            raise LookupError(f"Commit '{rev}' not found in the '{self.remote_url}'")
+
+    def get_object(self, path, commit=None):
+        """
+        Returns the git object (blob or tree) at a path in the repository at the requested commit
+
+        Args:
+            path (str | Path): Path relative to the root of the repository
+            commit (str, optional): Git SHA of the commit. Defaults to the tip of the branch
+
+        Returns:
+            (git.Blob | git.Tree | None): The object, or None if the path does not exist
+        """
+        tree = self.get_tree(commit)
+        try:
+            with SyncedRepo.object_lock:
+                return tree / Path(path).as_posix()
+        except KeyError:
+            return None
+
+    def read_file(self, path, commit=None) -> Optional[bytes]:
+        """
+        Reads the contents of a file in the repository at the requested commit
+        straight from the git object database. The contents are cached by blob SHA.
+
+        Args:
+            path (str | Path): Path of the file relative to the root of the repository
+            commit (str, optional): Git SHA of the commit. Defaults to the tip of the branch
+
+        Returns:
+            (bytes | None): The file contents, or None if the file does not exist
+        """
+        blob = self.get_object(path, commit)
+        if blob is None or blob.type != "blob":
+            return None
+        return self.read_blob(blob)
+
+    @staticmethod
+    def read_blob(blob) -> bytes:
+        """
+        Reads the contents of a git blob, cached by its SHA
+
+        Args:
+            blob (git.Blob): The blob
+
+        Returns:
+            (bytes): The contents of the blob
+        """
+        if blob.hexsha not in SyncedRepo.blob_cache:
+            with SyncedRepo.object_lock:
+                SyncedRepo.blob_cache[blob.hexsha] = blob.data_stream.read()
+        return SyncedRepo.blob_cache[blob.hexsha]
+
+    def read_tree(self, tree):
+        """
+        Reads the files of a git tree into a snapshot, straight from the git object database
+
+        Args:
+            tree (git.Tree): The tree to read
+
+        Returns:
+            (ComponentSnapshot): The files of the tree, by path relative to the tree
+        """
+        with SyncedRepo.object_lock:
+            blobs = [item for item in tree.traverse() if item.type == "blob"]
+        files = {}
+        modes = {}
+        for blob in blobs:
+            path = posixpath.relpath(blob.path, tree.path)
+            files[path] = self.read_blob(blob)
+            if blob.mode == blob.link_mode:
+                modes[path] = ComponentSnapshot.LINK_MODE
+            elif blob.mode & 0o111:
+                modes[path] = ComponentSnapshot.EXECUTABLE_MODE
+        return ComponentSnapshot(files, modes)
+
+    def export_tree(self, tree, dest):
+        """
+        Writes the files of a git tree into a new directory, straight from the git object database.
+        Unlike a checkout, this does not change the local clone, so it is safe while other threads
+        or processes use the clone.
+
+        Args:
+            tree (git.Tree): The tree to export
+            dest (str | Path): The directory to create
+
+        Raises:
+            FileExistsError: If the directory exists already
+        """
+        os.makedirs(dest)
+        self.read_tree(tree).write(dest)
+
+    def list_dir(self, path, commit=None) -> Optional[List[str]]:
+        """
+        Lists the entries of a directory in the repository at the requested commit
+
+        Args:
+            path (str | Path): Path of the directory relative to the root of the repository
+            commit (str, optional): Git SHA of the commit. Defaults to the tip of the branch
+
+        Returns:
+            ([ str ] | None): The names of the directory entries, or None if the directory does not exist
+        """
+        tree = self.get_object(path, commit)
+        if tree is None or tree.type != "tree":
+            return None
+        with SyncedRepo.object_lock:
+            return sorted(entry.name for entry in tree)
+
+    def get_component_file(self, component_name, component_type, file_name, commit=None) -> Optional[str]:
+        """
+        Returns the text contents of a module/subworkflow file (e.g. 'main.nf', 'meta.yml'
+        or 'environment.yml') at the requested commit, without checking out the repository
+
+        Args:
+            component_name (str): The name of the module/subworkflow
+            component_type (str): Either 'modules' or 'subworkflows'
+            file_name (str): Path of the file relative to the module/subworkflow directory
+            commit (str, optional): Git SHA of the commit. Defaults to the tip of the branch
+
+        Returns:
+            (str | None): The contents of the file, or None if it does not exist
+        """
+        contents = self.read_file(Path(self.get_component_relpath(component_name, component_type), file_name), commit)
+        if contents is None:
+            return None
+        return contents.decode()
+
+    def component_index_path(self):
+        """
+        Returns the path of the on-disk component blob index for the branch of the local clone of this repo
+        """
+        repo_name = re.sub(r"[^\w.-]", "_", self.fullname.strip("/"))
+        branch_name = re.sub(r"[^\w.-]", "_", self.branch)
+        dir_hash = hashlib.sha1(os.path.abspath(self.local_repo_dir).encode()).hexdigest()[:8]
+        return Path(setup_nfcore_cachedir("component_index"), f"{repo_name}_{branch_name}_{dir_hash}.json")
+
+    def get_component_index(self):
+        """
+        Loads the component blob index of the branch and brings it up to date with the tip of the branch.
+
+        The index maps each module/subworkflow directory and the pair of git blob SHAs of its
+        'main.nf' and 'meta.yml' files to the newest commit touching the component with that pair.
+        It is stored in the nf-core cache directory and only the commits added since
+        the last update are read from the git log.
+
+        Returns:
+            (dict): The index, with the keys 'version', 'head', 'state' and 'commits'
+        """
+        index_path = str(self.component_index_path())
+        index = SyncedRepo.component_indexes.get(index_path)
+        if index is None and os.path.exists(index_path):
+            try:
+                with open(index_path) as fh:
+                    index = json.load(fh)
+            except (OSError, json.JSONDecodeError) as e:
+                log.debug(f"Could not load the component index '{index_path}': {e}")
+        if index is None or index.get("version") != COMPONENT_INDEX_VERSION:
+            index = {"version": COMPONENT_INDEX_VERSION, "head": None, "state": {}, "commits": {}}
+
+        head = self.repo.commit(self.branch).hexsha
+        if index["head"] == head:
+            SyncedRepo.component_indexes[index_path] = index
+            return index
+
+        if index["head"] is not None and not (
+            self.repo.is_valid_object(index["head"], "commit") and self.repo.is_ancestor(index["head"], head)
+        ):
+            log.debug(f"Branch '{self.branch}' was rewritten, rebuilding the component index")
+            index = {"version": COMPONENT_INDEX_VERSION, "head": None, "state": {}, "commits": {}}
+
+        rev_range = head if index["head"] is None else f"{index['head']}..{head}"
+        log.debug(f"Updating the component index of '{self.remote_url}' ({rev_range})")
+        self.update_component_index(index, rev_range)
+        index["head"] = head
+
+        SyncedRepo.component_indexes[index_path] = index
+        try:
+            dump_json_atomically(index, index_path)
+        except OSError as e:
+            log.debug(f"Could not save the component index '{index_path}': {e}")
+        return index
+
+    def update_component_index(self, index, rev_range):
+        """
+        Adds the commits in a revision range to the component blob index
+
+        Only the first-parent history of the branch is walked, with merge commits showing their changes
+        against their first parent, so that the changes are applied in the order they reached the branch.
+        Versions that only existed on merged side branches are not indexed.
+
+        Args:
+            index (dict): The index to update in place
+            rev_range (str): The git revision range to read, e.g. '<old_head>..<new_head>'
+        """
+        raw_log = self.repo.git.log(
+            rev_range,
+            "--first-parent",
+            "-m",
+            "--reverse",
+            "--raw",
+            "--no-renames",
+            "--no-abbrev",
+            "--format=%x00%H",
+            "--",
+            *COMPONENT_TYPES,
+        )
+        state = index["state"]
+        commits = index["commits"]
+        for commit_log in raw_log.split("\0")[1:]:
+            commit_sha, _, raw_changes = commit_log.partition("\n")
+            changes = []
+            for line in raw_changes.splitlines():
+                if not line.startswith(":"):
+                    continue
+                file_info, _, file_path = line.partition("\t")
+                new_sha = file_info.split()[3]
+                changes.append((file_path, None if new_sha == "0" * 40 else new_sha))
+            # Update the blob SHAs of the component entry files first, so that new components are known
+            for file_path, new_sha in changes:
+                component_dir, file_name = posixpath.split(file_path)
+                if file_name in COMPONENT_INDEX_FILES:
+                    state.setdefault(component_dir, {})[file_name] = new_sha
+                    if new_sha is None and not any(state[component_dir].values()):
+                        del state[component_dir]
+            touched_components = set()
+            for file_path, _ in changes:
+                component_dir = posixpath.dirname(file_path)
+                while component_dir and component_dir not in state:
+                    component_dir = posixpath.dirname(component_dir)
+                if component_dir:
+                    touched_components.add(component_dir)
+            for component_dir in touched_components:
+                blob_shas = [state[component_dir].get(file_name) for file_name in COMPONENT_INDEX_FILES]
+                if all(blob_shas):
+                    commits.setdefault(component_dir, {})[":".join(blob_shas)] = commit_sha
+
+    def find_commit_from_blob_shas(self, component_name, component_type, main_nf_sha, meta_yml_sha):
+        """
+        Looks up the newest commit on the branch in which the 'main.nf' and 'meta.yml'
+        files of a module/subworkflow have the given git blob SHAs
+
+        Args:
+            component_name (str): The name of the module/subworkflow
+            component_type (str): Either 'modules' or 'subworkflows'
+            main_nf_sha (str): The git blob SHA of the 'main.nf' file
+            meta_yml_sha (str): The git blob SHA of the 'meta.yml' file
+
+        Returns:
+            (str | None): The commit SHA, or None if the files never had this content in the index
+        """
+        index = self.get_component_index()
+        component_dirs = [self.get_component_relpath(component_name, component_type)]
+        if component_type == "modules":
+            # Also look at the previous modules structure, like get_component_git_log()
+            component_dirs.append(posixpath.join("modules", component_name))
+        for component_dir in component_dirs:
+            commit_sha = index["commits"].get(component_dir, {}).get(f"{main_nf_sha}:{meta_yml_sha}")
+            if commit_sha is not None:
+                return commit_sha
+        return None
+
     def install_component(self, component_name, install_dir, commit, component_type):
         """
         Install the module/subworkflow files into a pipeline at the given commit
@@ -285,50 +927,90 @@ class SyncedRepo:
         Returns:
             (bool): Whether the operation was successful or not
         """
-        # Check out the repository at the requested ref
-        try:
-            self.checkout(commit)
-        except git.GitCommandError:
+        component_tree = self.get_component_tree(component_name, component_type, commit)
+        if component_tree is None:
             return False
 
+        # Write the files from the repo to the install folder
+        self.fetch_missing_blobs(component_tree)
+        self.export_tree(component_tree, Path(install_dir, component_name))
+        return True
+
+    def get_component_snapshot(self, component_name, component_type, commit):
+        """
+        Reads the module/subworkflow files at the given commit into memory, without checking out the repository
+
+        Args:
+            component_name (str): The name of the module/subworkflow
+            component_type (str): Either 'modules' or 'subworkflows'
+            commit (str): The git SHA for the version of the module/subworkflow
+
+        Returns:
+            (ComponentSnapshot | None): The files of the module/subworkflow, or None if it does not exist
+        """
+        component_tree = self.get_component_tree(component_name, component_type, commit)
+        if component_tree is None:
+            return None
+        self.fetch_missing_blobs(component_tree)
+        return self.read_tree(component_tree)
+
+    def get_component_tree(self, component_name, component_type, commit):
+        """
+        Returns the git tree of a module/subworkflow at the given commit
+
+        Args:
+            component_name (str): The name of the module/subworkflow
+            component_type (str): Either 'modules' or 'subworkflows'
+            commit (str): The git SHA for the version of the module/subworkflow
+
+        Returns:
+            (git.Tree | None): The tree, or None if the module/subworkflow does not exist at the commit
+        """
+        # Read the module/subworkflow at the requested ref without checking it out
+        try:
+            component_tree = self.get_object(self.get_component_relpath(component_name, component_type), commit)
+        except LookupError:
+            return None
+
         # Check if the module/subworkflow exists in the branch
-        if not self.component_exists(component_name, component_type, checkout=False):
+        if (
+            component_tree is None
+            or component_tree.type != "tree"
+            or self.get_object(Path(component_tree.path, "main.nf"), commit) is None
+        ):
             log.error(
                 f"The requested {component_type[:-1]} does not exists in the branch '{self.branch}' of {self.remote_url}'"
             )
-            return False
-
-        # Copy the files from the repo to the install folder
-        shutil.copytree(self.get_component_dir(component_name, component_type), Path(install_dir, component_name))
-
-        # Switch back to the tip of the branch
-        self.checkout_branch()
-        return True
+            return None
+        return component_tree
 
     def component_files_identical(self, component_name, base_path, commit, component_type):
         """
-        Checks whether the module or subworkflow files in a pipeline are identical to the ones in the remote
+        Checks whether the module or subworkflow files in a pipeline are identical to the ones in the remote.
+        The files are compared by their git blob SHA, so the repository does not need to be checked out.
+
         Args:
             component_name (str): The name of the module or subworkflow
-            base_path (str): The path to the module/subworkflow in the pipeline
+            base_path (str | ComponentSnapshot): The path to the module/subworkflow in the pipeline,
+                                                 or a snapshot of its files
 
         Returns:
             (bool): Whether the pipeline files are identical to the repo files
         """
-        if commit is None:
-            self.checkout_branch()
-        else:
-            self.checkout(commit)
         component_files = ["main.nf", "meta.yml"]
         files_identical = {file: True for file in component_files}
-        component_dir = self.get_component_dir(component_name, component_type)
+        component_path = self.get_component_relpath(component_name, component_type)
+        component_snapshot = ComponentSnapshot.of(base_path)
         for file in component_files:
-            try:
-                files_identical[file] = filecmp.cmp(Path(component_dir, file), Path(base_path, file))
-            except FileNotFoundError:
-                log.debug(f"Could not open file: {Path(component_dir, file)}")
+            remote_object = self.get_object(Path(component_path, file), commit)
+            if remote_object is None:
+                log.debug(f"Could not find file '{Path(component_path, file)}' at commit '{commit or self.branch}'")
+                continue
+            local_sha = component_snapshot.blob_sha(file)
+            if local_sha is None:
+                log.debug(f"Could not open file '{file}' of the local {component_type[:-1]} '{component_name}'")
                 continue
-        self.checkout_branch()
+            files_identical[file] = remote_object.hexsha == local_sha
         return files_identical
 
     def ensure_git_user_config(self, default_name: str, default_email: str) -> None:
@@ -346,6 +1028,118 @@ class SyncedRepo:
                 if not user_email:
                     git_config.set_value("user", "email", default_email)
 
+    def commit_index_path(self):
+        """
+        Returns the path of the on-disk commit index for the branch of the local clone of this repo
+        """
+        repo_name = re.sub(r"[^\w.-]", "_", self.fullname.strip("/"))
+        branch_name = re.sub(r"[^\w.-]", "_", self.branch)
+        dir_hash = hashlib.sha1(os.path.abspath(self.local_repo_dir).encode()).hexdigest()[:8]
+        return Path(setup_nfcore_cachedir("commit_index"), f"{repo_name}_{branch_name}_{dir_hash}.json")
+
+    def get_commit_index(self):
+        """
+        Loads the commit index of the branch and brings it up to date with the tip of the branch.
+
+        The index holds the first line of the message and the date of every commit on the branch,
+        and the commits touching the paths looked up with :meth:`get_path_commits`. It is stored in the
+        nf-core cache directory and only the commits added since the last update are read from the git log.
+
+        Returns:
+            (dict): The index, with the keys 'head', 'commits' (SHA to message and date)
+                and 'paths' (path to the SHAs of the commits touching it, newest first)
+        """
+        with SyncedRepo.commit_index_lock:
+            index_path = str(self.commit_index_path())
+            index = SyncedRepo.commit_indexes.get(index_path)
+            if index is None and os.path.exists(index_path):
+                try:
+                    with open(index_path) as fh:
+                        index = json.load(fh)
+                except (OSError, json.JSONDecodeError) as e:
+                    log.debug(f"Could not load the commit index '{index_path}': {e}")
+            if index is None:
+                index = {"head": None, "commits": {}, "paths": {}}
+
+            head = self.repo.commit(self.branch).hexsha
+            if index["head"] == head:
+                SyncedRepo.commit_indexes[index_path] = index
+                return index
+
+            if index["head"] is not None and not (
+                self.repo.is_valid_object(index["head"], "commit") and self.repo.is_ancestor(index["head"], head)
+            ):
+                log.debug(f"Branch '{self.branch}' was rewritten, rebuilding the commit index")
+                index = {"head": None, "commits": {}, "paths": {}}
+
+            rev_range = head if index["head"] is None else f"{index['head']}..{head}"
+            log.debug(f"Updating the commit index of '{self.remote_url}' ({rev_range})")
+            self.update_commit_index(index, rev_range)
+            index["head"] = head
+
+            SyncedRepo.commit_indexes[index_path] = index
+            self.save_commit_index(index)
+            return index
+
+    def update_commit_index(self, index, rev_range):
+        """
+        Adds the commits in a revision range to the commit index
+
+        The commit lists of the indexed paths are extended with the new commits changing files in them.
+        This matches `git log -- <path>` as long as the new commits have no merges, otherwise the
+        commit lists are dropped and computed again when they are needed.
+
+        Args:
+            index (dict): The index to update in place
+            rev_range (str): The git revision range to read, e.g. '<old_head>..<new_head>'
+        """
+        log_args = [rev_range, "--no-renames", "--format=%x00%H%x1f%P%x1f%cI%x1f%B%x1f"]
+        if index["paths"]:
+            log_args.append("--name-only")
+        new_commits = []
+        has_merges = False
+        for commit_log in self.repo.git.log(*log_args).split("\0")[1:]:
+            commit_sha, parents, date, raw_message = commit_log.split("\x1f", 3)
+            message, _, file_names = raw_message.rpartition("\x1f")
+            index["commits"][commit_sha] = [message.partition("\n")[0], date[:10]]
+            new_commits.append((commit_sha, file_names.split("\n")))
+            has_merges |= len(parents.split()) > 1
+        if has_merges:
+            index["paths"] = {}
+        for path, path_commits in index["paths"].items():
+            path_commits[:0] = [
+                commit_sha
+                for commit_sha, file_names in new_commits
+                if any(file_name == path or file_name.startswith(f"{path}/") for file_name in file_names)
+            ]
+
+    def save_commit_index(self, index):
+        """
+        Writes the commit index to the nf-core cache directory
+        """
+        index_path = self.commit_index_path()
+        try:
+            dump_json_atomically(index, index_path)
+        except OSError as e:
+            log.debug(f"Could not save the commit index '{index_path}': {e}")
+
+    def get_path_commits(self, path):
+        """
+        Returns the commits on the branch touching a path in the repository, like `git log -- <path>`
+
+        Args:
+            path (str): Path relative to the root of the repository
+
+        Returns:
+            ([ str ]): The commit SHAs, newest first
+        """
+        with SyncedRepo.commit_index_lock:
+            index = self.get_commit_index()
+            if path not in index["paths"]:
+                index["paths"][path] = self.repo.git.rev_list(index["head"], "--", path).split()
+                self.save_commit_index(index)
+            return index["paths"][path]
+
     def get_component_git_log(self, component_name, component_type, depth=None):
         """
         Fetches the commit history the of requested module/subworkflow since a given date. The default value is
@@ -358,22 +1152,17 @@ class SyncedRepo:
         Returns:
             ( dict ): Iterator of commit SHAs and associated (truncated) message
         """
-        self.checkout_branch()
-        component_path = os.path.join(component_type, self.repo_path, component_name)
-        commits_new = self.repo.iter_commits(max_count=depth, paths=component_path)
-        commits_new = [
-            {"git_sha": commit.hexsha, "trunc_message": commit.message.partition("\n")[0]} for commit in commits_new
-        ]
-        commits_old = []
+        component_paths = [posixpath.join(component_type, self.repo_path, component_name)]
         if component_type == "modules":
             # Grab commits also from previous modules structure
-            component_path = os.path.join("modules", component_name)
-            commits_old = self.repo.iter_commits(max_count=depth, paths=component_path)
-            commits_old = [
-                {"git_sha": commit.hexsha, "trunc_message": commit.message.partition("\n")[0]} for commit in commits_old
-            ]
-        commits = iter(commits_new + commits_old)
-        return commits
+            component_paths.append(posixpath.join("modules", component_name))
+        commit_messages = self.get_commit_index()["commits"]
+        commits = [
+            {"git_sha": commit_sha, "trunc_message": commit_messages[commit_sha][0]}
+            for component_path in component_paths
+            for commit_sha in self.get_path_commits(component_path)[:depth]
+        ]
+        return iter(commits)
 
     def get_latest_component_version(self, component_name, component_type):
         """
@@ -385,8 +1174,7 @@ class SyncedRepo:
         """
         Verifies that a given commit sha exists on the branch
         """
-        self.checkout_branch()
-        return sha in (commit.hexsha for commit in self.repo.iter_commits())
+        return sha in self.get_commit_index()["commits"]
 
     def get_commit_info(self, sha):
         """
@@ -399,39 +1187,109 @@ class SyncedRepo:
         Raises:
             LookupError: If the search for the commit fails
         """
-        self.checkout_branch()
-        for commit in self.repo.iter_commits():
-            if commit.hexsha == sha:
-                message = commit.message.partition("\n")[0]
-                date_obj = commit.committed_datetime
-                date = str(date_obj.date())
-                return message, date
-        raise LookupError(f"Commit '{sha}' not found in the '{self.remote_url}'")
+        try:
+            message, date = self.get_commit_index()["commits"][sha]
+        except KeyError:
+            raise LookupError(f"Commit '{sha}' not found in the '{self.remote_url}'")
+        return message, date
 
     def get_avail_components(self, component_type, checkout=True, commit=None):
         """
         Gets the names of the modules/subworkflows in the repository. They are detected by
-        checking which directories have a 'main.nf' file
+        checking which directories have a 'main.nf' file.
+
+        The names are read from the git tree, so the repository is never checked out,
+        and are looked up in the component name index of the tree, see :meth:`get_component_names_index`.
+
+        Args:
+            component_type (str): Either 'modules' or 'subworkflows'
+            checkout (bool): Whether to list the components of the branch or of the commit
+                that is currently checked out. Ignored if a commit is given.
+            commit (str, optional): Git SHA of the commit to list the components at
 
         Returns:
             ([ str ]): The module/subworkflow names
         """
-        if checkout:
-            self.checkout_branch()
-        if commit is not None:
-            self.checkout(commit)
-        # Get directory
-        if component_type == "modules":
-            directory = self.modules_dir
-        elif component_type == "subworkflows":
-            directory = self.subworkflows_dir
-        # Module/Subworkflow directories are characterized by having a 'main.nf' file
-        avail_component_names = [
-            os.path.relpath(dirpath, start=directory)
-            for dirpath, _, file_names in os.walk(directory)
-            if "main.nf" in file_names
-        ]
-        return avail_component_names
+        if commit is None and not checkout:
+            commit = "HEAD"
+        return self.list_components_from_tree(component_type, commit)
+
+    def list_components_from_tree(self, component_type, commit=None):
+        """
+        Gets the names of the modules/subworkflows in the repository at a commit from
+        the git tree, without checking out the repository
+
+        Args:
+            component_type (str): Either 'modules' or 'subworkflows'
+            commit (str, optional): Git SHA of the commit. Defaults to the tip of the branch
+
+        Returns:
+            ([ str ]): The module/subworkflow names
+        """
+        components_tree = self.get_object(f"{component_type}/{self.repo_path}", commit)
+        if components_tree is None or components_tree.type != "tree":
+            return []
+        names_index = self.get_component_names_index()
+        with SyncedRepo.component_names_lock:
+            component_names = names_index.get(components_tree.hexsha)
+        if component_names is None:
+            # Module/Subworkflow directories are characterized by having a 'main.nf' file
+            component_names = [
+                posixpath.dirname(path)
+                for path in self.repo.git.ls_tree("-r", "--name-only", "-z", components_tree.hexsha).split("\0")
+                if posixpath.basename(path) == "main.nf" and posixpath.dirname(path)
+            ]
+            with SyncedRepo.component_names_lock:
+                names_index[components_tree.hexsha] = component_names
+                # Only keep the most recently listed trees
+                for tree_sha in list(names_index)[:-COMPONENT_NAMES_INDEX_SIZE]:
+                    del names_index[tree_sha]
+                self.save_component_names_index(names_index)
+        return list(component_names)
+
+    def component_names_index_path(self):
+        """
+        Returns the path of the on-disk component name index of the local clone of this repo
+        """
+        repo_name = re.sub(r"[^\w.-]", "_", self.fullname.strip("/"))
+        dir_hash = hashlib.sha1(os.path.abspath(self.local_repo_dir).encode()).hexdigest()[:8]
+        return Path(setup_nfcore_cachedir("component_names"), f"{repo_name}_{dir_hash}.json")
+
+    def get_component_names_index(self):
+        """
+        Loads the component name index of the local clone.
+
+        The index maps the SHA of a 'modules/<org>' or 'subworkflows/<org>' git tree to the names
+        of the modules/subworkflows in it. Git trees are immutable, so the entries never go stale.
+
+        Returns:
+            (dict[str, list[str]]): The component names, by tree SHA
+        """
+        index_path = str(self.component_names_index_path())
+        with SyncedRepo.component_names_lock:
+            if index_path not in SyncedRepo.component_names_indexes:
+                index = {}
+                if os.path.exists(index_path):
+                    try:
+                        with open(index_path) as fh:
+                            index = json.load(fh)
+                    except (OSError, json.JSONDecodeError) as e:
+                        log.debug(f"Could not load the component name index '{index_path}': {e}")
+                SyncedRepo.component_names_indexes[index_path] = index
+            return SyncedRepo.component_names_indexes[index_path]
+
+    def save_component_names_index(self, index):
+        """
+        Writes the component name index of the local clone to the nf-core cache directory
+
+        Args:
+            index (dict[str, list[str]]): The index to save
+        """
+        index_path = self.component_names_index_path()
+        try:
+            dump_json_atomically(index, index_path)
+        except OSError as e:
+            log.debug(f"Could not save the component name index '{index_path}': {e}")
 
     def get_meta_yml(self, component_type, module_name):
         """
@@ -443,15 +1301,4 @@ class SyncedRepo:
         Returns:
             (str): The contents of the file in text format
         """
-        self.checkout_branch()
-        if component_type == "modules":
-            path = Path(self.modules_dir, module_name, "meta.yml")
-        elif component_type == "subworkflows":
-            path = Path(self.subworkflows_dir, module_name, "meta.yml")
-        else:
-            raise ValueError(f"Invalid component type: {component_type}")
-        if not path.exists():
-            return None
-        with open(path) as fh:
-            contents = fh.read()
-        return contents
+        return self.get_component_file(module_name, component_type, "meta.yml")
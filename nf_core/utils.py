@@ -16,10 +16,11 @@ import re
 import shlex
 import subprocess
 import sys
+import threading
 import time
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Generator, Tuple, Union
+from typing import Dict, Generator, List, Optional, Tuple, Union
 
 import git
 import prompt_toolkit
@@ -220,6 +221,34 @@ def is_pipeline_directory(wf_path):
             raise UserWarning(warning)
 
 
+# Workflow configs resolved in this session, by cache file name
+wf_config_cache: Dict[str, dict] = {}
+
+
+def wf_config_cache_fn(wf_path: Union[str, Path]) -> Optional[str]:
+    """Build the name of the cache file for the configuration of a workflow,
+    based on the contents of its `nextflow.config` and `main.nf` files.
+
+    Args:
+        wf_path (str): Nextflow workflow file system path.
+
+    Returns:
+        str: The cache file name, or None if neither file exists.
+    """
+    concat_hash = ""
+    for fn in ["nextflow.config", "main.nf"]:
+        try:
+            with open(Path(wf_path, fn), "rb") as fh:
+                concat_hash += hashlib.sha256(fh.read()).hexdigest()
+        except FileNotFoundError:
+            pass
+    # Hash the hash
+    if len(concat_hash) > 0:
+        bighash = hashlib.sha256(concat_hash.encode("utf-8")).hexdigest()
+        return f"wf-config-cache-{bighash[:25]}.json"
+    return None
+
+
 def fetch_wf_config(wf_path: str, cache_config: bool = True) -> dict:
     """Uses Nextflow to retrieve the the configuration variables
     from a Nextflow workflow.
@@ -248,20 +277,12 @@ def fetch_wf_config(wf_path: str, cache_config: bool = True) -> dict:
         if not cache_basedir.is_dir():
             cache_basedir.mkdir(parents=True, exist_ok=True)
 
-    # If we're given a workflow object with a commit, see if we have a cached copy
-    cache_fn = None
-    # Make a filename based on file contents
-    concat_hash = ""
-    for fn in ["nextflow.config", "main.nf"]:
-        try:
-            with open(Path(wf_path, fn), "rb") as fh:
-                concat_hash += hashlib.sha256(fh.read()).hexdigest()
-        except FileNotFoundError:
-            pass
-    # Hash the hash
-    if len(concat_hash) > 0:
-        bighash = hashlib.sha256(concat_hash.encode("utf-8")).hexdigest()
-        cache_fn = f"wf-config-cache-{bighash[:25]}.json"
+    # Make a filename based on file contents, to see if we have a cached copy
+    cache_fn = wf_config_cache_fn(wf_path)
+
+    if cache_fn and cache_config is True and cache_fn in wf_config_cache:
+        log.debug(f"Config already loaded in this session: {cache_fn}")
+        return dict(wf_config_cache[cache_fn])
 
     if cache_basedir and cache_fn:
         cache_path = Path(cache_basedir, cache_fn)
@@ -272,6 +293,7 @@ def fetch_wf_config(wf_path: str, cache_config: bool = True) -> dict:
                     config = json.load(fh)
                 except json.JSONDecodeError as e:
                     raise UserWarning(f"Unable to load JSON file '{cache_path}' due to error {e}")
+            wf_config_cache[cache_fn] = dict(config)
             return config
     log.debug("No config cache found")
 
@@ -305,6 +327,8 @@ def fetch_wf_config(wf_path: str, cache_config: bool = True) -> dict:
     # to save configuration copy in $HOME, otherwise the tests/test_download.py::DownloadTest::test_wf_use_local_configs
     # will fail after the first attempt. It's better to not save temporary data
     # in others folders than tmp when doing tests in general
+    if cache_fn and cache_config:
+        wf_config_cache[cache_fn] = dict(config)
     if cache_path and cache_config:
         log.debug(f"Saving config cache: {cache_path}")
         with open(cache_path, "w") as fh:
@@ -313,6 +337,38 @@ def fetch_wf_config(wf_path: str, cache_config: bool = True) -> dict:
     return config
 
 
+def fetch_wf_configs(wf_paths: List[str], cache_config: bool = True, max_workers: int = 4) -> Dict[str, dict]:
+    """Retrieve the configuration of several Nextflow workflows at once,
+    e.g. for all revisions of a pipeline that is downloaded.
+
+    `nextflow config` resolves a single project per call and every call starts a new JVM.
+    The workflows with identical `nextflow.config` and `main.nf` files share a cache entry,
+    so they are only resolved once, and the remaining calls are run concurrently.
+
+    Args:
+        wf_paths (list): Nextflow workflow file system paths.
+        cache_config (bool): cache configuration or not (def. True)
+        max_workers (int): Maximum number of `nextflow config` processes to run at once
+
+    Returns:
+        dict: Workflow configuration settings by workflow path.
+    """
+    # Group the workflows that would share a config cache entry
+    wf_groups: Dict[str, List[str]] = {}
+    for wf_path in wf_paths:
+        cache_fn = wf_config_cache_fn(wf_path) if cache_config else None
+        wf_groups.setdefault(cache_fn or str(wf_path), []).append(wf_path)
+
+    configs = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(fetch_wf_config, paths[0], cache_config): paths for paths in wf_groups.values()}
+        for future in concurrent.futures.as_completed(futures):
+            config = future.result()
+            for wf_path in futures[future]:
+                configs[wf_path] = dict(config)
+    return configs
+
+
 def run_cmd(executable: str, cmd: str) -> Union[Tuple[bytes, bytes], None]:
     """Run a specified command and capture the output. Handle errors nicely."""
     full_cmd = f"{executable} {cmd}"
@@ -611,7 +667,7 @@ class GitHubAPISession(requests_cache.CachedSession):
 gh_api = GitHubAPISession()
 
 
-def anaconda_package(dep, dep_channels=None):
+def anaconda_package(dep, dep_channels=None, session=None):
     """Query conda package information.
 
     Sends a HTTP GET request to the Anaconda remote API.
@@ -619,6 +675,7 @@ def anaconda_package(dep, dep_channels=None):
     Args:
         dep (str): A conda package name.
         dep_channels (list): list of conda channels to use
+        session (requests.Session): Session to send the requests with. Defaults to a new connection per request.
 
     Raises:
         A LookupError, if the connection fails or times out or gives an unexpected status code
@@ -627,6 +684,10 @@ def anaconda_package(dep, dep_channels=None):
 
     if dep_channels is None:
         dep_channels = ["conda-forge", "bioconda", "defaults"]
+    else:
+        dep_channels = list(dep_channels)
+    if session is None:
+        session = requests
 
     # Check if each dependency is the latest available version
     if "=" in dep:
@@ -645,7 +706,7 @@ def anaconda_package(dep, dep_channels=None):
     for ch in dep_channels:
         anaconda_api_url = f"https://api.anaconda.org/package/{ch}/{depname}"
         try:
-            response = requests.get(anaconda_api_url, timeout=10)
+            response = session.get(anaconda_api_url, timeout=10)
         except requests.exceptions.Timeout:
             raise LookupError(f"Anaconda API timed out: {anaconda_api_url}")
         except requests.exceptions.ConnectionError:
@@ -725,7 +786,7 @@ def pip_package(dep):
         raise ValueError(f"Could not find pip dependency using the PyPI API: `{dep}`")
 
 
-def get_biocontainer_tag(package, version):
+def get_biocontainer_tag(package, version, session=None):
     """
     Given a bioconda package and version, looks for Docker and Singularity containers
     using the biocontaineres API, e.g.:
@@ -734,6 +795,7 @@ def get_biocontainer_tag(package, version):
     Args:
         package (str): A bioconda package name.
         version (str): Version of the bioconda package
+        session (requests.Session): Session to send the request with. Defaults to a new connection.
     Raises:
         A LookupError, if the connection fails or times out or gives an unexpected status code
         A ValueError, if the package name can not be found (404)
@@ -748,8 +810,10 @@ def get_biocontainer_tag(package, version):
         """
         return datetime.datetime.strptime(tag_date, "%Y-%m-%dT%H:%M:%SZ")
 
+    if session is None:
+        session = requests
     try:
-        response = requests.get(biocontainers_api_url)
+        response = session.get(biocontainers_api_url)
     except requests.exceptions.ConnectionError:
         raise LookupError("Could not connect to biocontainers.pro API")
     else:
@@ -793,6 +857,87 @@ def get_biocontainer_tag(package, version):
             raise ValueError(f"Could not find `{package}` on api.biocontainers.pro")
 
 
+class PackageMetadataClient:
+    """
+    Client for the Anaconda and biocontainers APIs, shared by the commands that
+    look up the metadata of many conda packages (module linting, version bumping, licences).
+
+    Requests go through a single pooled HTTP session, and the responses are kept in an
+    on-disk cache that expires after `expire_after`. As the request URLs are built from the
+    channel and package names, the cache is effectively keyed by (channel, package).
+    Packages that were not found (404) are cached as well, so that the channels
+    not containing a package are not queried again.
+    """
+
+    def __init__(self, expire_after=datetime.timedelta(days=1), max_workers=8):
+        self.expire_after = expire_after
+        self.max_workers = max_workers
+        self.session = None
+        self.init_lock = threading.Lock()
+
+    def lazy_init(self):
+        """
+        Set up the cached session. Only done when the client is actually used (due to global import)
+        """
+        with self.init_lock:
+            if self.session is not None:
+                return
+            pyversion = ".".join(str(v) for v in sys.version_info[0:3])
+            cachedir = setup_nfcore_cachedir(f"cache_{pyversion}")
+            log.debug("Initialising package metadata requests session")
+            session = requests_cache.CachedSession(
+                cache_name=os.path.join(cachedir, "package_metadata"),
+                backend="sqlite",
+                expire_after=self.expire_after,
+                allowable_codes=(200, 404),
+            )
+            adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=self.max_workers)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self.session = session
+
+    def anaconda_package(self, dep, dep_channels=None):
+        """Query conda package information, see :func:`anaconda_package`"""
+        if self.session is None:
+            self.lazy_init()
+        return anaconda_package(dep, dep_channels, session=self.session)
+
+    def get_biocontainer_tag(self, package, version):
+        """Find the Docker and Singularity containers of a bioconda package, see :func:`get_biocontainer_tag`"""
+        if self.session is None:
+            self.lazy_init()
+        return get_biocontainer_tag(package, version, session=self.session)
+
+    def prefetch(self, deps, dep_channels=None):
+        """
+        Fetch the metadata of many conda packages concurrently, so that later
+        lookups of these packages are answered from the cache.
+
+        Errors are only logged here, they are raised again by the lookup of the package itself.
+
+        Args:
+            deps (list): Conda package names, as passed to :func:`anaconda_package`
+            dep_channels (list): list of conda channels to use
+        """
+        deps = sorted(set(deps))
+        if not deps:
+            return
+        if self.session is None:
+            self.lazy_init()
+        log.debug(f"Prefetching metadata for {len(deps)} conda package{plural_s(deps)}")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.anaconda_package, dep, dep_channels): dep for dep in deps}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    future.result()
+                except (LookupError, ValueError) as e:
+                    log.debug(f"Could not prefetch metadata for '{futures[future]}': {e}")
+
+
+# Single client object for the package metadata APIs, so that the cache and connections are shared
+package_metadata = PackageMetadataClient()
+
+
 def custom_yaml_dumper():
     """Overwrite default PyYAML output to make Prettier YAML linting happy"""
 
@@ -1,5 +1,8 @@
+import tempfile
 from pathlib import Path
+from unittest import mock
 
+import nf_core.create
 import nf_core.lint
 
 
@@ -24,3 +27,20 @@ def test_files_unchanged_fail(self):
     assert len(results["failed"]) > 0
     assert str(failing_file) in results["failed"][0]
     assert results["could_fix"]
+
+
+def test_files_unchanged_cached_template(self):
+    """The reference template is only rendered once for the same pipeline metadata"""
+    self.lint_obj.nf_config = {
+        "manifest.name": "'nf-core/testpipeline'",
+        "manifest.description": "'This is a test pipeline'",
+        "manifest.author": "'Test McTestFace'",
+    }
+    with mock.patch("nf_core.utils.NFCORE_CACHE_DIR", tempfile.mkdtemp(dir=self.tmp_dir)), mock.patch(
+        "nf_core.create.PipelineCreate", wraps=nf_core.create.PipelineCreate
+    ) as mock_create:
+        for _ in range(2):
+            results = self.lint_obj.files_unchanged()
+            assert len(results["failed"]) == 0
+            assert len(results["passed"]) > 0
+        assert mock_create.call_count == 1
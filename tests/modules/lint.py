@@ -37,6 +37,23 @@ def test_modules_lint_trimgalore(self):
     assert len(module_lint.warned) >= 0
 
 
+def test_modules_lint_jobs(self):
+    """Test that linting modules in parallel gives the same results as linting them one by one"""
+    self.mods_install.install("trimgalore")
+    module_lint = nf_core.modules.ModuleLint(dir=self.pipeline_dir)
+    module_lint.lint(print_results=False, all_modules=True)
+    module_lint_parallel = nf_core.modules.ModuleLint(dir=self.pipeline_dir, jobs=4)
+    module_lint_parallel.lint(print_results=False, all_modules=True)
+    for results, results_parallel in (
+        (module_lint.passed, module_lint_parallel.passed),
+        (module_lint.warned, module_lint_parallel.warned),
+        (module_lint.failed, module_lint_parallel.failed),
+    ):
+        assert [(r.component_name, r.lint_test, r.message) for r in results] == [
+            (r.component_name, r.lint_test, r.message) for r in results_parallel
+        ]
+
+
 def test_modules_lint_empty(self):
     """Test linting a pipeline with no modules installed"""
     self.mods_remove.remove("fastqc", force=True)
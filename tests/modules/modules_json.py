@@ -2,6 +2,7 @@ import copy
 import json
 import shutil
 from pathlib import Path
+from unittest import mock
 
 from nf_core.modules.modules_json import ModulesJson
 from nf_core.modules.modules_repo import (
@@ -130,6 +131,26 @@ def test_mod_json_up_to_date(self):
     assert mod_json_before == mod_json_after
 
 
+def test_mod_json_up_to_date_fast_path(self):
+    """
+    Checks that the modules.json file is only checked again
+    when the pipeline changed since the last check
+    """
+    ModulesJson(self.pipeline_dir).check_up_to_date()
+
+    mod_json_obj = ModulesJson(self.pipeline_dir)
+    with mock.patch.object(mod_json_obj, "unsynced_components", wraps=mod_json_obj.unsynced_components) as mock_check:
+        mod_json_obj.check_up_to_date()
+        mock_check.assert_not_called()
+        assert mod_json_obj.modules_json is not None
+
+        # Removing a module changes the fingerprint
+        shutil.rmtree(Path(self.pipeline_dir, "modules", NF_CORE_MODULES_NAME, "fastqc"))
+        mod_json_obj.check_up_to_date()
+        mock_check.assert_called_once()
+    assert Path(self.pipeline_dir, "modules", NF_CORE_MODULES_NAME, "fastqc", "main.nf").exists()
+
+
 def test_mod_json_up_to_date_module_removed(self):
     """
     Reinstall a module that has an entry in the modules.json
@@ -107,6 +107,49 @@ def test_update_all(self):
         assert correct_git_sha == current_git_sha
 
 
+def test_update_all_in_parallel(self):
+    """Updates all modules present in the pipeline, preparing the updates in parallel"""
+    assert self.mods_install_old.install("trimgalore")
+    # The backup of an update that was killed is removed
+    Path(self.pipeline_dir, ".nf-core-update-stale", "0").mkdir(parents=True)
+    update_obj = ModuleUpdate(
+        self.pipeline_dir, update_all=True, show_diff=False, remote_url=GITLAB_URL, branch=OLD_TRIMGALORE_BRANCH, jobs=4
+    )
+    assert update_obj.update() is True
+
+    mod_json = ModulesJson(self.pipeline_dir).get_modules_json()
+    correct_git_sha = update_obj.modules_repo.get_latest_component_version("trimgalore", "modules")
+    current_git_sha = mod_json["repos"][GITLAB_URL]["modules"][GITLAB_REPO]["trimgalore"]["git_sha"]
+    assert correct_git_sha == current_git_sha
+    assert not list(Path(self.pipeline_dir).glob(".nf-core-update-*"))
+
+
+def test_update_all_is_restored_when_interrupted(self):
+    """Checks that an interrupted update leaves the modules and modules.json untouched"""
+    assert self.mods_install_old.install("trimgalore")
+    update_obj = ModuleUpdate(
+        self.pipeline_dir, update_all=True, show_diff=False, remote_url=GITLAB_URL, branch=OLD_TRIMGALORE_BRANCH
+    )
+
+    tmpdir = tempfile.mkdtemp()
+    trimgalore_tmpdir = os.path.join(tmpdir, "trimgalore")
+    trimgalore_path = os.path.join(self.pipeline_dir, "modules", GITLAB_REPO, "trimgalore")
+    shutil.copytree(trimgalore_path, trimgalore_tmpdir)
+    mod_json_before = ModulesJson(self.pipeline_dir).get_modules_json()
+
+    with mock.patch.object(ModulesJson, "dump", side_effect=KeyboardInterrupt):
+        try:
+            update_obj.update()
+        except KeyboardInterrupt:
+            pass
+        else:
+            raise AssertionError("The update should have been interrupted")
+
+    assert cmp_module(trimgalore_tmpdir, trimgalore_path) is True
+    assert ModulesJson(self.pipeline_dir).get_modules_json() == mod_json_before
+    assert not list(Path(self.pipeline_dir).glob(".nf-core-update-*"))
+
+
 def test_update_with_config_fixed_version(self):
     """Try updating when there are entries in the .nf-core.yml"""
     # Install trimgalore at the latest version
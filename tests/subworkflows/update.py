@@ -2,6 +2,7 @@ import filecmp
 import shutil
 import tempfile
 from pathlib import Path
+from unittest import mock
 
 import yaml
 
@@ -232,7 +233,22 @@ def test_update_all_linked_components_from_subworkflow(self):
 
     # Update fastq_align_bowtie2 and all modules and subworkflows used by that
     update_obj = SubworkflowUpdate(self.pipeline_dir, update_deps=True, show_diff=False)
-    assert update_obj.update("fastq_align_bowtie2") is True
+    with mock.patch.object(
+        SubworkflowUpdate,
+        "commit_component_updates",
+        autospec=True,
+        side_effect=SubworkflowUpdate.commit_component_updates,
+    ) as mock_commit:
+        assert update_obj.update("fastq_align_bowtie2") is True
+
+    # The linked components are updated in the same transaction
+    mock_commit.assert_called_once()
+    committed = {
+        (planned_update["component_type"], planned_update["component"])
+        for planned_update, _, _ in mock_commit.call_args.args[1]
+    }
+    assert ("subworkflows", "bam_sort_stats_samtools") in committed
+    assert ("modules", "bowtie2/align") in committed
 
     mod_json = ModulesJson(self.pipeline_dir).get_modules_json()
     # Loop through all modules and subworkflows used in fastq_align_bowtie2
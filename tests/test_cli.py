@@ -174,6 +174,8 @@ class TestCli(unittest.TestCase):
             "container-cache-utilisation": "copy",
             "container-cache-index": "/path/index.txt",
             "parallel-downloads": 2,
+            "container-cache-placement": "hardlink",
+            "hardlink-revisions": None,
         }
 
         cmd = ["download"] + self.assemble_params(params) + ["pipeline_name"]
@@ -195,6 +197,8 @@ class TestCli(unittest.TestCase):
             params["container-cache-utilisation"],
             params["container-cache-index"],
             params["parallel-downloads"],
+            container_cache_placement=params["container-cache-placement"],
+            hardlink_revisions="hardlink-revisions" in params,
         )
 
         mock_dl.return_value.download_workflow.assert_called_once()
@@ -282,6 +286,7 @@ class TestCli(unittest.TestCase):
             "fail-warned": None,
             "markdown": "output_file.md",
             "json": "output_file.json",
+            "jobs": 4,
         }
 
         cmd = ["lint"] + self.assemble_params(params)
@@ -300,6 +305,7 @@ class TestCli(unittest.TestCase):
             params["markdown"],
             params["json"],
             "hide-progress" in params,
+            params["jobs"],
         )
 
     def test_lint_no_dir(self):
@@ -361,6 +367,37 @@ class TestCli(unittest.TestCase):
         assert error_txt in captured_logs.output[-1]
         assert captured_logs.records[-1].levelname == "ERROR"
 
+    @mock.patch("nf_core.utils.is_pipeline_directory")
+    @mock.patch("nf_core.lint.run_linting_batch")
+    def test_lint_batch(self, mock_lint_batch, mock_is_pipeline):
+        """Test nf-core lint with several pipeline directories"""
+        mock_lint_batch.return_value = ({}, {})
+        pipeline_dirs = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+
+        cmd = ["lint", "--batch", pipeline_dirs[0], "--batch", pipeline_dirs[1], "-j", "2", "--json", "results.json"]
+        result = self.invoke_cli(cmd)
+
+        assert result.exit_code == 0
+        mock_lint_batch.assert_called_once_with(pipeline_dirs, False, (), False, False, None, "results.json", 2, False)
+
+        # Pipelines that could not be linted make the command fail
+        mock_lint_batch.return_value = ({}, {pipeline_dirs[0]: "Critical error"})
+        result = self.invoke_cli(cmd)
+        assert result.exit_code == 1
+
+    @mock.patch("nf_core.utils.is_pipeline_directory")
+    @mock.patch("nf_core.lint.run_linting_batch")
+    def test_lint_batch_with_dir(self, mock_lint_batch, mock_is_pipeline):
+        """Test nf-core lint with several pipeline directories, including the one given with --dir"""
+        mock_lint_batch.return_value = ({}, {})
+        pipeline_dirs = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+
+        cmd = ["lint", "--dir", pipeline_dirs[0], "--batch", pipeline_dirs[1]]
+        result = self.invoke_cli(cmd)
+
+        assert result.exit_code == 0
+        assert mock_lint_batch.call_args.args[0] == pipeline_dirs
+
     @mock.patch("nf_core.schema.PipelineSchema.get_schema_path")
     def test_schema_lint(self, mock_get_schema_path):
         """Test nf-core schema lint defaults to nextflow_schema.json"""
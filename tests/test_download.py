@@ -1,20 +1,26 @@
 """Tests for the download subcommand of nf-core tools"""
 
+import hashlib
+import json
 import logging
 import os
 import re
 import shutil
+import tarfile
 import tempfile
 import unittest
+import zipfile
 from pathlib import Path
 from typing import List
 from unittest import mock
 
 import pytest
+import responses
 
 import nf_core.create
+import nf_core.download
 import nf_core.utils
-from nf_core.download import ContainerError, DownloadWorkflow, WorkflowRepo
+from nf_core.download import ContainerDirectiveParser, ContainerError, DownloadWorkflow, WorkflowRepo
 from nf_core.synced_repo import SyncedRepo
 from nf_core.utils import run_cmd
 
@@ -196,6 +202,46 @@ class DownloadTest(unittest.TestCase):
             )
             # does not yet pick up nfcore/sarekvep:dev.${params.genome}, because that is no valid URL or Docker URI.
 
+    #
+    # Tests for 'ContainerDirectiveParser'
+    #
+    def test_container_directive_parser(self):
+        module = (
+            "process MOCK {\n"
+            '    // container "commented/out:1.0"\n'
+            "    container \"${ workflow.containerEngine == 'singularity' && !task.ext.singularity_pull_docker_container ?\n"
+            '        "https://depot.galaxyproject.org/singularity/${container_id}" :\n'
+            '        "quay.io/biocontainers/${container_id}" }"\n'
+            "    container \"${ task.ext.container ?: 'biocontainers/fall\\'back:1.0' }\"\n"
+            "    script:\n"
+            '    def container = "not/this:1.0"\n'
+            '    """\n'
+            "    echo 'container \"in/script:1.0\"' ${task.cpus}\n"
+            '    """\n'
+            "}\n"
+            "process MOCK_DEF {\n"
+            '    def container = "not/this:2.0"\n'
+            "    if (params.old) {\n"
+            '        container "old/dsl2:1.0"\n'
+            "    }\n"
+            "    exec:\n"
+            '    container "not/this:3.0"\n'
+            "}\n"
+            "container_id = 'tool:1.0--0'\n"
+        )
+        directives = ContainerDirectiveParser(module).directives
+
+        assert len(directives) == 3
+        assert directives[0].images == [
+            "https://depot.galaxyproject.org/singularity/tool:1.0--0",
+            "quay.io/biocontainers/tool:1.0--0",
+        ]
+        assert directives[0].variables == ["container_id"]
+        assert directives[1].images == ["biocontainers/fall'back:1.0"]
+        assert directives[1].variables == ["task.ext.container"]
+        assert directives[1].source == "\"${ task.ext.container ?: 'biocontainers/fall\\'back:1.0' }\""
+        assert directives[2].images == ["old/dsl2:1.0"]
+
     #
     # Test for 'find_container_images' in modules
     #
@@ -345,6 +391,227 @@ class DownloadTest(unittest.TestCase):
             "hello-world", f"{tmp_dir}/yet-another-hello-world.sif", None, "docker.io", mock_rich_progress
         )
 
+    #
+    # Tests for 'singularity_download_image'
+    #
+    @with_temporary_folder
+    @mock.patch("nf_core.list.Workflows.get_remote_workflows")
+    @mock.patch("rich.progress.Progress")
+    def test_singularity_download_image_resume(self, tmp_dir, mock_progress, _):
+        download_obj = DownloadWorkflow(pipeline="dummy", outdir=tmp_dir, download_chunk_size=16)
+        download_obj.kill_with_fire = False
+        image = b"singularity image content" * 10
+        url = "https://depot.galaxyproject.org/singularity/hello-world:1.0"
+        out_path = os.path.join(tmp_dir, "hello-world-1.0.img")
+        with open(f"{out_path}.partial", "wb") as fh:
+            fh.write(image[:100])
+
+        def serve_range(request):
+            start = int(request.headers["Range"].split("=")[1].rstrip("-"))
+            return (
+                206,
+                {
+                    "Content-Length": str(len(image) - start),
+                    "Content-Range": f"bytes {start}-{len(image) - 1}/{len(image)}",
+                },
+                image[start:],
+            )
+
+        with responses.RequestsMock() as rsps:
+            rsps.add_callback(responses.GET, url, callback=serve_range)
+            download_obj.singularity_download_image(url, out_path, None, mock_progress)
+            assert rsps.calls[0].request.headers["Range"] == "bytes=100-"
+
+        assert not os.path.exists(f"{out_path}.partial")
+        with open(out_path, "rb") as fh:
+            assert fh.read() == image
+        manifest = download_obj.read_singularity_image_manifest(tmp_dir)
+        assert manifest["hello-world-1.0.img"]["url"] == url
+        assert manifest["hello-world-1.0.img"]["md5"] == hashlib.md5(image).hexdigest()
+
+    @with_temporary_folder
+    @mock.patch("nf_core.list.Workflows.get_remote_workflows")
+    @mock.patch("rich.progress.Progress")
+    def test_singularity_download_image_rebuilt(self, tmp_dir, mock_progress, _):
+        download_obj = DownloadWorkflow(pipeline="dummy", outdir=tmp_dir)
+        download_obj.kill_with_fire = False
+        image = b"rebuilt singularity image content"
+        url = "https://depot.galaxyproject.org/singularity/hello-world:1.0"
+        out_path = os.path.join(tmp_dir, "hello-world-1.0.img")
+        with open(os.path.join(tmp_dir, nf_core.download.SINGULARITY_IMAGE_MANIFEST), "w") as fh:
+            json.dump({"hello-world-1.0.img": {"url": url, "md5": "0" * 32}}, fh)
+
+        # A complete new download of an image rebuilt under the same URL replaces the recorded md5 sum
+        with responses.RequestsMock() as rsps:
+            rsps.get(url, body=image)
+            download_obj.singularity_download_image(url, out_path, None, mock_progress)
+
+        with open(out_path, "rb") as fh:
+            assert fh.read() == image
+        manifest = download_obj.read_singularity_image_manifest(tmp_dir)
+        assert manifest["hello-world-1.0.img"]["md5"] == hashlib.md5(image).hexdigest()
+
+    @with_temporary_folder
+    @mock.patch("nf_core.list.Workflows.get_remote_workflows")
+    @mock.patch("rich.progress.Progress")
+    def test_singularity_download_image_resume_md5_mismatch(self, tmp_dir, mock_progress, _):
+        download_obj = DownloadWorkflow(pipeline="dummy", outdir=tmp_dir)
+        download_obj.kill_with_fire = False
+        image = b"singularity image content" * 10
+        url = "https://depot.galaxyproject.org/singularity/hello-world:1.0"
+        out_path = os.path.join(tmp_dir, "hello-world-1.0.img")
+        with open(os.path.join(tmp_dir, nf_core.download.SINGULARITY_IMAGE_MANIFEST), "w") as fh:
+            json.dump({"hello-world-1.0.img": {"url": url, "md5": hashlib.md5(image).hexdigest()}}, fh)
+        with open(f"{out_path}.partial", "wb") as fh:
+            fh.write(b"corrupt" * 10)
+
+        def serve(request):
+            start = int(request.headers.get("Range", "bytes=0-").split("=")[1].rstrip("-"))
+            headers = {"Content-Length": str(len(image) - start)}
+            if start:
+                headers["Content-Range"] = f"bytes {start}-{len(image) - 1}/{len(image)}"
+                return (206, headers, image[start:])
+            return (200, headers, image)
+
+        # The resumed download does not match the recorded md5 sum, so it is downloaded again from byte 0
+        with responses.RequestsMock() as rsps:
+            rsps.add_callback(responses.GET, url, callback=serve)
+            download_obj.singularity_download_image(url, out_path, None, mock_progress)
+            assert rsps.calls[0].request.headers["Range"] == "bytes=70-"
+            assert "Range" not in rsps.calls[1].request.headers
+
+        assert not os.path.exists(f"{out_path}.partial")
+        with open(out_path, "rb") as fh:
+            assert fh.read() == image
+
+    @with_temporary_folder
+    @mock.patch("nf_core.list.Workflows.get_remote_workflows")
+    @mock.patch("rich.progress.Progress")
+    def test_singularity_download_image_resume_wrong_range(self, tmp_dir, mock_progress, _):
+        download_obj = DownloadWorkflow(pipeline="dummy", outdir=tmp_dir)
+        download_obj.kill_with_fire = False
+        image = b"singularity image content" * 10
+        url = "https://depot.galaxyproject.org/singularity/hello-world:1.0"
+        out_path = os.path.join(tmp_dir, "hello-world-1.0.img")
+        with open(f"{out_path}.partial", "wb") as fh:
+            fh.write(image[:100])
+
+        def serve(request):
+            if "Range" in request.headers:
+                # The server sends another range than the one requested
+                return (206, {"Content-Range": f"bytes 0-{len(image) - 1}/{len(image)}"}, image)
+            return (200, {"Content-Length": str(len(image))}, image)
+
+        with responses.RequestsMock() as rsps:
+            rsps.add_callback(responses.GET, url, callback=serve)
+            download_obj.singularity_download_image(url, out_path, None, mock_progress)
+            assert len(rsps.calls) == 2
+
+        with open(out_path, "rb") as fh:
+            assert fh.read() == image
+
+    #
+    # Tests for 'deduplicate_revision_files'
+    #
+    @with_temporary_folder
+    @mock.patch("nf_core.list.Workflows.get_remote_workflows")
+    def test_deduplicate_revision_files(self, tmp_dir, _):
+        download_obj = DownloadWorkflow(pipeline="dummy", outdir=tmp_dir, hardlink_revisions=True)
+        for revision, main_nf in [("1_0", "old"), ("1_1", "new"), ("1_2", "old")]:
+            Path(tmp_dir, revision, "modules").mkdir(parents=True)
+            Path(tmp_dir, revision, "modules", "fastqc.nf").write_text("fastqc")
+            Path(tmp_dir, revision, "main.nf").write_text(main_nf)
+
+        download_obj.deduplicate_revision_files(["1_0", "1_1", "1_2"])
+
+        def inode(*path):
+            return os.stat(Path(tmp_dir, *path)).st_ino
+
+        assert inode("1_0", "modules", "fastqc.nf") == inode("1_1", "modules", "fastqc.nf")
+        assert inode("1_0", "modules", "fastqc.nf") == inode("1_2", "modules", "fastqc.nf")
+        assert inode("1_0", "main.nf") != inode("1_1", "main.nf")
+        assert inode("1_0", "main.nf") == inode("1_2", "main.nf")
+        assert Path(tmp_dir, "1_1", "main.nf").read_text() == "new"
+        assert sorted(os.listdir(Path(tmp_dir, "1_2"))) == ["main.nf", "modules"]
+
+    #
+    # Tests for 'place_singularity_image'
+    #
+    @with_temporary_folder
+    @mock.patch("nf_core.list.Workflows.get_remote_workflows")
+    def test_place_singularity_image(self, tmp_dir, _):
+        cache_path = Path(tmp_dir, "cache", "image.img")
+        cache_path.parent.mkdir()
+        cache_path.write_bytes(b"singularity image")
+        out_dir = Path(tmp_dir, "singularity-images")
+        out_dir.mkdir()
+
+        for placement in ["copy", "hardlink", "reflink", "symlink"]:
+            download_obj = DownloadWorkflow(pipeline="dummy", outdir=tmp_dir, container_cache_placement=placement)
+            out_path = out_dir / f"image-{placement}.img"
+            download_obj.place_singularity_image(str(cache_path), str(out_path))
+            assert out_path.read_bytes() == b"singularity image"
+            if placement == "hardlink":
+                assert out_path.samefile(cache_path)
+            if placement == "symlink":
+                assert os.readlink(out_path) == os.path.join("..", "cache", "image.img")
+
+        # Hard links fall back to copies across devices
+        download_obj = DownloadWorkflow(pipeline="dummy", outdir=tmp_dir, container_cache_placement="hardlink")
+        with mock.patch("os.link", side_effect=OSError(18, "Invalid cross-device link")):
+            download_obj.place_singularity_image(str(cache_path), str(out_dir / "image-hardlink.img"))
+        assert not (out_dir / "image-hardlink.img").samefile(cache_path)
+        assert (out_dir / "image-hardlink.img").read_bytes() == b"singularity image"
+
+        # Symlinks would dangle in an archive, so images are copied if the download is compressed
+        download_obj = DownloadWorkflow(
+            pipeline="dummy", outdir=tmp_dir, compress_type="tar.gz", container_cache_placement="symlink"
+        )
+        download_obj.place_singularity_image(str(cache_path), str(out_dir / "image-compressed.img"))
+        assert not (out_dir / "image-compressed.img").is_symlink()
+        assert (out_dir / "image-compressed.img").read_bytes() == b"singularity image"
+
+    #
+    # Tests for 'compress_download'
+    #
+    @with_temporary_folder
+    @mock.patch("nf_core.list.Workflows.get_remote_workflows")
+    def test_compress_download(self, tmp_dir, _):
+        self._caplog.set_level(logging.INFO)
+        for compress_type in ["tar.gz", "tar.bz2", "tar.zst", "zip"]:
+            if compress_type == "tar.zst" and shutil.which("zstd") is None:
+                continue
+            outdir = Path(tmp_dir, f"nf-core-dummy-{compress_type.replace('.', '_')}")
+            Path(outdir, "singularity-images").mkdir(parents=True)
+            Path(outdir, "main.nf").write_text("workflow {}\n" * 100)
+            Path(outdir, "singularity-images", "image.img").write_bytes(os.urandom(1024))
+            download_obj = DownloadWorkflow(pipeline="dummy", outdir=str(outdir), compress_type=compress_type)
+            download_obj.output_filename = f"{outdir}.{compress_type}"
+
+            download_obj.compress_download()
+
+            assert not outdir.exists()
+            md5 = nf_core.utils.file_md5(download_obj.output_filename)
+            assert f"MD5 checksum for '{download_obj.output_filename}': [blue]{md5}[/]" in self
+            if compress_type == "zip":
+                with zipfile.ZipFile(download_obj.output_filename) as zip_file:
+                    assert zip_file.testzip() is None
+                    image_info = [info for info in zip_file.infolist() if info.filename.endswith("image.img")][0]
+                    assert image_info.compress_type == zipfile.ZIP_STORED
+            elif compress_type == "tar.zst":
+                assert run_cmd("zstd", f"-t {download_obj.output_filename}") is not None
+            else:
+                with tarfile.open(download_obj.output_filename) as tar:
+                    assert f"{outdir.name}/main.nf" in tar.getnames()
+
+    @with_temporary_folder
+    @mock.patch("nf_core.list.Workflows.get_remote_workflows")
+    @mock.patch("nf_core.download.DownloadWorkflow.find_parallel_compressor", return_value=None)
+    def test_prompt_compression_type_zstd_missing(self, tmp_dir, _, __):
+        download_obj = DownloadWorkflow(pipeline="dummy", outdir=tmp_dir, compress_type="tar.zst")
+        with pytest.raises(AssertionError, match="'zstd' is needed"):
+            download_obj.prompt_compression_type()
+
     #
     # Tests for 'get_singularity_images'
     #
@@ -371,6 +638,108 @@ class DownloadTest(unittest.TestCase):
         # Test that they are all caught inside get_singularity_images().
         download_obj.get_singularity_images()
 
+    @with_temporary_folder
+    @mock.patch("nf_core.list.Workflows.get_remote_workflows")
+    @mock.patch("shutil.which")
+    @mock.patch("nf_core.download.DownloadWorkflow.check_container_availability", return_value="unknown")
+    @mock.patch("nf_core.download.DownloadWorkflow.singularity_pull_image")
+    def test_get_singularity_images_parallel_pulls(self, tmp_path, mock_pull_image, mock_check, mock_which, _):
+        download_obj = DownloadWorkflow(
+            pipeline="dummy",
+            outdir=tmp_path,
+            container_library=("mirage-the-imaginative-registry.io", "quay.io"),
+            parallel_downloads=4,
+        )
+        download_obj.containers = [f"nf-core/image{i}:1.0" for i in range(8)]
+
+        def pull_image(container, out_path, cache_path, library, progress):
+            if library == "mirage-the-imaginative-registry.io":
+                ContainerError(
+                    container=container,
+                    registry=library,
+                    address=f"docker://{library}/{container}",
+                    absolute_URI=False,
+                    out_path=out_path,
+                    singularity_command=["singularity", "pull"],
+                    error_msg=[f"dial tcp: lookup {library}: no such host"],
+                )
+            Path(out_path).touch()
+
+        mock_pull_image.side_effect = pull_image
+        download_obj.get_singularity_images()
+
+        # The unreachable registry is dropped once, and all images are pulled from the other one
+        assert download_obj.container_library == ["quay.io"]
+        assert len(list(Path(tmp_path, "singularity-images").glob("*.img"))) == 8
+        pulled_libraries = [call.args[3] for call in mock_pull_image.call_args_list]
+        assert pulled_libraries.count("quay.io") == 8
+
+    @with_temporary_folder
+    @mock.patch("nf_core.list.Workflows.get_remote_workflows")
+    @mock.patch("shutil.which")
+    @mock.patch("nf_core.download.DownloadWorkflow.singularity_pull_image")
+    def test_get_singularity_images_preflight(self, tmp_path, mock_pull_image, mock_which, _):
+        download_obj = DownloadWorkflow(
+            pipeline="dummy",
+            outdir=tmp_path,
+            container_library=("localhost:5000", "mirror.test"),
+        )
+        download_obj.containers = [f"biocontainers/{image}:1.0" for image in ["both", "mirror", "nowhere", "private"]]
+        mock_pull_image.side_effect = lambda container, out_path, *args: Path(out_path).touch()
+
+        # Stand-in for a local registry and a mirror that requires anonymous tokens
+        with responses.RequestsMock() as rsps:
+            for image, status in [("both", 200), ("mirror", 404), ("nowhere", 404), ("private", 404)]:
+                rsps.head(f"http://localhost:5000/v2/biocontainers/{image}/manifests/1.0", status=status)
+            challenge = {"WWW-Authenticate": 'Bearer realm="https://auth.mirror.test/token",service="mirror.test"'}
+            rsps.get("https://auth.mirror.test/token", json={"token": "anonymous"})
+            for image, status in [("both", 200), ("mirror", 200), ("nowhere", 404), ("private", 403)]:
+                url = f"https://mirror.test/v2/biocontainers/{image}/manifests/1.0"
+                rsps.head(
+                    url, status=status, match=[responses.matchers.header_matcher({"Authorization": "Bearer anonymous"})]
+                )
+                rsps.head(url, status=401, headers=challenge)
+            rsps.assert_all_requests_are_fired = False
+            download_obj.get_singularity_images()
+
+        # Images are pulled from the first registry that has them, or from those that could not be checked
+        pulled_libraries = {call.args[0]: call.args[3] for call in mock_pull_image.call_args_list}
+        assert pulled_libraries == {
+            "biocontainers/both:1.0": "localhost:5000",
+            "biocontainers/mirror:1.0": "mirror.test",
+            "biocontainers/private:1.0": "mirror.test",
+        }
+
+    @with_temporary_folder
+    @mock.patch("nf_core.list.Workflows.get_remote_workflows")
+    @mock.patch("shutil.which")
+    @mock.patch("nf_core.download.DownloadWorkflow.singularity_pull_image")
+    @mock.patch("nf_core.utils.fetch_wf_config")
+    def test_get_singularity_images_incremental(self, tmp_path, mock_fetch_wf_config, mock_pull_image, mock_which, _):
+        download_obj = DownloadWorkflow(pipeline="dummy", outdir=tmp_path, container_library=("quay.io",))
+        mock_fetch_wf_config.return_value = {}
+        mock_pull_image.side_effect = lambda container, out_path, *args: Path(out_path).touch()
+
+        # Two revisions sharing one module file
+        for revision, containers in [("1_0", ["multiqc:1.0"]), ("1_1", ["multiqc:1.0", "fastqc:1.0"])]:
+            modules_dir = Path(tmp_path, revision, "modules")
+            modules_dir.mkdir(parents=True)
+            for container in containers:
+                (modules_dir / f"{container.split(':')[0]}.nf").write_text(f'container "biocontainers/{container}"\n')
+
+        with mock.patch.object(
+            download_obj, "find_module_container_images", wraps=download_obj.find_module_container_images
+        ) as mock_find_module:
+            download_obj.find_container_images(str(Path(tmp_path, "1_0")))
+            download_obj.get_singularity_images(current_revision="1.0")
+            download_obj.find_container_images(str(Path(tmp_path, "1_1")))
+            download_obj.get_singularity_images(current_revision="1.1")
+
+        # The shared module is only parsed once, and only the new image is processed for the second revision
+        assert mock_find_module.call_count == 2
+        pulled_containers = [call.args[0] for call in mock_pull_image.call_args_list]
+        assert len(pulled_containers) == len(set(pulled_containers)) == len(download_obj.containers)
+
     @with_temporary_folder
     @mock.patch("os.makedirs")
     @mock.patch("os.symlink")
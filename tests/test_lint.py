@@ -1,16 +1,21 @@
 """Some tests covering the linting code."""
 
+import contextlib
 import fnmatch
 import json
 import os
 import shutil
 import tempfile
+import threading
 import unittest
+from unittest import mock
 
 import yaml
 
 import nf_core.create
 import nf_core.lint
+import nf_core.modules.modules_repo
+from nf_core.synced_repo import SyncedRepo
 
 from .utils import with_temporary_folder
 
@@ -100,6 +105,95 @@ class TestLint(unittest.TestCase):
         assert len(lint_obj.failed) == 0
         assert len(lint_obj.ignored) == len(lint_obj.lint_tests)
 
+    def test_lint_pipeline_in_parallel(self):
+        """Run the lint tests in parallel and check that the results are reported in the order of the tests"""
+        lint_obj = nf_core.lint.PipelineLint(self.test_pipeline_dir, jobs=4)
+        schedule = lint_obj._get_lint_test_schedule()
+        # The first and the last test that wait for no other test have to run at the same time
+        independent_tests = [
+            test_name
+            for test_name in lint_obj.lint_tests
+            if not any(dependency in lint_obj.lint_tests for dependency in schedule[test_name])
+        ]
+        first_test, last_test = independent_tests[0], independent_tests[-1]
+        both_running = threading.Barrier(2, timeout=30)
+        last_test_done = threading.Event()
+        running_schema_tests = []
+
+        def lint_test(test_name):
+            def run():
+                if "schema_obj" in lint_obj.lint_test_inputs[test_name]:
+                    assert not running_schema_tests
+                    running_schema_tests.append(test_name)
+                if test_name in (first_test, last_test):
+                    both_running.wait()
+                # The first test finishes after the last one
+                if test_name == first_test:
+                    assert last_test_done.wait(timeout=30)
+                if test_name in running_schema_tests:
+                    running_schema_tests.remove(test_name)
+                if test_name == last_test:
+                    last_test_done.set()
+                return {"passed": [test_name]}
+
+            return run
+
+        with contextlib.ExitStack() as stack:
+            for test_name in lint_obj.lint_tests:
+                stack.enter_context(mock.patch.object(lint_obj, test_name, side_effect=lint_test(test_name)))
+            mock_scan_files = stack.enter_context(mock.patch.object(lint_obj, "_scan_files"))
+            lint_obj._lint_pipeline()
+        assert lint_obj.passed == [(test_name, test_name) for test_name in lint_obj.lint_tests]
+        mock_scan_files.assert_called_once()
+        assert last_test_done.is_set()
+
+    def test_lint_batch_session_settings(self):
+        """Check that each pipeline of a batch sets up the modules repository with the settings of its own config"""
+        new_pipeline = self._make_pipeline_copy()
+        with open(os.path.join(new_pipeline, ".nf-core.yml"), "a") as fh:
+            yaml.dump({"fetch_ttl": 3600, "partial_clone": True}, fh)
+        session_settings = []
+
+        def setup_modules_repo(modules_repo, *args, **kwargs):
+            session_settings.append(
+                (
+                    threading.current_thread() is threading.main_thread(),
+                    SyncedRepo.fetch_ttl,
+                    SyncedRepo.partial_clone,
+                    sorted(SyncedRepo.sparse_paths),
+                )
+            )
+            raise LookupError("Could not set up the modules repository")
+
+        with mock.patch.object(nf_core.lint.PipelineLint, "_load_pipeline_config"), mock.patch.object(
+            nf_core.modules.modules_repo.ModulesRepo, "__init__", setup_modules_repo
+        ):
+            lint_results, lint_errors = nf_core.lint.run_linting_batch(
+                [self.test_pipeline_dir, new_pipeline], jobs=2, hide_progress=True
+            )
+        assert lint_results == {}
+        assert list(lint_errors) == [self.test_pipeline_dir, new_pipeline]
+        assert session_settings == [
+            (True, 0, False, []),
+            (True, 3600, True, [nf_core.modules.modules_repo.NF_CORE_MODULES_REMOTE]),
+        ]
+        # The pipelines are linted with the default settings
+        assert (SyncedRepo.fetch_ttl, SyncedRepo.partial_clone, SyncedRepo.sparse_paths) == (0, False, {})
+
+    def test_lint_test_schedule(self):
+        """Check that the tests wait for their inputs and that fixing tests run on their own"""
+        lint_obj = nf_core.lint.PipelineLint(self.test_pipeline_dir, fix=("files_unchanged",), jobs=4)
+        schedule = lint_obj._get_lint_test_schedule()
+        assert schedule["files_exist"] == []
+        assert schedule["files_unchanged"] == ["files_exist", "nextflow_config"]
+        assert schedule["actions_ci"] == ["files_unchanged"]
+        # The files are only read for the text-scanning tests once they have been fixed
+        assert list(schedule).index("_scan_files") == list(schedule).index("pipeline_todos") - 1
+        assert schedule["_scan_files"] == ["files_unchanged"]
+        assert schedule["merge_markers"] == ["files_unchanged", "_scan_files"]
+        assert schedule["schema_params"] == ["files_unchanged", "schema_lint"]
+        assert schedule["schema_description"] == ["files_unchanged", "schema_params"]
+
     @with_temporary_folder
     def test_json_output(self, tmp_dir):
         """
@@ -214,6 +308,7 @@ class TestLint(unittest.TestCase):
         test_files_exist_pass_conditional,
     )
     from .lint.files_unchanged import (  # type: ignore[misc]
+        test_files_unchanged_cached_template,
         test_files_unchanged_fail,
         test_files_unchanged_pass,
     )
@@ -1,4 +1,6 @@
+import os
 import shutil
+from unittest import mock
 
 import git
 import pytest
@@ -63,3 +65,48 @@ def test_run_prettier_on_syntax_error_file(syntax_error_json, caplog):
     nf_core.lint_utils.run_prettier_on_file(syntax_error_json)
     expected_critical_log = "SyntaxError: Unexpected token (1:10)"
     assert expected_critical_log in caplog.text
+
+
+def test_scan_files(tmp_path, monkeypatch):
+    (tmp_path / ".gitignore").write_text("results/\n")
+    (tmp_path / "results").mkdir()
+    (tmp_path / "results" / "todo.txt").write_text("TODO nf-core: ignored\n")
+    (tmp_path / "main.nf").write_text("// TODO nf-core: fix\r\nprintln 'hello'\n<<<<<<< HEAD\n")
+    (tmp_path / "README.md").write_text("# No matches here\n")
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG TODO nf-core")
+    # Scan large files through mmap too
+    monkeypatch.setattr(nf_core.lint_utils, "SCAN_MMAP_SIZE", 10)
+    (tmp_path / "big.txt").write_text("line\n" * 10 + "my {{ template_string }}\n")
+
+    file_paths = nf_core.lint_utils.list_unignored_files(tmp_path)
+    assert sorted(os.path.relpath(fn, tmp_path) for fn in file_paths) == [
+        ".gitignore",
+        "README.md",
+        "big.txt",
+        "logo.png",
+        "main.nf",
+    ]
+    file_lines = nf_core.lint_utils.scan_files(file_paths)
+    assert file_lines[tmp_path / "main.nf"] == ["// TODO nf-core: fix\n", "println 'hello'\n", "<<<<<<< HEAD\n"]
+    assert file_lines[tmp_path / "README.md"] == []
+    # Binary files are decoded as latin1 too, the lint tests skip them as needed
+    assert file_lines[tmp_path / "logo.png"] == ["\x89PNG TODO nf-core"]
+    assert file_lines[tmp_path / "big.txt"][-1] == "my {{ template_string }}\n"
+
+
+def test_print_batch_summary_lists_failed_tests():
+    lint_obj = mock.Mock(passed=[("readme", "ok")], ignored=[], fixed=[], warned=[], failed=[("readme", "No badge")])
+    module_lint_obj = mock.Mock(
+        passed=[], warned=[], failed=[mock.Mock(lint_test="main_nf", component_name="fastqc", message="Bad")]
+    )
+    clean_lint_obj = mock.Mock(passed=[("readme", "ok")], ignored=[], fixed=[], warned=[], failed=[])
+    clean_module_lint_obj = mock.Mock(passed=[], warned=[], failed=[])
+    with nf_core.lint_utils.console.capture() as capture:
+        nf_core.lint_utils.print_batch_summary(
+            {"pipe_a": (lint_obj, module_lint_obj, None), "pipe_b": (clean_lint_obj, clean_module_lint_obj, None)},
+            {},
+        )
+    output = capture.get()
+    assert "Failed tests of pipe_a" in output
+    assert "No badge" in output and "fastqc" in output and "Bad" in output
+    assert "Failed tests of pipe_b" not in output
@@ -207,6 +207,7 @@ class TestModules(unittest.TestCase):
         test_modules_lint_check_url,
         test_modules_lint_empty,
         test_modules_lint_gitlab_modules,
+        test_modules_lint_jobs,
         test_modules_lint_multiple_remotes,
         test_modules_lint_new_modules,
         test_modules_lint_no_gitlab,
@@ -248,6 +249,7 @@ class TestModules(unittest.TestCase):
         test_mod_json_module_present,
         test_mod_json_repo_present,
         test_mod_json_up_to_date,
+        test_mod_json_up_to_date_fast_path,
         test_mod_json_up_to_date_module_removed,
         test_mod_json_up_to_date_reinstall_fails,
         test_mod_json_update,
@@ -273,6 +275,8 @@ class TestModules(unittest.TestCase):
         test_install_at_hash_and_update,
         test_install_at_hash_and_update_and_save_diff_to_file,
         test_update_all,
+        test_update_all_in_parallel,
+        test_update_all_is_restored_when_interrupted,
         test_update_different_branch_mix_modules_branch_test,
         test_update_different_branch_mixed_modules_main,
         test_update_different_branch_single_module,
@@ -0,0 +1,105 @@
+"""Tests covering the diff engine of ModulesDiffer"""
+
+import difflib
+import random
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from nf_core.component_snapshot import ComponentSnapshot
+from nf_core.modules.modules_differ import PATIENCE_DIFF_MIN_LINES, ModulesDiffer
+
+OLD_LINES = [f"line {i}\n" for i in range(40)]
+
+
+class TestModulesDiffer(unittest.TestCase):
+    """Class for ModulesDiffer tests"""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_unified_diff_matches_difflib(self):
+        """Test that the diff is byte for byte the one of difflib for edits of unique lines"""
+        new_lines = list(OLD_LINES)
+        new_lines[5] = "changed 5\n"
+        del new_lines[20]
+        new_lines.insert(30, "inserted\n")
+        new_lines[-1] = "line 39"
+        for old, new in ((OLD_LINES, new_lines), ([], new_lines), (OLD_LINES, []), (OLD_LINES, OLD_LINES)):
+            assert list(ModulesDiffer.unified_diff(old, new, "a/main.nf", "b/main.nf")) == list(
+                difflib.unified_diff(old, new, "a/main.nf", "b/main.nf")
+            )
+
+    def test_unified_diff_matches_difflib_repeated_lines(self):
+        """Test that the diff is byte for byte the one of difflib for random edits of files with repeated lines"""
+        rng = random.Random(0)
+        for _ in range(500):
+            old_lines = [f"{rng.choice('abcde')}\n" for _ in range(rng.randrange(30))]
+            new_lines = list(old_lines)
+            for _ in range(rng.randrange(1, 6)):
+                position = rng.randrange(len(new_lines) + 1)
+                if new_lines and rng.random() < 0.5:
+                    del new_lines[min(position, len(new_lines) - 1)]
+                else:
+                    new_lines.insert(position, f"{rng.choice('abcdef')}\n")
+            assert list(ModulesDiffer.unified_diff(old_lines, new_lines, "main.nf", "main.nf")) == list(
+                difflib.unified_diff(old_lines, new_lines, "main.nf", "main.nf")
+            )
+
+    def test_patience_diff_repeated_lines(self):
+        """Test that the patience diff of large files with repeated lines turns the old lines into the new lines"""
+        old_lines = ["{\n", "}\n"] * 500 + [f"line {i}\n" for i in range(100)] + ["a\n", "b\n"] * 500
+        new_lines = ["}\n", "{\n"] * 400 + [f"line {i}\n" for i in range(0, 100, 2)] + ["b\n"] * 300 + ["{\n"] * 100
+        assert len(old_lines) + len(new_lines) >= PATIENCE_DIFF_MIN_LINES
+        patched_lines = ModulesDiffer.try_apply_single_patch(
+            old_lines, list(ModulesDiffer.unified_diff(old_lines, new_lines, "main.nf", "main.nf"))
+        )
+        assert patched_lines == new_lines
+
+    def test_get_module_diffs_identical_files(self):
+        """Test that identical files are recognised without reading their lines"""
+        for module_dir in ("old", "new"):
+            Path(self.tmp_dir, module_dir).mkdir()
+            Path(self.tmp_dir, module_dir, "main.nf").write_text("".join(OLD_LINES))
+        with mock.patch.object(ComponentSnapshot, "read_lines") as mock_read_lines:
+            diffs = ModulesDiffer.get_module_diffs(
+                Path(self.tmp_dir, "old"), Path(self.tmp_dir, "new"), dsp_from_dir="fastqc", dsp_to_dir="fastqc"
+            )
+        assert diffs == {Path("main.nf"): (ModulesDiffer.DiffEnum.UNCHANGED, ())}
+        mock_read_lines.assert_not_called()
+
+    def test_write_diff_file_from_contents(self):
+        """Test that the diff against a patched snapshot in memory is the diff against the files on disk"""
+        module_dir = Path(self.tmp_dir, "fastqc")
+        module_dir.mkdir()
+        Path(module_dir, "main.nf").write_text("".join(OLD_LINES))
+        new_lines = OLD_LINES[:10] + ["changed 10\n"] + OLD_LINES[11:]
+        ModulesDiffer.write_diff_file(
+            Path(self.tmp_dir, "memory.diff"),
+            "fastqc",
+            "nf-core",
+            module_dir,
+            ComponentSnapshot.from_dir(module_dir).with_lines({"main.nf": new_lines, "tests/main.nf.test": ["test\n"]}),
+            file_action="w",
+            dsp_to_dir=module_dir,
+        )
+
+        patched_dir = Path(self.tmp_dir, "patched")
+        Path(patched_dir, "tests").mkdir(parents=True)
+        Path(patched_dir, "main.nf").write_text("".join(new_lines))
+        Path(patched_dir, "tests", "main.nf.test").write_text("test\n")
+        ModulesDiffer.write_diff_file(
+            Path(self.tmp_dir, "disk.diff"),
+            "fastqc",
+            "nf-core",
+            module_dir,
+            patched_dir,
+            file_action="w",
+            dsp_to_dir=module_dir,
+        )
+        assert Path(self.tmp_dir, "memory.diff").read_text() == Path(self.tmp_dir, "disk.diff").read_text()
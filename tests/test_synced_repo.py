@@ -0,0 +1,458 @@
+"""Tests covering the git object access of SyncedRepo"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import git
+import pytest
+
+import nf_core.modules.modules_repo
+import nf_core.synced_repo
+from nf_core.component_snapshot import ComponentSnapshot
+from nf_core.synced_repo import SyncedRepo, git_blob_sha
+
+from .utils import create_local_modules_remote
+
+# Exits with 1 if another process holds the lock file given as argument
+TRY_LOCK = (
+    "import fcntl, sys\n"
+    "fh = open(sys.argv[1], 'a')\n"
+    "try:\n"
+    "    fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)\n"
+    "except BlockingIOError:\n"
+    "    sys.exit(1)\n"
+)
+
+
+class TestSyncedRepo(unittest.TestCase):
+    """Class for SyncedRepo tests"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.remote_url, self.commits = create_local_modules_remote(self.tmp_dir)
+        self.cache_dir_patcher = mock.patch("nf_core.utils.NFCORE_CACHE_DIR", os.path.join(self.tmp_dir, "cache"))
+        self.cache_dir_patcher.start()
+        with mock.patch("nf_core.modules.modules_repo.NFCORE_DIR", os.path.join(self.tmp_dir, "nfcore")), mock.patch(
+            "nf_core.modules.modules_utils.repo_full_name_from_remote", return_value="nf-core-test/modules"
+        ):
+            self.modules_repo = nf_core.modules.modules_repo.ModulesRepo(remote_url=self.remote_url, hide_progress=True)
+        self.pipeline_module_dir = Path(self.tmp_dir, "pipeline", "fastqc")
+        shutil.copytree(
+            Path(self.tmp_dir, "remote", "modules", "modules", "nf-core", "fastqc"), self.pipeline_module_dir
+        )
+
+    def tearDown(self):
+        self.cache_dir_patcher.stop()
+        nf_core.modules.modules_repo.ModulesRepo.local_repo_statuses = {}
+        if os.path.exists(self.tmp_dir):
+            shutil.rmtree(self.tmp_dir)
+
+    def test_git_blob_sha(self):
+        """Test that the blob SHA matches the one git computes"""
+        blob = self.modules_repo.get_object("modules/nf-core/fastqc/main.nf")
+        assert blob.hexsha == git_blob_sha(Path(self.pipeline_module_dir, "main.nf"))
+
+    def test_get_component_file_at_commit(self):
+        """Test reading files at older commits does not touch the working tree"""
+        head_before = self.modules_repo.repo.head.commit.hexsha
+        contents = self.modules_repo.get_component_file("fastqc", "modules", "environment.yml", self.commits[0])
+        assert contents == "// fastqc 0.11.9 environment.yml\n"
+        assert self.modules_repo.get_component_file("fastqc", "modules", "main.nf") == "// fastqc 0.12.1 main.nf\n"
+        assert self.modules_repo.get_component_file("fastqc", "modules", "missing.nf") is None
+        assert self.modules_repo.repo.head.commit.hexsha == head_before
+        assert not self.modules_repo.repo.is_dirty()
+
+    def test_read_file_is_cached(self):
+        """Test that blob contents are cached by their SHA"""
+        blob = self.modules_repo.get_object("modules/nf-core/fastqc/meta.yml", self.commits[0])
+        SyncedRepo.blob_cache.pop(blob.hexsha, None)
+        self.modules_repo.read_file("modules/nf-core/fastqc/meta.yml", self.commits[0])
+        assert blob.hexsha in SyncedRepo.blob_cache
+
+    def test_list_dir(self):
+        """Test listing a directory from a git tree"""
+        assert self.modules_repo.list_dir("modules/nf-core/fastqc") == ["environment.yml", "main.nf", "meta.yml"]
+        assert self.modules_repo.list_dir("modules/nf-core/fastqc/main.nf") is None
+        assert self.modules_repo.list_dir("modules/nf-core/missing") is None
+
+    def test_get_tree_unknown_commit(self):
+        """Test that an unknown commit raises a LookupError"""
+        with self.assertRaises(LookupError):
+            self.modules_repo.get_tree("0" * 40)
+
+    def test_component_files_identical(self):
+        """Test comparing pipeline files against the current and an older commit"""
+        assert all(
+            self.modules_repo.component_files_identical("fastqc", self.pipeline_module_dir, None, "modules").values()
+        )
+        assert not any(
+            self.modules_repo.component_files_identical(
+                "fastqc", self.pipeline_module_dir, self.commits[0], "modules"
+            ).values()
+        )
+
+    def test_find_commit_from_blob_shas(self):
+        """Test looking up the commit of a module from the blob SHAs of its files"""
+        main_nf_sha, meta_yml_sha = (
+            self.modules_repo.get_object(f"modules/nf-core/fastqc/{file}", self.commits[0]).hexsha
+            for file in ("main.nf", "meta.yml")
+        )
+        assert (
+            self.modules_repo.find_commit_from_blob_shas("fastqc", "modules", main_nf_sha, meta_yml_sha)
+            == self.commits[0]
+        )
+        assert self.modules_repo.find_commit_from_blob_shas("fastqc", "modules", meta_yml_sha, main_nf_sha) is None
+        assert self.modules_repo.component_index_path().exists()
+
+    def test_component_index_is_incremental(self):
+        """Test that commits added after a fetch are added to the existing index"""
+        index = self.modules_repo.get_component_index()
+        assert index["head"] == self.commits[-1]
+
+        # Touch only the tests of the module in a new commit upstream
+        remote = git.Repo(Path(self.tmp_dir, "remote", "modules"))
+        Path(remote.working_tree_dir, "modules", "nf-core", "fastqc", "tests").mkdir()
+        Path(remote.working_tree_dir, "modules", "nf-core", "fastqc", "tests", "main.nf.test").touch()
+        remote.index.add(["modules"])
+        actor = git.Actor("nf-core bot", "core@nf-co.re")
+        new_commit = remote.index.commit("Add fastqc tests", author=actor, committer=actor).hexsha
+        self.modules_repo.repo.remotes.origin.fetch()
+        self.modules_repo.repo.git.merge("origin/main")
+
+        with mock.patch.object(
+            self.modules_repo, "update_component_index", wraps=self.modules_repo.update_component_index
+        ) as mock_update:
+            self.modules_repo.get_component_index()
+        mock_update.assert_called_once_with(mock.ANY, f"{self.commits[-1]}..{new_commit}")
+
+        main_nf_sha = git_blob_sha(Path(self.pipeline_module_dir, "main.nf"))
+        meta_yml_sha = git_blob_sha(Path(self.pipeline_module_dir, "meta.yml"))
+        assert (
+            self.modules_repo.find_commit_from_blob_shas("fastqc", "modules", main_nf_sha, meta_yml_sha) == new_commit
+        )
+
+    def test_component_index_merges(self):
+        """Test that merged branches are indexed along the first-parent history of the branch"""
+        remote = git.Repo(Path(self.tmp_dir, "remote", "modules"))
+        actor = git.Actor("nf-core bot", "core@nf-co.re")
+        module_dir = Path(remote.working_tree_dir, "modules", "nf-core", "fastqc")
+        remote.git.checkout("-b", "side")
+        Path(module_dir, "meta.yml").write_text("// fastqc side meta.yml\n")
+        remote.index.add(["modules"])
+        side_commit = remote.index.commit("Update fastqc meta.yml", author=actor, committer=actor).hexsha
+        remote.git.checkout("main")
+        Path(module_dir, "main.nf").write_text("// fastqc main main.nf\n")
+        remote.index.add(["modules"])
+        main_commit = remote.index.commit("Update fastqc main.nf", author=actor, committer=actor).hexsha
+        remote.git.config("user.name", actor.name)
+        remote.git.config("user.email", actor.email)
+        remote.git.merge("side", "--no-ff", "-m", "Merge side")
+        merge_commit = remote.head.commit.hexsha
+        self.modules_repo.repo.remotes.origin.fetch()
+        self.modules_repo.repo.git.merge("origin/main")
+
+        main_nf_shas = {
+            commit: remote.commit(commit).tree["modules/nf-core/fastqc/main.nf"].hexsha
+            for commit in (main_commit, merge_commit)
+        }
+        meta_yml_shas = {
+            commit: remote.commit(commit).tree["modules/nf-core/fastqc/meta.yml"].hexsha
+            for commit in (main_commit, merge_commit, side_commit)
+        }
+        find_commit = self.modules_repo.find_commit_from_blob_shas
+        assert find_commit("fastqc", "modules", main_nf_shas[merge_commit], meta_yml_shas[merge_commit]) == merge_commit
+        assert find_commit("fastqc", "modules", main_nf_shas[main_commit], meta_yml_shas[main_commit]) == main_commit
+        # The version on the side branch never was on the branch itself
+        side_main_nf_sha = remote.commit(side_commit).tree["modules/nf-core/fastqc/main.nf"].hexsha
+        assert find_commit("fastqc", "modules", side_main_nf_sha, meta_yml_shas[side_commit]) is None
+
+    def test_component_names_index(self):
+        """Test that the available components are read from the git tree and cached by tree SHA"""
+        head_before = self.modules_repo.repo.head.commit.hexsha
+        assert self.modules_repo.get_avail_components("modules") == ["fastqc"]
+        assert self.modules_repo.get_avail_components("modules", commit=self.commits[0]) == ["fastqc"]
+        assert self.modules_repo.get_avail_components("subworkflows") == []
+        assert self.modules_repo.repo.head.commit.hexsha == head_before
+        index = json.loads(self.modules_repo.component_names_index_path().read_text())
+        assert len(index) == 2
+
+        # Repeated calls, also in a new session, do not list the tree again
+        SyncedRepo.component_names_indexes = {}
+        with mock.patch.object(self.modules_repo, "save_component_names_index") as mock_save:
+            assert self.modules_repo.component_exists("fastqc", "modules", commit=self.commits[0])
+            assert not self.modules_repo.component_exists("multiqc", "modules")
+        mock_save.assert_not_called()
+
+    def test_install_component_does_not_checkout(self):
+        """Test that installing an older version of a module leaves the local clone untouched"""
+        head_before = self.modules_repo.repo.head.commit.hexsha
+        install_dir = Path(self.tmp_dir, "install")
+        assert self.modules_repo.install_component("fastqc", install_dir, self.commits[0], "modules")
+        assert Path(install_dir, "fastqc", "environment.yml").read_text() == "// fastqc 0.11.9 environment.yml\n"
+        assert sorted(os.listdir(Path(install_dir, "fastqc"))) == ["environment.yml", "main.nf", "meta.yml"]
+        assert self.modules_repo.repo.head.commit.hexsha == head_before
+        assert not self.modules_repo.repo.is_dirty()
+        assert not self.modules_repo.install_component("missing", install_dir, self.commits[0], "modules")
+
+    def test_get_component_snapshot(self):
+        """Test that a module is read into memory and that only changed files are written back in place"""
+        head_before = self.modules_repo.repo.head.commit.hexsha
+        snapshot = self.modules_repo.get_component_snapshot("fastqc", "modules", self.commits[0])
+        assert sorted(snapshot) == ["environment.yml", "main.nf", "meta.yml"]
+        assert snapshot.read_lines("main.nf") == ["// fastqc 0.11.9 main.nf\n"]
+        assert self.modules_repo.repo.head.commit.hexsha == head_before
+        assert self.modules_repo.get_component_snapshot("missing", "modules", self.commits[0]) is None
+        assert all(self.modules_repo.component_files_identical("fastqc", snapshot, self.commits[0], "modules").values())
+
+        dir_snapshot = ComponentSnapshot.from_dir(self.pipeline_module_dir)
+        patched = dir_snapshot.with_lines({"main.nf": ["// patched\n"], "tests/main.nf.test": ["test\n"]})
+        assert "main.nf" not in dir_snapshot.files
+        with mock.patch.object(Path, "write_bytes", autospec=True, side_effect=Path.write_bytes) as mock_write:
+            patched.write(self.pipeline_module_dir)
+        assert sorted(call.args[0].name for call in mock_write.call_args_list) == ["main.nf", "main.nf.test"]
+        assert Path(self.pipeline_module_dir, "main.nf").read_text() == "// patched\n"
+        assert Path(self.pipeline_module_dir, "tests", "main.nf.test").read_text() == "test\n"
+
+    @pytest.mark.skipif(nf_core.synced_repo.fcntl is None, reason="File locks need fcntl")
+    def test_repo_lock_excludes_other_processes(self):
+        """Test that the lock of a clone is re-entrant in this process and held against other processes"""
+        repo_lock = self.modules_repo.repo_lock()
+        assert repo_lock is SyncedRepo.get_repo_lock(self.modules_repo.local_repo_dir)
+        with repo_lock:
+            with self.modules_repo.repo_lock():
+                self.modules_repo.checkout(self.commits[0])
+                self.modules_repo.checkout_branch()
+            assert subprocess.run([sys.executable, "-c", TRY_LOCK, repo_lock.lock_path]).returncode == 1
+        assert subprocess.run([sys.executable, "-c", TRY_LOCK, repo_lock.lock_path]).returncode == 0
+
+    @pytest.mark.skipif(nf_core.synced_repo.fcntl is None, reason="File locks need fcntl")
+    def test_repo_lock_released_during_prompt(self):
+        """Test that the lock of a broken clone is not held while asking to delete it"""
+        lock_path = self.modules_repo.repo_lock().lock_path
+        os.remove(Path(self.modules_repo.local_repo_dir, ".git", "HEAD"))
+        SyncedRepo.local_repo_statuses.clear()
+
+        def confirm(*args, **kwargs):
+            assert subprocess.run([sys.executable, "-c", TRY_LOCK, lock_path]).returncode == 0
+            return True
+
+        with mock.patch("rich.prompt.Confirm.ask", side_effect=confirm) as mock_confirm, mock.patch(
+            "nf_core.modules.modules_repo.NFCORE_DIR", os.path.join(self.tmp_dir, "nfcore")
+        ):
+            self.modules_repo.setup_local_repo(self.remote_url, None)
+        mock_confirm.assert_called_once()
+        assert self.modules_repo.repo.head.commit.hexsha == self.commits[-1]
+
+    def test_fetch_ttl(self):
+        """Test that a recently fetched clone is only fetched again once the window passed and the remote changed"""
+
+        def setup_modules_repo():
+            SyncedRepo.local_repo_statuses.clear()
+            with mock.patch(
+                "nf_core.modules.modules_repo.NFCORE_DIR", os.path.join(self.tmp_dir, "nfcore")
+            ), mock.patch(
+                "nf_core.modules.modules_utils.repo_full_name_from_remote", return_value="nf-core-test/modules"
+            ):
+                return nf_core.modules.modules_repo.ModulesRepo(remote_url=self.remote_url, hide_progress=True)
+
+        def age_fetch_state(modules_repo):
+            state_path = modules_repo.fetch_state_path()
+            state = json.loads(state_path.read_text())
+            state["fetched_at"] -= 7200
+            state_path.write_text(json.dumps(state))
+
+        Path(self.tmp_dir, "pipeline", ".nf-core.yml").write_text("repository_type: pipeline\nfetch_ttl: 3600\n")
+        with mock.patch.object(SyncedRepo, "fetch_ttl", 0), mock.patch.object(
+            git.Remote, "fetch", autospec=True, side_effect=git.Remote.fetch
+        ) as mock_fetch:
+            SyncedRepo.configure_session(Path(self.tmp_dir, "pipeline"))
+            assert SyncedRepo.fetch_ttl == 3600
+
+            # The clone was fetched when it was set up
+            setup_modules_repo()
+            mock_fetch.assert_not_called()
+
+            # After the window, the remote branches are compared first
+            age_fetch_state(self.modules_repo)
+            modules_repo = setup_modules_repo()
+            mock_fetch.assert_not_called()
+            assert modules_repo.load_fetch_state()["remote_heads"] == {"refs/heads/main": self.commits[-1]}
+
+            remote = git.Repo(Path(self.tmp_dir, "remote", "modules"))
+            Path(remote.working_tree_dir, "README.md").touch()
+            remote.index.add(["README.md"])
+            actor = git.Actor("nf-core bot", "core@nf-co.re")
+            new_commit = remote.index.commit("Add README", author=actor, committer=actor).hexsha
+            setup_modules_repo()
+            mock_fetch.assert_not_called()
+            age_fetch_state(self.modules_repo)
+            modules_repo = setup_modules_repo()
+            mock_fetch.assert_called_once()
+            assert modules_repo.repo.head.commit.hexsha == new_commit
+            assert modules_repo.load_fetch_state()["remote_heads"] == {"refs/heads/main": new_commit}
+
+    def test_configure_session_resets_settings(self):
+        """Test that the settings of a pipeline are not carried over to the next pipeline"""
+        pipeline_dir = Path(self.tmp_dir, "pipeline")
+        Path(pipeline_dir, ".nf-core.yml").write_text(
+            "repository_type: pipeline\nfetch_ttl: 3600\npartial_clone: true\n"
+        )
+        modules_json = {"repos": {self.remote_url: {"modules": {"nf-core": {"fastqc": {"git_sha": self.commits[-1]}}}}}}
+        Path(pipeline_dir, "modules.json").write_text(json.dumps(modules_json))
+        other_pipeline_dir = Path(self.tmp_dir, "other_pipeline")
+        other_pipeline_dir.mkdir()
+        Path(other_pipeline_dir, ".nf-core.yml").write_text("repository_type: pipeline\n")
+
+        with mock.patch.object(SyncedRepo, "fetch_ttl", 0), mock.patch.object(
+            SyncedRepo, "partial_clone", False
+        ), mock.patch.object(SyncedRepo, "sparse_paths", {}):
+            SyncedRepo.configure_session(pipeline_dir)
+            assert SyncedRepo.fetch_ttl == 3600
+            assert SyncedRepo.partial_clone
+            assert SyncedRepo.sparse_paths == {self.remote_url: {"modules/nf-core/fastqc"}}
+
+            SyncedRepo.configure_session(other_pipeline_dir)
+            assert SyncedRepo.fetch_ttl == 0
+            assert not SyncedRepo.partial_clone
+            assert SyncedRepo.sparse_paths == {}
+
+    def test_partial_clone(self):
+        """Test that partial clones only check out the components of the pipeline and fetch blobs on demand"""
+        remote = git.Repo(Path(self.tmp_dir, "remote", "modules"))
+        remote.git.config("uploadpack.allowFilter", "true")
+        Path(remote.working_tree_dir, "modules", "nf-core", "multiqc").mkdir()
+        Path(remote.working_tree_dir, "modules", "nf-core", "multiqc", "main.nf").write_text("// multiqc main.nf\n")
+        remote.index.add(["modules"])
+        actor = git.Actor("nf-core bot", "core@nf-co.re")
+        remote.index.commit("Add multiqc", author=actor, committer=actor)
+
+        pipeline_dir = Path(self.tmp_dir, "pipeline")
+        Path(pipeline_dir, ".nf-core.yml").write_text("repository_type: pipeline\npartial_clone: true\n")
+        modules_json = {"repos": {self.remote_url: {"modules": {"nf-core": {"fastqc": {"git_sha": self.commits[-1]}}}}}}
+        Path(pipeline_dir, "modules.json").write_text(json.dumps(modules_json))
+        with mock.patch.object(SyncedRepo, "partial_clone", False), mock.patch.object(SyncedRepo, "sparse_paths", {}):
+            SyncedRepo.configure_session(pipeline_dir)
+            assert SyncedRepo.sparse_paths == {self.remote_url: {"modules/nf-core/fastqc"}}
+            SyncedRepo.local_repo_statuses.clear()
+            with mock.patch(
+                "nf_core.modules.modules_repo.NFCORE_DIR", os.path.join(self.tmp_dir, "partial")
+            ), mock.patch(
+                "nf_core.modules.modules_utils.repo_full_name_from_remote", return_value="nf-core-test/modules"
+            ):
+                modules_repo = nf_core.modules.modules_repo.ModulesRepo(remote_url=self.remote_url, hide_progress=True)
+
+        assert modules_repo.is_partial_clone() and modules_repo.is_sparse_checkout()
+        assert os.listdir(Path(modules_repo.local_repo_dir, "modules", "nf-core")) == ["fastqc"]
+        assert sorted(modules_repo.get_avail_components("modules")) == ["fastqc", "multiqc"]
+        assert modules_repo.get_avail_components("modules", commit=self.commits[0]) == ["fastqc"]
+
+        # The blobs of older versions are only fetched when they are installed
+        old_tree = modules_repo.get_object("modules/nf-core/fastqc", self.commits[0])
+        assert "?" in modules_repo.repo.git.rev_list("--objects", "--missing=print", old_tree.hexsha)
+        install_dir = Path(self.tmp_dir, "install")
+        assert modules_repo.install_component("fastqc", install_dir, self.commits[0], "modules")
+        assert Path(install_dir, "fastqc", "main.nf").read_text() == "// fastqc 0.11.9 main.nf\n"
+        assert "?" not in modules_repo.repo.git.rev_list("--objects", "--missing=print", old_tree.hexsha)
+
+        # Components added to the pipeline later are added to the sparse checkout
+        modules_json["repos"][self.remote_url]["modules"]["nf-core"]["multiqc"] = {"git_sha": self.commits[-1]}
+        Path(pipeline_dir, "modules.json").write_text(json.dumps(modules_json))
+        with mock.patch.object(SyncedRepo, "partial_clone", False), mock.patch.object(SyncedRepo, "sparse_paths", {}):
+            SyncedRepo.configure_session(pipeline_dir)
+            SyncedRepo.local_repo_statuses.clear()
+            with mock.patch("nf_core.modules.modules_repo.NFCORE_DIR", os.path.join(self.tmp_dir, "partial")):
+                modules_repo.setup_local_repo(self.remote_url, None)
+        assert sorted(os.listdir(Path(modules_repo.local_repo_dir, "modules", "nf-core"))) == ["fastqc", "multiqc"]
+
+    def test_commit_index(self):
+        """Test that the commit index matches the git log and is updated incrementally after a fetch"""
+        assert self.modules_repo.sha_exists_on_branch(self.commits[0])
+        assert not self.modules_repo.sha_exists_on_branch("0" * 40)
+        commit = self.modules_repo.repo.commit(self.commits[0])
+        assert self.modules_repo.get_commit_info(self.commits[0]) == (
+            "Update fastqc to 0.11.9",
+            str(commit.committed_datetime.date()),
+        )
+        with self.assertRaises(LookupError):
+            self.modules_repo.get_commit_info("0" * 40)
+        assert [commit["git_sha"] for commit in self.modules_repo.get_component_git_log("fastqc", "modules")] == list(
+            reversed(self.commits)
+        )
+        assert self.modules_repo.get_latest_component_version("fastqc", "modules") == self.commits[-1]
+
+        # Add a commit touching the module upstream and another one touching nothing indexed
+        remote = git.Repo(Path(self.tmp_dir, "remote", "modules"))
+        actor = git.Actor("nf-core bot", "core@nf-co.re")
+        Path(remote.working_tree_dir, "modules", "nf-core", "fastqc", "main.nf").write_text("// fastqc 0.12.2\n")
+        remote.index.add(["modules"])
+        module_commit = remote.index.commit(
+            "Update fastqc to 0.12.2\n\nLonger description", author=actor, committer=actor
+        )
+        Path(remote.working_tree_dir, "README.md").touch()
+        remote.index.add(["README.md"])
+        remote.index.commit("Add README", author=actor, committer=actor)
+        self.modules_repo.repo.remotes.origin.fetch()
+        self.modules_repo.repo.git.merge("origin/main")
+
+        with mock.patch.object(
+            self.modules_repo, "update_commit_index", wraps=self.modules_repo.update_commit_index
+        ) as mock_update:
+            git_log = list(self.modules_repo.get_component_git_log("fastqc", "modules"))
+        mock_update.assert_called_once_with(mock.ANY, f"{self.commits[-1]}..{remote.head.commit.hexsha}")
+        assert git_log[0] == {"git_sha": module_commit.hexsha, "trunc_message": "Update fastqc to 0.12.2"}
+        assert [commit["git_sha"] for commit in git_log] == [
+            commit.hexsha for commit in self.modules_repo.repo.iter_commits("main", paths="modules/nf-core/fastqc")
+        ]
+        assert self.modules_repo.sha_exists_on_branch(remote.head.commit.hexsha)
+
+    def test_commit_index_per_clone(self):
+        """Test that clones of different remotes with the same name do not share a commit index"""
+        assert self.modules_repo.get_latest_component_version("fastqc", "modules") == self.commits[-1]
+        other_remote_url, _ = create_local_modules_remote(Path(self.tmp_dir, "other"))
+        other_remote = git.Repo(Path(self.tmp_dir, "other", "remote", "modules"))
+        Path(other_remote.working_tree_dir, "modules", "nf-core", "fastqc", "main.nf").write_text("// other fastqc\n")
+        other_remote.index.add(["modules"])
+        actor = git.Actor("nf-core bot", "core@nf-co.re")
+        other_commit = other_remote.index.commit("Update fastqc elsewhere", author=actor, committer=actor).hexsha
+        SyncedRepo.local_repo_statuses.clear()
+        with mock.patch(
+            "nf_core.modules.modules_repo.NFCORE_DIR", os.path.join(self.tmp_dir, "other_nfcore")
+        ), mock.patch("nf_core.modules.modules_utils.repo_full_name_from_remote", return_value="nf-core-test/modules"):
+            other_modules_repo = nf_core.modules.modules_repo.ModulesRepo(
+                remote_url=other_remote_url, hide_progress=True
+            )
+
+        assert other_modules_repo.commit_index_path() != self.modules_repo.commit_index_path()
+        assert other_modules_repo.get_latest_component_version("fastqc", "modules") == other_commit
+
+    def test_component_index_per_clone(self):
+        """Test that clones of different remotes with the same name do not share a component index"""
+        assert self.modules_repo.get_component_index()["head"] == self.commits[-1]
+        other_remote_url, _ = create_local_modules_remote(Path(self.tmp_dir, "other"))
+        other_remote = git.Repo(Path(self.tmp_dir, "other", "remote", "modules"))
+        Path(other_remote.working_tree_dir, "modules", "nf-core", "fastqc", "main.nf").write_text("// other fastqc\n")
+        other_remote.index.add(["modules"])
+        actor = git.Actor("nf-core bot", "core@nf-co.re")
+        other_commit = other_remote.index.commit("Update fastqc elsewhere", author=actor, committer=actor).hexsha
+        SyncedRepo.local_repo_statuses.clear()
+        with mock.patch(
+            "nf_core.modules.modules_repo.NFCORE_DIR", os.path.join(self.tmp_dir, "other_nfcore")
+        ), mock.patch("nf_core.modules.modules_utils.repo_full_name_from_remote", return_value="nf-core-test/modules"):
+            other_modules_repo = nf_core.modules.modules_repo.ModulesRepo(
+                remote_url=other_remote_url, hide_progress=True
+            )
+
+        assert other_modules_repo.component_index_path() != self.modules_repo.component_index_path()
+        assert other_modules_repo.get_component_index()["head"] == other_commit
+        # The index of the first clone is loaded from disk as it was, without rebuilding it
+        SyncedRepo.component_indexes.clear()
+        with mock.patch.object(SyncedRepo, "update_component_index") as mock_update:
+            assert self.modules_repo.get_component_index()["head"] == self.commits[-1]
+        mock_update.assert_not_called()
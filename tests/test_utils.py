@@ -9,12 +9,13 @@ from unittest import mock
 
 import pytest
 import requests
+import responses
 
 import nf_core.create
 import nf_core.list
 import nf_core.utils
 
-from .utils import with_temporary_folder
+from .utils import mock_anaconda_api_calls, mock_biocontainers_api_calls, with_temporary_folder
 
 TEST_DATA_DIR = Path(__file__).parent / "data"
 
@@ -237,3 +238,58 @@ def test_set_wd_revert_on_raise():
             with nf_core.utils.set_wd(tmpdirname):
                 raise Exception
     assert wd_before_context == Path().resolve()
+
+
+def test_package_metadata_client_cache(tmp_path):
+    """Test that package metadata is cached, including the channels a package was not found in"""
+    with mock.patch("nf_core.utils.NFCORE_CACHE_DIR", str(tmp_path)), responses.RequestsMock() as rsps:
+        rsps.get("https://api.anaconda.org/package/conda-forge/fastqc", status=404)
+        mock_anaconda_api_calls(rsps, "fastqc", "0.12.1--hdfd78af_0")
+        mock_biocontainers_api_calls(rsps, "fastqc", "0.12.1--hdfd78af_0")
+        client = nf_core.utils.PackageMetadataClient()
+        for _ in range(2):
+            response = client.anaconda_package("bioconda::fastqc=0.12.1", ["conda-forge", "bioconda"])
+            assert response["latest_version"] == "0.12.1"
+            docker_img, singularity_img = client.get_biocontainer_tag("fastqc", "0.12.1")
+            assert docker_img == "biocontainers/fastqc:0.12.1--hdfd78af_0"
+        assert len(rsps.calls) == 2
+        assert client.anaconda_package("fastqc=0.12.1", ["conda-forge", "bioconda"]) == response
+        assert len(rsps.calls) == 3
+
+
+def test_package_metadata_client_prefetch(tmp_path):
+    """Test that prefetched packages are served from the cache and missing packages are not fatal"""
+    with mock.patch("nf_core.utils.NFCORE_CACHE_DIR", str(tmp_path)), responses.RequestsMock() as rsps:
+        for package in ("fastqc", "multiqc", "samtools"):
+            mock_anaconda_api_calls(rsps, package, "1.0--h0000000_0")
+        rsps.get("https://api.anaconda.org/package/bioconda/not_a_package", status=404)
+        client = nf_core.utils.PackageMetadataClient(max_workers=4)
+        client.prefetch(
+            ["bioconda::fastqc=1.0", "bioconda::multiqc=1.0", "bioconda::samtools=1.0", "bioconda::not_a_package=1.0"]
+        )
+        assert len(rsps.calls) == 4
+        assert client.anaconda_package("bioconda::samtools=1.0")["latest_version"] == "1.0"
+        with pytest.raises(ValueError):
+            client.anaconda_package("bioconda::not_a_package=1.0")
+        assert len(rsps.calls) == 4
+
+
+def test_fetch_wf_configs(tmp_path):
+    """Test that workflows sharing a config are only resolved once"""
+    wf_paths = []
+    for i, config in enumerate(["params.foo = 'a'", "params.foo = 'a'", "params.foo = 'b'"]):
+        wf_path = tmp_path / f"wf_{i}"
+        wf_path.mkdir()
+        (wf_path / "nextflow.config").write_text(config)
+        wf_paths.append(str(wf_path))
+    (tmp_path / "nxf_home").mkdir()
+    with mock.patch.dict(os.environ, {"NXF_HOME": str(tmp_path / "nxf_home")}), mock.patch.dict(
+        nf_core.utils.wf_config_cache, clear=True
+    ), mock.patch("nf_core.utils.run_cmd", return_value=(b"params.foo = 'a'\n", b"")) as mock_run_cmd:
+        configs = nf_core.utils.fetch_wf_configs(wf_paths)
+        assert mock_run_cmd.call_count == 2
+        assert sorted(configs) == sorted(wf_paths)
+        assert configs[wf_paths[0]] == {"params.foo": "a"}
+        # Later calls are served from the config cache
+        assert nf_core.utils.fetch_wf_config(wf_paths[1]) == {"params.foo": "a"}
+        assert mock_run_cmd.call_count == 2
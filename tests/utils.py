@@ -5,7 +5,7 @@ Helper functions for tests
 import functools
 import os
 import tempfile
-from typing import Any, Callable, Tuple
+from typing import Any, Callable, List, Tuple
 
 import responses
 
@@ -108,3 +108,30 @@ def create_tmp_pipeline() -> Tuple[str, str, str, str]:
 
     # return values to instance variables for later use in test methods
     return tmp_dir, template_dir, pipeline_name, pipeline_dir
+
+
+def create_local_modules_remote(tmp_dir: str) -> Tuple[str, List[str]]:
+    """
+    Create a small modules repository on disk that can be used as a remote.
+    The 'fastqc' module is changed in the second commit.
+
+    Returns the remote URL and the commit SHAs, oldest first
+    """
+    import git
+
+    remote_dir = os.path.join(tmp_dir, "remote", "modules")
+    repo = git.Repo.init(remote_dir, initial_branch="main")
+    actor = git.Actor("nf-core bot", "core@nf-co.re")
+    module_dir = os.path.join(remote_dir, "modules", "nf-core", "fastqc")
+    os.makedirs(module_dir)
+    with open(os.path.join(remote_dir, ".nf-core.yml"), "w") as fh:
+        fh.write("repository_type: modules\norg_path: nf-core\n")
+    commits = []
+    for version in ("0.11.9", "0.12.1"):
+        for file_name in ("main.nf", "meta.yml", "environment.yml"):
+            with open(os.path.join(module_dir, file_name), "w") as fh:
+                fh.write(f"// fastqc {version} {file_name}\n")
+        repo.index.add([".nf-core.yml", "modules"])
+        commit = repo.index.commit(f"Update fastqc to {version}", author=actor, committer=actor)
+        commits.append(commit.hexsha)
+    return f"file://{remote_dir}", commits